@@ -0,0 +1,152 @@
+"""
+AI-vs-rule disagreement analytics from daily rollups.
+
+A rollup is a small per-user, per-day dict of counts and sums:
+
+    {"day": "2024-01-31", "logs": 4, "disagree": 1,
+     "prob_sum": 1.7, "prob_count": 4,
+     "confusion": {"HIGH": {"LOW": 1}, "LOW": {"LOW": 3}}}
+
+confusion maps rule risk_level -> ml_risk_label -> count; prob_sum is in
+the units ml_risk_probability is stored in (percent for app logs).
+Rollups only ever add, so they can be kept up to date one log at a time
+and merged in any order; disagreement_report turns any set of them into
+a day or week trend and a confusion matrix without touching the logs.
+"""
+from dataclasses import dataclass
+
+import pandas as pd
+
+from database.sqlite_store import encode_timestamp
+from risk_engine import RISK_LEVELS
+
+ROLLUP_FIELDS = ("risk_level", "ml_risk_label", "ml_risk_probability", "ai_rule_disagree")
+FREQUENCIES = ("day", "week")
+TREND_COLUMNS = ["period", "users", "logs", "disagreements", "disagree_rate", "mean_ml_probability"]
+
+
+def day_of(ts):
+    """UTC calendar day ("YYYY-MM-DD") of a timestamp, date or day string."""
+    if ts is None:
+        return None
+    if hasattr(ts, "isoformat") and not hasattr(ts, "hour"):  # datetime.date
+        return ts.isoformat()
+    return encode_timestamp(ts)[:10]
+
+
+# ---------------- BUILDING ----------------
+def new_rollup(day):
+    return {"day": day, "logs": 0, "disagree": 0, "prob_sum": 0.0, "prob_count": 0, "confusion": {}}
+
+
+def add_log(rollups, log):
+    """Fold one log into rollups (day -> rollup). Returns its day, or None if it has no timestamp."""
+    day = day_of(log.get("timestamp"))
+    if day is None:
+        return None
+
+    rollup = rollups.get(day)
+    if rollup is None:
+        rollup = rollups[day] = new_rollup(day)
+
+    rollup["logs"] += 1
+    rollup["disagree"] += bool(log.get("ai_rule_disagree"))
+
+    prob = log.get("ml_risk_probability")
+    if prob is not None:
+        rollup["prob_sum"] += float(prob)
+        rollup["prob_count"] += 1
+
+    rule, ml = log.get("risk_level"), log.get("ml_risk_label")
+    if rule is not None and ml is not None:
+        row = rollup["confusion"].setdefault(str(rule), {})
+        row[str(ml)] = row.get(str(ml), 0) + 1
+    return day
+
+
+def rollup_logs(logs):
+    rollups = {}
+    for log in logs:
+        add_log(rollups, log)
+    return rollups
+
+
+# ---------------- REPORTS ----------------
+@dataclass
+class DisagreementReport:
+    freq: str
+    trend: pd.DataFrame      # one row per period, oldest first
+    confusion: pd.DataFrame  # rule risk_level (rows) x ml_risk_label (columns)
+    logs: int
+    disagreements: int
+    mean_ml_probability: float
+
+    @property
+    def disagree_rate(self):
+        return self.disagreements / self.logs if self.logs else float("nan")
+
+
+def _label_order(labels):
+    known = [level for level in RISK_LEVELS if level in labels]
+    return known + sorted(set(labels) - set(known))
+
+
+def confusion_matrix(rollups):
+    counts = {}
+    for rollup in rollups:
+        for rule, row in rollup.get("confusion", {}).items():
+            for ml, n in row.items():
+                counts[rule, ml] = counts.get((rule, ml), 0) + n
+
+    rules = _label_order({rule for rule, _ in counts})
+    labels = _label_order({ml for _, ml in counts})
+    matrix = pd.DataFrame(
+        [[counts.get((rule, ml), 0) for ml in labels] for rule in rules],
+        index=pd.Index(rules, name="risk_level"),
+        columns=pd.Index(labels, name="ml_risk_label"),
+        dtype="int64"
+    )
+    return matrix
+
+
+def disagreement_report(rollups, freq="day"):
+    """Trend and confusion matrix over rollups (from one user or many)."""
+    if freq not in FREQUENCIES:
+        raise ValueError(f"freq must be one of {FREQUENCIES}")
+    rollups = list(rollups)
+
+    df = pd.DataFrame.from_records(
+        [
+            (r.get("user"), r["day"], r["logs"], r["disagree"], r["prob_sum"], r["prob_count"])
+            for r in rollups
+        ],
+        columns=["user", "day", "logs", "disagree", "prob_sum", "prob_count"]
+    )
+
+    if df.empty:
+        trend = pd.DataFrame(columns=TREND_COLUMNS)
+    else:
+        period = pd.to_datetime(df["day"])
+        if freq == "week":
+            period = period.dt.to_period("W").dt.start_time  # Monday
+        grouped = df.assign(period=period).groupby("period", sort=True)
+        trend = grouped.agg(
+            users=("user", "nunique"),
+            logs=("logs", "sum"),
+            disagreements=("disagree", "sum"),
+            prob_sum=("prob_sum", "sum"),
+            prob_count=("prob_count", "sum"),
+        ).reset_index()
+        trend["disagree_rate"] = trend["disagreements"] / trend["logs"]
+        trend["mean_ml_probability"] = trend["prob_sum"] / trend["prob_count"].where(trend["prob_count"] > 0)
+        trend = trend[TREND_COLUMNS]
+
+    prob_count = int(df["prob_count"].sum())
+    return DisagreementReport(
+        freq=freq,
+        trend=trend,
+        confusion=confusion_matrix(rollups),
+        logs=int(df["logs"].sum()),
+        disagreements=int(df["disagree"].sum()),
+        mean_ml_probability=float(df["prob_sum"].sum() / prob_count) if prob_count else float("nan"),
+    )
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def compute_health_change(df):
@@ -12,3 +13,206 @@ def compute_health_change(df):
     change = second_half - first_half
 
     return round(change, 2)
+
+
+# ================== LONG-HORIZON TREND ANALYTICS ==================
+# Everything below works on a long DataFrame (one row per log) for any
+# number of users. Windows are counted in logs, not calendar days. All
+# per-user work is done with cumulative sums and group indices, so the
+# cost is a few NumPy passes regardless of history length or user count.
+
+TREND_METRICS = ["risk_score", "stress", "sleep"]
+ROLLING_WINDOWS = (7, 30, 90)
+EWMA_SPAN = 14
+MIN_SEGMENT = 5
+CHANGE_THRESHOLD = 3.0
+
+
+def _sorted_groups(df, by, time_col):
+    """Sort by (user, time); return (sorted df, group codes, group start per row, group sizes)."""
+    if by is None:
+        df = df.sort_values(time_col, kind="stable")
+        codes = np.zeros(len(df), dtype=np.int64)
+    else:
+        df = df.sort_values([by, time_col], kind="stable")
+        codes = pd.factorize(df[by], sort=False)[0]
+
+    sizes = np.bincount(codes)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    return df, codes, starts[codes], sizes
+
+
+def _cumsum0(x):
+    return np.concatenate([[0.0], np.cumsum(x)])
+
+
+def rolling_means(df, windows=ROLLING_WINDOWS, metrics=TREND_METRICS, by="user", time_col="timestamp"):
+    """
+    Trailing mean of each metric over the last w logs of the same user
+    (fewer at the start of a history). NaNs are skipped.
+    Returns columns <metric>_mean_<w>, indexed like df.
+    """
+    df, _, row_start, _ = _sorted_groups(df, by, time_col)
+    i = np.arange(len(df))
+    out = {}
+
+    for m in metrics:
+        x = df[m].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(x)
+        sums = _cumsum0(np.where(valid, x, 0.0))
+        counts = _cumsum0(valid)
+
+        for w in windows:
+            lo = np.maximum(i - w + 1, row_start)
+            n = counts[i + 1] - counts[lo]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[f"{m}_mean_{w}"] = (sums[i + 1] - sums[lo]) / n
+
+    return pd.DataFrame(out, index=df.index)
+
+
+def ewma(df, span=EWMA_SPAN, metrics=TREND_METRICS, by="user", time_col="timestamp"):
+    """Exponentially weighted moving average per user. Columns <metric>_ewma."""
+    df = df.sort_values([by, time_col] if by else time_col, kind="stable")
+    # Align by position: the caller's index may repeat labels (e.g. concatenated frames)
+    index = df.index
+    df = df.reset_index(drop=True)
+    if by is None:
+        result = df[metrics].ewm(span=span).mean()
+    else:
+        result = (
+            df.groupby(by, sort=False)[metrics]
+            .ewm(span=span)
+            .mean()
+            .reset_index(level=0, drop=True)
+        )
+    result = result.add_suffix("_ewma").loc[df.index]
+    result.index = index
+    return result
+
+
+def _elapsed_days(df, time_col, row_start):
+    t = df[time_col].to_numpy(dtype="datetime64[ns]").astype(np.int64) / 86_400e9
+    return t - t[row_start]
+
+
+def trend_slopes(df, metrics=TREND_METRICS, by="user", time_col="timestamp"):
+    """
+    Least-squares slope (change per day) of each metric over each user's
+    whole history. One row per user, columns <metric>_slope plus n_logs.
+    """
+    df, codes, row_start, sizes = _sorted_groups(df, by, time_col)
+    t = _elapsed_days(df, time_col, row_start)
+    n_groups = len(sizes)
+
+    out = {"n_logs": sizes}
+    for m in metrics:
+        y = df[m].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(y)
+        n = np.bincount(codes, weights=valid, minlength=n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Center time per user (over valid rows) before forming moments to avoid cancellation
+            tc = np.where(valid, t - (np.bincount(codes, weights=np.where(valid, t, 0.0)) / n)[codes], 0.0)
+            st2 = np.bincount(codes, weights=tc * tc, minlength=n_groups)
+            sty = np.bincount(codes, weights=tc * np.where(valid, y, 0.0), minlength=n_groups)
+            out[f"{m}_slope"] = np.where(st2 > 0, sty / st2, np.nan)
+
+    index = pd.Index(pd.unique(df[by]) if by else [0], name=by)
+    return pd.DataFrame(out, index=index)
+
+
+def rolling_slopes(df, window=30, metrics=TREND_METRICS, by="user", time_col="timestamp"):
+    """Least-squares slope per day over each user's last `window` logs, per row."""
+    df, _, row_start, _ = _sorted_groups(df, by, time_col)
+    i = np.arange(len(df))
+    lo = np.maximum(i - window + 1, row_start)
+    t = _elapsed_days(df, time_col, row_start)
+
+    out = {}
+    for m in metrics:
+        # NaNs are masked out of every sum, so they only shrink their own windows
+        y = df[m].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(y)
+        tv, yv = np.where(valid, t, 0.0), np.where(valid, y, 0.0)
+        N, St, Stt = _cumsum0(valid), _cumsum0(tv), _cumsum0(tv * tv)
+        Sy, Sty = _cumsum0(yv), _cumsum0(tv * yv)
+
+        n = N[i + 1] - N[lo]
+        st = St[i + 1] - St[lo]
+        den = n * (Stt[i + 1] - Stt[lo]) - st * st
+        num = n * (Sty[i + 1] - Sty[lo]) - st * (Sy[i + 1] - Sy[lo])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[f"{m}_slope_{window}"] = np.where(den > 1e-9, num / den, np.nan)
+
+    return pd.DataFrame(out, index=df.index)
+
+
+def change_points(
+    df,
+    metric="risk_score",
+    by="user",
+    time_col="timestamp",
+    min_segment=MIN_SEGMENT,
+    threshold=CHANGE_THRESHOLD
+):
+    """
+    Most likely single mean shift per user (CUSUM / binary segmentation
+    statistic). For every split point k the score is
+        sqrt(k (n - k) / n) * |mean_after - mean_before| / std
+    and the best split per user is reported, flagged when score > threshold.
+    """
+    users = pd.unique(df[by]) if by else [0]
+    df = df[df[metric].notna()]  # splits are over each user's valid values
+    if df.empty:
+        return pd.DataFrame(
+            {"change_at": pd.NaT, "shift": np.nan, "score": np.nan, "significant": False},
+            index=pd.Index(users, name=by)
+        )
+    df, codes, row_start, sizes = _sorted_groups(df, by, time_col)
+    y = df[metric].to_numpy(dtype=np.float64)
+    i = np.arange(len(df))
+
+    cs = _cumsum0(y)
+    n = sizes[codes].astype(np.float64)
+    k = (i - row_start + 1).astype(np.float64)  # points up to and including row i
+    left = cs[i + 1] - cs[row_start]
+    total = cs[row_start + sizes[codes]] - cs[row_start]
+
+    mean = (np.bincount(codes, weights=y) / sizes)[codes]
+    std = np.sqrt(np.bincount(codes, weights=(y - mean) ** 2) / sizes)[codes]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shift = (total - left) / (n - k) - left / k
+        score = np.sqrt(k * (n - k) / n) * np.abs(shift) / std
+
+    score[(k < min_segment) | (n - k < min_segment) | ~np.isfinite(score)] = -1.0
+
+    # Best split per user: sort by (user, score desc) and take the first row
+    order = np.lexsort((-score, codes))
+    first = order[np.concatenate([[True], codes[order][1:] != codes[order][:-1]])]
+
+    found = score[first] >= 0
+    result = pd.DataFrame({
+        # first is the last row before the shift
+        "change_at": df[time_col].to_numpy()[np.minimum(first + 1, len(df) - 1)],
+        "shift": shift[first],
+        "score": score[first],
+    }, index=pd.Index(df[by].to_numpy()[first] if by else [0], name=by))
+
+    result.loc[~found, ["change_at", "shift", "score"]] = [pd.NaT, np.nan, np.nan]
+    result["significant"] = found & (score[first] > threshold)
+    # Users with no valid values keep an empty row
+    missing = [u for u in users if u not in result.index]
+    if missing:
+        result = result.reindex(result.index.append(pd.Index(missing, name=by)))
+        result["significant"] = result["significant"].astype("boolean").fillna(False).astype(bool)
+    return result
+
+
+def analyze_trends(df, by="user", time_col="timestamp", metrics=TREND_METRICS):
+    """Per-user summary: whole-history slopes plus a change point per metric."""
+    summary = trend_slopes(df, metrics=metrics, by=by, time_col=time_col)
+    for m in metrics:
+        cp = change_points(df, metric=m, by=by, time_col=time_col)
+        summary = summary.join(cp.add_prefix(f"{m}_"))
+    return summary
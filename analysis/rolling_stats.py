@@ -0,0 +1,138 @@
+"""
+Incrementally maintained per-user aggregates.
+
+A UserSummary is updated in O(1) per saved log and holds everything the
+dashboard insights need: running sums over the last WINDOW logs for
+means and the risk-vs-stress / risk-vs-sleep correlations, the last
+WINDOW (risk, stress, sleep) points for tail-based insights, and
+all-time counts and sums. It round-trips through plain dicts so it can
+be stored next to the logs.
+"""
+import math
+from collections import deque
+
+WINDOW = 30  # matches the dashboard's history window
+METRICS = ("risk_score", "stress", "sleep")
+
+
+class UserSummary:
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.count = 0
+        self.totals = {m: 0.0 for m in METRICS}
+        self.last_timestamp = None
+
+        self.recent = deque(maxlen=window)  # (risk, stress, sleep), oldest first
+        # Windowed first and second moments over `recent`
+        self.sums = {m: 0.0 for m in METRICS}
+        self.squares = {m: 0.0 for m in METRICS}
+        self.cross = {"stress": 0.0, "sleep": 0.0}  # sum(risk * x)
+
+    # ---------------- UPDATES ----------------
+    def _apply(self, point, sign):
+        risk = point[0]
+        for m, value in zip(METRICS, point):
+            self.sums[m] += sign * value
+            self.squares[m] += sign * value * value
+        self.cross["stress"] += sign * risk * point[1]
+        self.cross["sleep"] += sign * risk * point[2]
+
+    def update(self, log):
+        """Fold in one log (assumed newer than everything seen). O(1)."""
+        try:
+            point = tuple(float(log[m]) for m in METRICS)
+        except (KeyError, TypeError, ValueError):
+            return False
+
+        if len(self.recent) == self.window:
+            self._apply(self.recent[0], -1)
+        self.recent.append(point)
+        self._apply(point, +1)
+
+        self.count += 1
+        for m, value in zip(METRICS, point):
+            self.totals[m] += value
+        if log.get("timestamp") is not None:
+            self.last_timestamp = log["timestamp"]
+        return True
+
+    # ---------------- READS ----------------
+    def __len__(self):
+        return len(self.recent)
+
+    def tail(self, n, metric):
+        i = METRICS.index(metric)
+        return [p[i] for p in list(self.recent)[-n:]]
+
+    def window_mean(self, metric):
+        return self.sums[metric] / len(self.recent) if self.recent else None
+
+    def tail_mean(self, n, metric):
+        values = self.tail(n, metric)
+        return sum(values) / len(values) if values else None
+
+    def correlation(self, metric):
+        """Pearson correlation of risk_score with stress or sleep over the window."""
+        n = len(self.recent)
+        if n < 2:
+            return float("nan")
+        sx, sy = self.sums["risk_score"], self.sums[metric]
+        cov = self.cross[metric] - sx * sy / n
+        var_x = self.squares["risk_score"] - sx * sx / n
+        var_y = self.squares[metric] - sy * sy / n
+        if var_x <= 1e-12 or var_y <= 1e-12:
+            return float("nan")
+        return cov / math.sqrt(var_x * var_y)
+
+    def health_change(self):
+        """Same result as analysis.health_trends.compute_health_change on the window."""
+        if len(self.recent) < 6:
+            return None
+        risk = self.tail(6, "risk_score")
+        return round(sum(risk[3:]) / 3 - sum(risk[:3]) / 3, 2)
+
+    def insights(self):
+        """Numbers behind the dashboard's insight, change and correlation sections."""
+        result = {"change_score": self.health_change()}
+
+        if len(self.recent) >= 3:
+            risk = self.tail(3, "risk_score")
+            result["risk_increasing"] = risk[-1] > risk[0]
+            result["high_stress"] = self.tail_mean(3, "stress") >= 7
+            result["low_sleep"] = self.tail_mean(3, "sleep") < 6
+
+        if len(self.recent) >= 5:
+            result["stress_corr"] = self.correlation("stress")
+            result["sleep_corr"] = self.correlation("sleep")
+
+        return result
+
+    # ---------------- PERSISTENCE ----------------
+    def to_dict(self):
+        return {
+            "window": self.window,
+            "count": self.count,
+            "totals": dict(self.totals),
+            "last_timestamp": self.last_timestamp,
+            "recent": [list(p) for p in self.recent],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls(window=data.get("window", WINDOW))
+        summary.count = data.get("count", 0)
+        summary.totals.update(data.get("totals", {}))
+        summary.last_timestamp = data.get("last_timestamp")
+        for point in data.get("recent", []):
+            point = tuple(point)
+            summary.recent.append(point)
+            summary._apply(point, +1)
+        return summary
+
+    @classmethod
+    def from_logs(cls, logs, window=WINDOW):
+        """Rebuild from logs given oldest first."""
+        summary = cls(window=window)
+        for log in logs:
+            summary.update(log)
+        return summary
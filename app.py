@@ -1,3 +1,5 @@
+import time
+
 import streamlit as st
 import pandas as pd
 from datetime import datetime
@@ -7,8 +9,18 @@ from risk_engine import HealthInput, HealthRiskEngine
 from database.firestore import (
     save_health_log,
     get_health_logs,
+    get_health_frame,
+    get_health_summary,
+    get_disagreement_report,
     save_bulk_health_logs
 )
+from database.repository import get_write_queue
+from monitoring.metrics import get_metrics, summarize_trace, timed
+
+render_start = time.perf_counter()
+metrics = get_metrics()
+# Per-rerun span breakdown, collected only while an operator has it switched on
+trace_token = metrics.begin_trace() if st.session_state.get("show_timings") else None
 
 # ---------------- CONFIG ----------------
 st.set_page_config(
@@ -17,6 +29,24 @@ st.set_page_config(
     layout="centered"
 )
 
+# ---------------- CACHED RESOURCES ----------------
+@st.cache_resource
+def get_engine():
+    return HealthRiskEngine()
+
+
+@st.cache_resource
+def get_model_registry():
+    from ml.model_registry import get_personal_registry
+    return get_personal_registry()
+
+
+def record_render_time(section, start):
+    seconds = time.perf_counter() - start
+    st.session_state.setdefault("render_ms", {})[section] = round(seconds * 1000, 1)
+    metrics.observe("app.section", seconds, section=section)
+
+
 # ---------------- AUTH ----------------
 if "user" not in st.session_state:
     auth_ui()
@@ -29,18 +59,33 @@ st.markdown("""
 """)
 
 st.sidebar.markdown(f"👤 **{st.session_state['user']}**")
+
+if get_write_queue() is not None:
+    st.sidebar.caption(f"⏳ Pending saves: {get_write_queue().depth()}")
 if st.sidebar.button("Logout"):
     st.session_state.clear()
     st.rerun()
 
+if st.session_state.get("render_ms"):
+    st.sidebar.caption(
+        "⏱️ Last render: "
+        + ", ".join(f"{k} {v} ms" for k, v in st.session_state["render_ms"].items())
+    )
+
+if st.sidebar.checkbox("Show timing breakdown", key="show_timings"):
+    if st.session_state.get("last_trace"):
+        st.sidebar.dataframe(
+            pd.DataFrame(summarize_trace(st.session_state["last_trace"])), hide_index=True
+        )
+    else:
+        st.sidebar.caption("Timings appear after the next rerun.")
+
 st.markdown("---")
 
 # ---------------- FETCH DATA ----------------
-user_logs = get_health_logs(st.session_state["user"], limit=30)
-
-df = None
-if user_logs:
-    df = pd.DataFrame(user_logs)
+@timed("app.build_frame")
+def build_dashboard_frame(logs):
+    df = pd.DataFrame(logs)
     df["timestamp"] = pd.to_datetime(df["timestamp"])
     df = df.sort_values("timestamp")
 
@@ -53,7 +98,20 @@ if user_logs:
         if col not in df.columns:
             df[col] = default
 
+    return df
+
+
+# Both reads are served from the per-user log cache between saves
+fetch_start = time.perf_counter()
+user = st.session_state["user"]
+user_logs = get_health_logs(user, limit=30)
+df = get_health_frame(user, build_dashboard_frame, limit=30)
+# Insight numbers come from the summary maintained on every save
+insights = get_health_summary(user).insights()
+record_render_time("fetch", fetch_start)
+
 # ================== DASHBOARD ==================
+dashboard_start = time.perf_counter()
 
 # -------- RISK TREND --------
 if df is not None and len(df) > 1:
@@ -61,9 +119,25 @@ if df is not None and len(df) > 1:
     st.line_chart(df.set_index("timestamp")[["risk_score"]])
 
 # -------- DISAGREEMENT TREND --------
+# Whole-history rates from the daily rollups, not the 30 logs above
 if df is not None:
     st.subheader("🧠 AI vs Rule Disagreement Trend")
-    st.area_chart(df.set_index("timestamp")[["ai_rule_disagree"]])
+    freq = st.radio("Group by", ["day", "week"], horizontal=True, key="disagree_freq")
+    disagreement = get_disagreement_report(user, freq=freq)
+    if len(disagreement.trend):
+        caption = (
+            f"{disagreement.disagreements} of {disagreement.logs} logs disagree "
+            f"({disagreement.disagree_rate:.0%})"
+        )
+        if pd.notna(disagreement.mean_ml_probability):
+            caption += f" · mean AI probability {disagreement.mean_ml_probability:.1f}%"
+        st.caption(caption)
+        # Stored probabilities are percentages; put the rate on the same scale
+        st.line_chart(disagreement.trend.set_index("period").assign(
+            disagree_pct=lambda t: t["disagree_rate"] * 100
+        )[["disagree_pct", "mean_ml_probability"]])
+        if not disagreement.confusion.empty:
+            st.dataframe(disagreement.confusion, use_container_width=True)
 
 # -------- HISTORY TABLE --------
 st.subheader("📊 Health History")
@@ -86,24 +160,20 @@ else:
 # ================== INSIGHTS ==================
 st.subheader("🧠 Health Insights")
 
-if df is not None and len(df) >= 3:
-    recent = df.tail(3)
-
-    if recent["risk_score"].iloc[-1] > recent["risk_score"].iloc[0]:
+if "risk_increasing" in insights:
+    if insights["risk_increasing"]:
         st.warning("🔴 Risk is increasing recently.")
     else:
         st.success("🟢 Risk is stable or improving.")
 
-    if recent["stress"].mean() >= 7:
+    if insights["high_stress"]:
         st.warning("⚠️ High stress detected.")
-    if recent["sleep"].mean() < 6:
+    if insights["low_sleep"]:
         st.warning("💤 Low sleep duration detected.")
 
 # ================== HEALTH CHANGE ==================
-from analysis.health_trends import compute_health_change
-
 st.subheader("📉 Health Change Summary")
-change_score = compute_health_change(df)
+change_score = insights["change_score"]
 
 if change_score is None:
     st.info("Not enough data.")
@@ -116,108 +186,183 @@ else:
 
 # ================== CORRELATION ==================
 st.subheader("🔍 What’s affecting your risk?")
-if df is not None and len(df) >= 5:
-    corr = df[["risk_score", "stress", "sleep"]].corr()
-    if corr.loc["risk_score", "stress"] > 0.4:
+if "stress_corr" in insights:
+    if insights["stress_corr"] > 0.4:
         st.warning("📈 Stress strongly increases risk.")
-    if corr.loc["risk_score", "sleep"] < -0.4:
+    if insights["sleep_corr"] < -0.4:
         st.warning("💤 Better sleep reduces risk.")
 
+record_render_time("dashboard", dashboard_start)
+
 # ================== SIMULATION ==================
-with st.expander("🧪 Simulation & Testing Tools"):
-    from simulation.health_simulator import generate_health_logs
-
-    col1, col2 = st.columns(2)
-    with col1:
-        pattern = st.selectbox("Pattern", ["worsening", "improving"])
-    with col2:
-        days = st.slider("Days", 7, 60, 30)
-
-    if st.button("🚀 Generate Simulated Data"):
-        logs = generate_health_logs(days=days, base_age=25, pattern=pattern)
-        save_bulk_health_logs(st.session_state["user"], logs)
-        st.success("Simulation data added.")
-        st.rerun()
+# Each tool below is a fragment: its widgets rerun only that function.
+@st.fragment
+def simulation_section():
+    fragment_start = time.perf_counter()
+
+    with st.expander("🧪 Simulation & Testing Tools"):
+        from simulation.health_simulator import generate_health_logs
+
+        col1, col2 = st.columns(2)
+        with col1:
+            pattern = st.selectbox("Pattern", ["worsening", "improving"])
+        with col2:
+            days = st.slider("Days", 7, 60, 30)
+
+        if st.button("🚀 Generate Simulated Data"):
+            logs = generate_health_logs(days=days, base_age=25, pattern=pattern)
+            report = save_bulk_health_logs(user, logs)
+            if report.failed:
+                st.error(f"{report.failed} simulated logs could not be saved.")
+            else:
+                st.success("Simulation data added.")
+                st.rerun()
+
+    record_render_time("simulation", fragment_start)
+
+
+# ================== WHAT-IF SCENARIOS ==================
+@st.fragment
+def what_if_section(user_logs):
+    fragment_start = time.perf_counter()
+
+    with st.expander("🔮 What-if Scenarios"):
+        from simulation.scenarios import (
+            Scenario,
+            run_scenarios,
+            start_from_logs,
+            worsening_probability
+        )
 
-# ================== MODEL TRAINING ==================
-with st.expander("🤖 Model Training"):
-    if st.button("Train Personal Model"):
-        from ml.dataset_builder import build_dataset
-        from ml.train_model import train_risk_model
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            extra_sleep = st.slider("Sleep change (h)", -2.0, 3.0, 1.0, 0.5)
+        with col2:
+            stress_change = st.slider("Stress change", -5, 3, -2)
+        with col3:
+            horizon = st.slider("Horizon (days)", 7, 90, 30)
+
+        if st.button("Run Scenarios"):
+            if not user_logs:
+                st.info("Add a health log first; scenarios start from your latest one.")
+            else:
+                report = run_scenarios(
+                    start_from_logs(user_logs),
+                    [
+                        Scenario("current habits"),
+                        Scenario("what if", sleep_hours=extra_sleep, stress=stress_change),
+                    ],
+                    days=horizon,
+                    p_worsen=worsening_probability(user_logs)
+                )
+                st.caption(
+                    f"{report.results[0].trajectories} trajectories per scenario · "
+                    f"{report.p_worsen:.0%} chance of a worse day · {report.seconds:.2f}s"
+                )
+                st.dataframe(pd.DataFrame(report.table()), hide_index=True)
+                st.line_chart(pd.DataFrame({
+                    r.scenario.name: r.quantiles(q=(0.5,))["p50"] for r in report.results
+                }))
+
+    record_render_time("what-if", fragment_start)
 
-        if df is None or len(df) < 20:
-            st.warning("Need at least 20 logs.")
-        else:
-            acc = train_risk_model(build_dataset(user_logs))
-            st.success(f"Model trained. Accuracy: {acc}%")
 
-    if st.button("Train Using Medical Dataset"):
-        from ml.external_dataset_adapter import load_heart_dataset
-        from ml.train_external_model import train_from_external_data
+# ================== MODEL TRAINING ==================
+def show_cv_report(report):
+    st.caption(
+        f"{report.n_folds}-fold CV, best {report.best.params} · "
+        f"{report.fits} fits, {report.cache_hits} cached · {report.seconds:.2f}s"
+    )
+    st.dataframe(pd.DataFrame(report.table()), hide_index=True)
 
-        X, y = load_heart_dataset("data/heart.csv")
-        acc = train_from_external_data(X, y)
-        st.success(f"Medical model trained. Accuracy: {acc}%")
 
-# ================== INPUT FORM ==================
-st.markdown("## 🧾 Today’s Health Check")
-
-with st.container(border=True):
-    with st.form("health_form"):
-        c1, c2 = st.columns(2)
-        with c1:
-            age = st.number_input("Age", 1, 120, 25)
-            weight = st.number_input("Weight (kg)", 20.0, 300.0, 70.0)
-        with c2:
-            stress = st.slider("Stress Level", 1, 10, 5)
-            sleep = st.slider("Sleep Hours", 0.0, 12.0, 7.0)
-
-        urine = st.selectbox("Urine Frequency", ["normal", "increased"])
-        symptoms = st.multiselect(
-            "Symptoms",
-            [
-                "fatigue", "fever", "chest_pain",
-                "shortness_of_breath", "dizziness",
-                "frequent_urination"
-            ]
+@st.fragment
+def training_section(user_logs):
+    fragment_start = time.perf_counter()
+
+    with st.expander("🤖 Model Training"):
+        st.checkbox(
+            "Update personal model with every new log",
+            key="online_training",
+            help="Incremental updates, with a full refit every few hundred logs."
         )
 
-        submitted = st.form_submit_button("🧠 Assess My Health")
+        if st.button("Train Personal Model"):
+            from ml.dataset_builder import build_dataset
+            from ml.train_model import train_risk_model
 
-# ================== RISK ASSESSMENT ==================
-if submitted:
-    engine = HealthRiskEngine()
-    result = engine.assess_risk(
-        HealthInput(age, weight, stress, sleep, urine, symptoms)
-    )
+            if len(user_logs) < 20:
+                st.warning("Need at least 20 logs.")
+            else:
+                try:
+                    acc, report = train_risk_model(build_dataset(user_logs), user_email=user, with_report=True)
+                except ValueError as e:
+                    st.warning(str(e))
+                else:
+                    st.success(f"Model trained. Cross-validated accuracy: {acc}%")
+                    show_cv_report(report)
 
-    from ml.predictor import predict_risk
-    ml_prob, ml_label = predict_risk(
-        age=age,
-        cholesterol=200,
-        stress=stress,
-        sleep=sleep,
-        urine=0
-    )
+        if st.button("Train Using Medical Dataset"):
+            from ml.external_dataset_adapter import load_heart_dataset
+            from ml.train_external_model import train_from_external_data
 
-    ai_rule_disagree = result["risk_level"] != ml_label
+            X, y = load_heart_dataset("data/heart.csv")
+            acc, report = train_from_external_data(X, y, with_report=True)
+            st.success(f"Medical model trained. Cross-validated accuracy: {acc}%")
+            show_cv_report(report)
 
-    # -------- METRICS --------
-    st.subheader("⚖️ Risk Comparison")
-    c1, c2, c3 = st.columns(3)
-    c1.metric("Rule Risk", result["risk_level"])
-    c2.metric("AI Risk", ml_label)
-    c3.metric("AI Probability", f"{ml_prob}%")
+    record_render_time("training", fragment_start)
 
-    if ai_rule_disagree:
-        st.warning("⚠️ AI and rules disagree — monitor closely.")
-    else:
-        st.success("✅ AI and rules agree.")
 
-    # -------- SAVE --------
-    save_health_log(
-        st.session_state["user"],
-        {
+# ================== INPUT FORM ==================
+@st.fragment
+def health_check_section():
+    fragment_start = time.perf_counter()
+    st.markdown("## 🧾 Today’s Health Check")
+
+    with st.container(border=True):
+        with st.form("health_form"):
+            c1, c2 = st.columns(2)
+            with c1:
+                age = st.number_input("Age", 1, 120, 25)
+                weight = st.number_input("Weight (kg)", 20.0, 300.0, 70.0)
+            with c2:
+                stress = st.slider("Stress Level", 1, 10, 5)
+                sleep = st.slider("Sleep Hours", 0.0, 12.0, 7.0)
+
+            urine = st.selectbox("Urine Frequency", ["normal", "increased"])
+            symptoms = st.multiselect(
+                "Symptoms",
+                [
+                    "fatigue", "fever", "chest_pain",
+                    "shortness_of_breath", "dizziness",
+                    "frequent_urination"
+                ]
+            )
+
+            submitted = st.form_submit_button("🧠 Assess My Health")
+
+    # ================== RISK ASSESSMENT ==================
+    if submitted:
+        result = get_engine().assess_risk(
+            HealthInput(age, weight, stress, sleep, urine, symptoms)
+        )
+
+        ml_prob, ml_label, ml_source = get_model_registry().predict(
+            user,
+            {
+                "age": age,
+                "weight": weight,
+                "stress": stress,
+                "sleep": sleep,
+                "urine": 1 if urine == "increased" else 0
+            }
+        )
+
+        ai_rule_disagree = result["risk_level"] != ml_label
+
+        # -------- SAVE --------
+        saved_log = {
             "timestamp": datetime.utcnow(),
             "age": age,
             "weight": weight,
@@ -232,11 +377,67 @@ if submitted:
             "ml_risk_probability": ml_prob,
             "ai_rule_disagree": ai_rule_disagree
         }
-    )
+        save_health_log(user, saved_log)
+
+        training_status = None
+        if st.session_state.get("online_training"):
+            from itertools import chain
+            from database.firestore import stream_health_logs
+            from ml.online_model import get_online_trainer
+
+            trainer = get_online_trainer(
+                lambda user: chain.from_iterable(stream_health_logs(
+                    user, fields=["age", "weight", "stress", "sleep", "urine", "risk_level"]
+                ))
+            )
+            training_status = trainer.observe(user, saved_log)
+
+        # Show the result after a full rerun, so the dashboard includes the new log
+        st.session_state["last_assessment"] = {
+            "risk_level": result["risk_level"],
+            "ml_label": ml_label,
+            "ml_prob": ml_prob,
+            "ml_source": ml_source,
+            "ai_rule_disagree": ai_rule_disagree,
+            "training_status": training_status,
+        }
+        st.rerun()
+
+    assessment = st.session_state.pop("last_assessment", None)
+    if assessment:
+        # -------- METRICS --------
+        st.subheader("⚖️ Risk Comparison")
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Rule Risk", assessment["risk_level"])
+        c2.metric("AI Risk", assessment["ml_label"])
+        c3.metric("AI Probability", f"{assessment['ml_prob']}%")
+        st.caption(f"AI model: {assessment['ml_source']}")
+
+        if assessment["ai_rule_disagree"]:
+            st.warning("⚠️ AI and rules disagree — monitor closely.")
+        else:
+            st.success("✅ AI and rules agree.")
 
-    st.success("Health log saved successfully.")
+        st.success("Health log saved successfully.")
+
+        if assessment["training_status"] == "refit":
+            st.info("Personal model refit on your full history.")
+
+    record_render_time("health check", fragment_start)
+
+
+simulation_section()
+what_if_section(user_logs)
+training_section(user_logs)
+health_check_section()
 
 st.caption("⚠️ This app provides AI-assisted health insights, not medical advice.")
 
+record_render_time("app", render_start)
+
+if trace_token is not None:
+    st.session_state["last_trace"] = metrics.end_trace(trace_token)
+metrics.export()
+
     
      
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Wall time of fetching many users' recent logs: sequential get_logs loop
+vs database.cohort_fetch at several concurrency limits.
+
+Backends: the in-memory store with an added per-read delay standing in
+for a network round trip, and a local SQLite file as-is.
+Run from the repo root:  python -m benchmarks.bench_cohort_fetch
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from database.cohort_fetch import _combine, fetch_cohort_logs
+from database.memory import InMemoryRepository
+from database.sqlite_store import SQLiteRepository
+from simulation.health_simulator import cohort_to_logs, simulate_cohort
+
+USERS = 200
+DAYS = 60
+LIMIT = 30
+RTT_SECONDS = 0.02
+CONCURRENCY = [4, 16, 32]
+
+
+class NetworkedRepository(InMemoryRepository):
+    def get_logs(self, user_email, limit=30, fields=None):
+        time.sleep(RTT_SECONDS)
+        return super().get_logs(user_email, limit=limit, fields=fields)
+
+
+def _seed(repo):
+    df = simulate_cohort(USERS, DAYS, seed=0)
+    users = [f"user{i}@example.com" for i in range(USERS)]
+    for i, user_df in df.groupby("user"):
+        repo.save_bulk(users[i], cohort_to_logs(user_df))
+    return users
+
+
+def _sequential(repo, users):
+    start = time.perf_counter()
+    per_user = {user: repo.get_logs(user, limit=LIMIT) for user in users}
+    _combine(per_user, users)
+    return time.perf_counter() - start
+
+
+def _bench(name, repo, users):
+    sequential = _sequential(repo, users)
+    rows = [{"backend": name, "mode": "sequential", "seconds": round(sequential, 3)}]
+    for concurrency in CONCURRENCY:
+        result = asyncio.run(fetch_cohort_logs(repo, users, limit=LIMIT, concurrency=concurrency))
+        rows.append({
+            "backend": name,
+            "mode": f"concurrent x{concurrency}",
+            "seconds": result.seconds,
+            "speedup": round(sequential / result.seconds, 1),
+            "rows": len(result.frame),
+            "ok": result.ok,
+        })
+    return rows
+
+
+def run():
+    results = []
+    networked = NetworkedRepository()
+    results += _bench(f"memory + {RTT_SECONDS * 1000:.0f}ms RTT", networked, _seed(networked))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = SQLiteRepository(os.path.join(tmp, "bench.db"))
+        results += _bench("sqlite", sqlite, _seed(sqlite))
+        sqlite.close()
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
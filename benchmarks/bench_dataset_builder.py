@@ -0,0 +1,85 @@
+"""
+Peak RSS of build_dataset: streaming batches vs the original
+all-at-once implementation (list of dicts -> one DataFrame).
+
+Each case runs in a fresh subprocess so ru_maxrss is its own peak.
+Logs are generated chunk by chunk from the cohort simulator; the
+original implementation has to hold every log dict at once, so it is
+measured at LEGACY_ROWS and extrapolated linearly to ROWS.
+Run from the repo root:  python -m benchmarks.bench_dataset_builder
+"""
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from ml.dataset_builder import build_dataset
+from simulation.health_simulator import cohort_to_logs, iter_cohort_chunks
+
+ROWS = 10_000_000
+LEGACY_ROWS = 1_000_000
+DAYS = 200
+CHUNK_USERS = 500  # 100k logs per batch
+
+
+def legacy_build_dataset(logs):
+    df = pd.DataFrame(logs)
+    df = df.drop(columns=["timestamp", "recommended_action", "id"], errors="ignore")
+    df["urine"] = df["urine"].map({"normal": 0, "increased": 1})
+    df["target"] = df["risk_level"].map({"LOW": 0, "MEDIUM": 1, "HIGH": 1})
+    return df.dropna()
+
+
+def _log_batches(rows):
+    for chunk in iter_cohort_chunks(rows // DAYS, DAYS, seed=0, chunk_users=CHUNK_USERS):
+        yield cohort_to_logs(chunk)
+
+
+def _measure(impl, rows):
+    start = time.perf_counter()
+    if impl == "legacy":
+        logs = [log for batch in _log_batches(rows) for log in batch]
+        df = legacy_build_dataset(logs)
+    else:
+        df = build_dataset(_log_batches(rows))
+    return {
+        "impl": impl,
+        "rows": len(df),
+        "seconds": round(time.perf_counter() - start, 1),
+        "frame_mb": round(df.memory_usage(deep=True).sum() / 1e6, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _run_case(impl, rows):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_dataset_builder", impl, str(rows)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout)
+
+
+def run():
+    results = [
+        _run_case("legacy", LEGACY_ROWS),
+        _run_case("streaming", LEGACY_ROWS),
+        _run_case("streaming", ROWS),
+    ]
+    legacy = results[0]
+    results.append({
+        "impl": "legacy (extrapolated)",
+        "rows": ROWS,
+        "peak_rss_mb": round(legacy["peak_rss_mb"] * ROWS / LEGACY_ROWS, 1),
+        "frame_mb": round(legacy["frame_mb"] * ROWS / LEGACY_ROWS, 1),
+    })
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        print(json.dumps(_measure(sys.argv[1], int(sys.argv[2]))))
+    else:
+        print(json.dumps(run(), indent=2))
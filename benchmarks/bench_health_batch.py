@@ -0,0 +1,59 @@
+"""
+Memory held by N health inputs / logs in each representation:
+plain dataclass vs slotted HealthInput, and log dicts vs HealthBatch.
+
+Sizes are tracemalloc deltas while the objects are alive.
+Run from the repo root:  python -m benchmarks.bench_health_batch
+"""
+import gc
+import json
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+from health_batch import HealthBatch
+from risk_engine import HealthInput
+from simulation.health_simulator import cohort_to_logs, simulate_cohort
+
+N = 100_000
+
+# HealthInput as it was before slots=True
+PlainHealthInput = make_dataclass("PlainHealthInput", [(f.name, f.type) for f in fields(HealthInput)])
+
+
+def _held_mb(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return round(current / 1e6, 2)
+
+
+def run():
+    logs = cohort_to_logs(simulate_cohort(N // 100, days=100, seed=0))
+    inputs = HealthBatch.from_logs(logs).to_inputs()
+
+    def as_inputs(cls):
+        return lambda: [
+            cls(x.age, x.weight, x.stress_level, x.sleep_hours, x.urine_frequency, list(x.symptoms))
+            for x in inputs
+        ]
+
+    core = ("age", "weight", "stress", "sleep", "urine", "symptoms")
+    results = {
+        "rows": len(logs),
+        "inputs_plain_dataclass_mb": _held_mb(as_inputs(PlainHealthInput)),
+        "inputs_slotted_mb": _held_mb(as_inputs(HealthInput)),
+        "inputs_health_batch_mb": _held_mb(lambda: HealthBatch.from_inputs(inputs)),
+        "log_dicts_mb": _held_mb(lambda: [dict(log) for log in logs]),
+        "logs_health_batch_mb": _held_mb(lambda: HealthBatch.from_logs(logs)),
+        "core_log_dicts_mb": _held_mb(lambda: [{k: log[k] for k in core} for log in logs]),
+    }
+    results["slotted_saving"] = round(1 - results["inputs_slotted_mb"] / results["inputs_plain_dataclass_mb"], 3)
+    results["batch_vs_dicts_saving"] = round(1 - results["logs_health_batch_mb"] / results["log_dicts_mb"], 3)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
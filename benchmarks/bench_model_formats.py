@@ -0,0 +1,55 @@
+"""
+Cold-start comparison: pickled sklearn model vs exported JSON scorer.
+
+Each run happens in a fresh interpreter so import cost is included.
+Run from the repo root:  python -m benchmarks.bench_model_formats
+"""
+import json
+import subprocess
+import sys
+
+RUNS = 5
+
+PICKLE_PATH = """
+import time
+t0 = time.perf_counter()
+import pickle
+import numpy as np
+with open("ml/external_risk_model.pkl", "rb") as f:
+    model = pickle.load(f)
+t1 = time.perf_counter()
+model.predict_proba(np.array([[52, 212, 125, 168, 0]]))[0][1]
+t2 = time.perf_counter()
+print((t1 - t0) * 1000, (t2 - t1) * 1000)
+"""
+
+JSON_PATH = """
+import time
+t0 = time.perf_counter()
+from ml.linear_scorer import LinearScorer
+scorer = LinearScorer.load("ml/external_risk_model.json")
+t1 = time.perf_counter()
+scorer.predict_proba([[52, 212, 125, 168, 0]])[0]
+t2 = time.perf_counter()
+print((t1 - t0) * 1000, (t2 - t1) * 1000)
+"""
+
+
+def _run(code):
+    load, predict = [], []
+    for _ in range(RUNS):
+        out = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", code],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        load.append(float(out[0]))
+        predict.append(float(out[1]))
+    return {
+        "import_and_load_ms": round(min(load), 2),
+        "first_prediction_ms": round(min(predict), 2),
+    }
+
+
+if __name__ == "__main__":
+    results = {"pickle": _run(PICKLE_PATH), "json": _run(JSON_PATH)}
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,70 @@
+"""
+Update latency: one partial_fit step vs a full train_risk_model-style refit,
+as a user's history grows.
+
+Run from the repo root:  python -m benchmarks.bench_online_training
+"""
+import json
+import time
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+
+from ml.dataset_builder import FEATURES, build_dataset, encode_log
+from ml.online_model import OnlineRiskModel
+from simulation.health_simulator import generate_health_logs
+
+HISTORY_SIZES = [30, 100, 1000, 10000]
+REPEATS = 20
+
+
+def _history(n):
+    logs = []
+    patterns = ["improving", "worsening"]
+    while len(logs) < n:
+        pattern = patterns[(len(logs) // 15) % 2]
+        logs.extend(generate_health_logs(days=15, pattern=pattern))
+    return logs[:n]
+
+
+def _best_ms(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+def full_retrain(logs):
+    df = build_dataset(logs)
+    X_train, _, y_train, _ = train_test_split(
+        df[FEATURES], df["target"], test_size=0.2, random_state=42
+    )
+    LogisticRegression().fit(X_train, y_train)
+
+
+def run():
+    results = []
+    for n in HISTORY_SIZES:
+        logs = _history(n)
+        rows = [encode_log(log) for log in logs]
+        X = np.array([r[0] for r in rows])
+        y = np.array([r[1] for r in rows])
+
+        model = OnlineRiskModel().fit(X, y)
+        new_row, new_target = rows[-1]
+
+        results.append({
+            "history": n,
+            "full_retrain_ms": _best_ms(lambda: full_retrain(logs), max(3, REPEATS // 4)),
+            "incremental_update_ms": _best_ms(
+                lambda: model.partial_fit([new_row], [new_target]), REPEATS
+            ),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
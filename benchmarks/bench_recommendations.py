@@ -0,0 +1,49 @@
+"""
+Throughput of cohort recommendations: recommendation/batch.py against
+calling generate_recommendations once per user.
+
+The per-user loop is timed on a sample and extrapolated to the cohort.
+Run from the repo root:  python -m benchmarks.bench_recommendations
+"""
+import json
+import time
+
+import numpy as np
+
+from recommendation.batch import generate_recommendations_batch
+from recommendation.recommender import generate_recommendations
+from simulation.health_simulator import simulate_cohort
+
+USERS = 100_000
+DAYS = 30
+LOOP_SAMPLE = 2_000
+
+
+def run():
+    patterns = np.where(np.arange(USERS) % 2, "improving", "worsening")
+    df = simulate_cohort(USERS, DAYS, pattern=patterns, seed=0)
+    df["ml_risk_label"] = np.where(df["risk_score"] >= 50, "HIGH", "LOW")
+
+    start = time.perf_counter()
+    batch = generate_recommendations_batch(df)
+    batch_seconds = time.perf_counter() - start
+
+    sample = df[df["user"] < LOOP_SAMPLE]
+    start = time.perf_counter()
+    for _, user_logs in sample.groupby("user"):
+        last = user_logs.iloc[-1]
+        generate_recommendations(user_logs, last["risk_level"], last["ml_risk_label"])
+    loop_seconds = (time.perf_counter() - start) * USERS / LOOP_SAMPLE
+
+    return {
+        "users": USERS,
+        "rows": len(df),
+        "batch_seconds": round(batch_seconds, 3),
+        "batch_users_per_s": round(len(batch) / batch_seconds),
+        "loop_seconds_est": round(loop_seconds, 1),
+        "speedup": round(loop_seconds / batch_seconds, 1),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
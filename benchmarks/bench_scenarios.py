@@ -0,0 +1,41 @@
+"""
+Latency of run_scenarios for two scenarios (current habits and a what-if)
+at several trajectory counts, in-process vs the process pool.
+
+Run from the repo root:  python -m benchmarks.bench_scenarios
+"""
+import json
+import os
+import time
+
+from simulation.health_simulator import generate_health_logs
+from simulation.scenarios import Scenario, run_scenarios, start_from_logs
+
+TRAJECTORIES = [1_000, 5_000, 20_000, 100_000]
+DAYS = 30
+SCENARIOS = [Scenario("current habits"), Scenario("what if", sleep_hours=1, stress=-2)]
+
+
+def _time(start, trajectories, n_jobs):
+    run_scenarios(start, SCENARIOS, trajectories=1_000, days=DAYS, n_jobs=n_jobs)  # warm pool
+    begin = time.perf_counter()
+    run_scenarios(start, SCENARIOS, trajectories=trajectories, days=DAYS, n_jobs=n_jobs)
+    return round(time.perf_counter() - begin, 4)
+
+
+def run():
+    start = start_from_logs(generate_health_logs(30, seed=0))
+    cpus = os.cpu_count() or 1
+    results = []
+    for trajectories in TRAJECTORIES:
+        inline = _time(start, trajectories, 1)
+        row = {"trajectories": trajectories, "days": DAYS, "in_process_s": inline}
+        if cpus > 1:
+            pooled = _time(start, trajectories, cpus)
+            row.update({"pool_s": pooled, "workers": cpus, "speedup": round(inline / pooled, 2)})
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,64 @@
+"""
+Time and memory of the long-horizon trend analytics in analysis/health_trends.py.
+
+Each case is checked against a budget (seconds, peak MB of NumPy/pandas
+allocations traced with tracemalloc) and reported as JSON.
+Run from the repo root:  python -m benchmarks.bench_trend_analytics
+"""
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from analysis.health_trends import analyze_trends, ewma, rolling_means, rolling_slopes
+from simulation.health_simulator import simulate_cohort
+
+# (users, days, seconds budget, peak MB budget)
+CASES = [
+    (1, 5 * 365, 0.25, 20),
+    (2_000, 5 * 365, 10.0, 1_200),
+    (10_000, 365, 10.0, 1_200),
+]
+
+ANALYSES = {
+    "rolling_means": lambda df: rolling_means(df),
+    "rolling_slopes": lambda df: rolling_slopes(df),
+    "ewma": lambda df: ewma(df),
+    "analyze_trends": lambda df: analyze_trends(df),
+}
+
+
+def _measure(fn, df):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(df)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1e6
+
+
+def run():
+    results = []
+    for users, days, time_budget, mem_budget in CASES:
+        patterns = np.where(np.arange(users) % 2, "improving", "worsening")
+        df = simulate_cohort(users, days, pattern=patterns, seed=0)
+
+        for name, fn in ANALYSES.items():
+            seconds, peak_mb = _measure(fn, df)
+            results.append({
+                "analysis": name,
+                "users": users,
+                "days": days,
+                "rows": len(df),
+                "seconds": round(seconds, 3),
+                "peak_mb": round(peak_mb, 1),
+                "within_budget": seconds <= time_budget and peak_mb <= mem_budget,
+            })
+        del df
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
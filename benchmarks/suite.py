@@ -0,0 +1,293 @@
+"""
+Benchmark suite over the app's hot paths, each at several input sizes.
+
+Everything runs offline and in-process: inputs come from the seeded
+simulator, and anything a case would write (model pickles, CV and dataset
+caches) is redirected to a temporary directory. Results are JSON; compare
+them against a stored baseline to catch regressions.
+
+Run from the repo root:
+    python -m benchmarks.suite                      # print results
+    python -m benchmarks.suite --check              # compare to baseline, exit 1 on regression
+    python -m benchmarks.suite --save-baseline      # record a new baseline
+    python -m benchmarks.suite --quick              # smallest size of each case only
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+import ml.dataset_cache as dataset_cache
+import ml.train_external_model as train_external_model
+import ml.train_model as train_model
+from analysis.health_trends import compute_health_change
+from ml.dataset_builder import build_dataset
+from ml.external_dataset_adapter import load_heart_dataset
+from ml.predictor import get_registry, predict_risk
+from recommendation.recommender import generate_recommendations
+from risk_engine import HealthInput, HealthRiskEngine
+from simulation.health_simulator import cohort_to_logs, generate_health_logs, simulate_cohort
+from simulation.scenarios import Scenario, run_scenarios, start_from_logs
+
+BASELINE_PATH = "benchmarks/baseline.json"
+HEART_CSV = "data/heart.csv"
+THRESHOLD = 0.25  # median slower than baseline by more than this is a regression
+SYMPTOMS = ["fatigue", "fever", "chest_pain", "shortness_of_breath", "dizziness", "frequent_urination"]
+
+
+@contextlib.contextmanager
+def _patched(module, name, value):
+    old = getattr(module, name)
+    setattr(module, name, value)
+    try:
+        yield
+    finally:
+        setattr(module, name, old)
+
+
+# ---------------- INPUTS ----------------
+def _inputs(n):
+    rng = random.Random(n)
+    return [
+        HealthInput(
+            rng.randint(18, 90), rng.uniform(45, 110), rng.randint(1, 10), round(rng.uniform(3, 10), 1),
+            rng.choice(["normal", "increased"]), rng.sample(SYMPTOMS, rng.randint(0, 3))
+        )
+        for _ in range(n)
+    ]
+
+
+def _cohort_frame(rows, seed=0):
+    days = min(rows, 365)
+    return simulate_cohort(max(1, rows // days), days, seed=seed).head(rows)
+
+
+def _heart_csv(tmp, copies):
+    path = os.path.join(tmp, f"heart_x{copies}.csv")
+    if not os.path.exists(path):
+        pd.concat([pd.read_csv(HEART_CSV)] * copies, ignore_index=True).to_csv(path, index=False)
+    return path
+
+
+def _training_frame(rows):
+    # Mixed trajectories so both target classes are present
+    users = max(2, rows // 100)
+    patterns = np.where(np.arange(users) % 2, "improving", "worsening")
+    df = simulate_cohort(users, 100, pattern=patterns, seed=1).head(rows)
+    return build_dataset(cohort_to_logs(df))
+
+
+# ---------------- CASES ----------------
+# name -> (sizes, repeats, setup(size, tmp) -> (callable, items per call))
+def _assess_risk(n, tmp):
+    engine, inputs = HealthRiskEngine(), _inputs(n)
+    return lambda: [engine.assess_risk(x) for x in inputs], n
+
+
+def _predict_cold(n, tmp):
+    registry = get_registry()
+
+    def run():
+        for _ in range(n):
+            registry.invalidate()
+            predict_risk(45, 220, 7, 5.5, 1)
+    return run, n
+
+
+def _predict_warm(n, tmp):
+    predict_risk(45, 220, 7, 5.5, 1)
+    rows = _inputs(n)
+    return lambda: [predict_risk(x.age, 200, x.stress_level, x.sleep_hours, 0) for x in rows], n
+
+
+def _generate_logs(days, tmp):
+    return lambda: generate_health_logs(days=days, seed=0), days
+
+
+def _build_dataset(n, tmp):
+    logs = cohort_to_logs(_cohort_frame(n))
+    return lambda: build_dataset(logs), n
+
+
+def _load_heart(copies, tmp, cold):
+    path = _heart_csv(tmp, copies)
+    root = os.path.join(tmp, "dataset_cache")
+
+    def run():
+        if cold:
+            shutil.rmtree(root, ignore_errors=True)
+        with _patched(dataset_cache, "CACHE_ROOT", root):
+            load_heart_dataset(path)
+
+    if not cold:
+        run()
+    return run, copies * 1025
+
+
+def _train_personal(rows, tmp):
+    df = _training_frame(rows)
+    model_path = os.path.join(tmp, "risk_model.pkl")
+
+    def run():
+        with _patched(train_model, "MODEL_PATH", model_path):
+            train_model.train_risk_model(df, n_jobs=1, cache_dir=None)
+    return run, len(df)
+
+
+def _train_external(copies, tmp):
+    X, y = load_heart_dataset(_heart_csv(tmp, copies))
+    model_path = os.path.join(tmp, "external_risk_model.pkl")
+
+    def run():
+        with _patched(train_external_model, "MODEL_PATH", model_path):
+            train_external_model.train_from_external_data(X, y, n_jobs=1, cache_dir=None)
+    return run, len(X)
+
+
+def _health_change(rows, tmp):
+    df = _cohort_frame(rows)
+    return lambda: compute_health_change(df), rows
+
+
+def _recommendations(rows, tmp):
+    df = _cohort_frame(rows)
+    return lambda: generate_recommendations(df, "MEDIUM", "HIGH"), rows
+
+
+def _what_if(trajectories, tmp):
+    start = start_from_logs(generate_health_logs(30, seed=0))
+    scenarios = [Scenario("baseline"), Scenario("what if", sleep_hours=1, stress=-2)]
+    return lambda: run_scenarios(start, scenarios, trajectories=trajectories, n_jobs=1), trajectories * 2
+
+
+CASES = {
+    "assess_risk": ([100, 1_000, 10_000], 5, _assess_risk),
+    "predict_risk_cold": ([1, 10], 5, _predict_cold),
+    "predict_risk_warm": ([100, 1_000], 5, _predict_warm),
+    "generate_health_logs": ([30, 365, 3_650], 5, _generate_logs),
+    "build_dataset": ([1_000, 10_000, 100_000], 3, _build_dataset),
+    "load_heart_dataset_cold": ([1, 10, 100], 3, lambda n, tmp: _load_heart(n, tmp, cold=True)),
+    "load_heart_dataset_warm": ([1, 10, 100], 5, lambda n, tmp: _load_heart(n, tmp, cold=False)),
+    "train_risk_model": ([200, 2_000, 20_000], 3, _train_personal),
+    "train_from_external_data": ([1, 10], 3, _train_external),
+    "compute_health_change": ([30, 1_000, 100_000], 20, _health_change),
+    "generate_recommendations": ([30, 1_000, 100_000], 20, _recommendations),
+    "run_scenarios": ([1_000, 10_000], 3, _what_if),
+}
+
+
+# ---------------- RUNNER ----------------
+def _time(fn, repeats):
+    fn()  # warm-up (imports, first-call caches)
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run(names=None, quick=False):
+    results = []
+    with tempfile.TemporaryDirectory(prefix="wellpath-bench-") as tmp:
+        for name, (sizes, repeats, setup) in CASES.items():
+            if names and name not in names:
+                continue
+            for size in sizes[:1] if quick else sizes:
+                fn, items = setup(size, tmp)
+                times = _time(fn, repeats)
+                median = statistics.median(times)
+                results.append({
+                    "case": name,
+                    "size": size,
+                    "repeats": repeats,
+                    "min_s": round(min(times), 6),
+                    "median_s": round(median, 6),
+                    "per_item_us": round(median / max(items, 1) * 1e6, 3),
+                })
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Per (case, size): ratio of median to the baseline median and a status."""
+    previous = {(r["case"], r["size"]): r for r in baseline.get("results", [])}
+    rows = []
+    for r in results:
+        base = previous.get((r["case"], r["size"]))
+        if base is None:
+            rows.append({"case": r["case"], "size": r["size"], "status": "new"})
+            continue
+        ratio = r["median_s"] / base["median_s"] if base["median_s"] else float("inf")
+        status = "regression" if ratio > 1 + threshold else "improved" if ratio < 1 - threshold else "ok"
+        rows.append({
+            "case": r["case"],
+            "size": r["size"],
+            "baseline_median_s": base["median_s"],
+            "median_s": r["median_s"],
+            "ratio": round(ratio, 3),
+            "status": status,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WellPath benchmark suite")
+    parser.add_argument("--case", action="append", help="run only this case (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="smallest size of each case only")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any case regressed")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    report = {"environment": environment(), "results": run(args.case, args.quick)}
+
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report["results"], json.load(f), args.threshold)
+        report["threshold"] = args.threshold
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(text + "\n")
+
+    regressions = [c for c in report.get("comparison", []) if c["status"] == "regression"]
+    if args.check and regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Storage interface for health logs.
+
+Every backend stores logs per user, ordered by "timestamp". A log's "id"
+key, when present, is used as its document ID (so re-saving the same log
+overwrites instead of duplicating); otherwise the backend assigns one.
+Reads return records newest-first with "id" filled in.
+"""
+import uuid
+
+
+def split_id(log):
+    """Return (doc_id or None, log without its "id" key)."""
+    if "id" not in log:
+        return None, log
+    data = dict(log)
+    return data.pop("id"), data
+
+
+def project(record, fields):
+    """Keep only `fields` plus the keys every record carries."""
+    if fields is None:
+        return dict(record)
+    return {k: record[k] for k in (*fields, "timestamp", "id") if k in record}
+
+
+def new_id():
+    return uuid.uuid4().hex
+
+
+class HealthLogRepository:
+    name = "base"
+
+    def save(self, user_email, log):
+        """Store one log, return its document ID."""
+        raise NotImplementedError
+
+    def save_bulk(self, user_email, logs):
+        """Store many logs, return their document IDs."""
+        raise NotImplementedError
+
+    def get_page(
+        self,
+        user_email,
+        page_size,
+        cursor=None,
+        start=None,
+        end=None,
+        descending=True,
+        fields=None
+    ):
+        """
+        One page of a user's logs ordered by timestamp, optionally limited
+        to start <= timestamp < end. With `fields`, only those keys (plus
+        "timestamp" and "id") are fetched. Returns (records, next_cursor);
+        next_cursor is None on the last page and is otherwise passed back
+        unchanged to fetch the following page.
+        """
+        raise NotImplementedError
+
+    def list_users(self):
+        """Every user_email with stored logs."""
+        raise NotImplementedError
+
+    def get_summary(self, user_email):
+        """The stored per-user summary dict, or None."""
+        raise NotImplementedError
+
+    def save_summary(self, user_email, summary):
+        raise NotImplementedError
+
+    def get_rollups(self, user_email=None, start=None, end=None):
+        """
+        Stored daily rollups (see analysis.disagreement) with start <= day
+        < end ("YYYY-MM-DD" strings), each carrying "user" and "day".
+        user_email=None returns every user's.
+        """
+        raise NotImplementedError
+
+    def save_rollups(self, user_email, rollups):
+        """Insert or replace rollups by day."""
+        raise NotImplementedError
+
+    def get_logs(self, user_email, limit=30, fields=None):
+        records, _ = self.get_page(user_email, limit, fields=fields)
+        return records
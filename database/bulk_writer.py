@@ -0,0 +1,106 @@
+"""
+Chunked, concurrent bulk ingestion.
+
+Logs are consumed lazily from any iterable, cut into chunks of at most
+MAX_BATCH_SIZE (Firestore's per-batch write limit) and committed through
+a bounded thread pool. Every log gets its document ID before the first
+attempt, so retrying a chunk overwrites instead of duplicating.
+"""
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import List, Optional
+
+from database.base import new_id
+
+MAX_BATCH_SIZE = 500
+MAX_WORKERS = 4
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+
+
+@dataclass
+class ChunkResult:
+    index: int
+    size: int
+    attempts: int
+    seconds: float
+    error: Optional[str] = None
+
+
+@dataclass
+class BulkWriteReport:
+    written: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    chunks: List[ChunkResult] = field(default_factory=list)
+
+    @property
+    def logs_per_second(self):
+        return self.written / self.seconds if self.seconds else 0.0
+
+    @property
+    def failed_chunks(self):
+        return [c for c in self.chunks if c.error is not None]
+
+
+def _chunks(logs, size):
+    it = iter(logs)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield [log if "id" in log else {**log, "id": new_id()} for log in chunk]
+
+
+def _commit(repository, user_email, index, chunk, max_retries, backoff):
+    start = time.perf_counter()
+    for attempt in range(1, max_retries + 2):
+        try:
+            repository.save_bulk(user_email, chunk)
+            return ChunkResult(index, len(chunk), attempt, time.perf_counter() - start)
+        except Exception as e:
+            if attempt > max_retries:
+                return ChunkResult(
+                    index, len(chunk), attempt, time.perf_counter() - start, repr(e)
+                )
+            # Exponential backoff with jitter
+            time.sleep(backoff * (2 ** (attempt - 1)) * (0.5 + random.random()))
+
+
+def bulk_save(
+    repository,
+    user_email,
+    logs,
+    chunk_size=MAX_BATCH_SIZE,
+    max_workers=MAX_WORKERS,
+    max_retries=MAX_RETRIES,
+    backoff=BACKOFF_SECONDS
+):
+    if not 1 <= chunk_size <= MAX_BATCH_SIZE:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_BATCH_SIZE}")
+
+    report = BulkWriteReport()
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = set()
+        for index, chunk in enumerate(_chunks(logs, chunk_size)):
+            # Bound in-flight chunks so generators are not drained into memory
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                report.chunks.extend(f.result() for f in done)
+
+            pending.add(pool.submit(
+                _commit, repository, user_email, index, chunk, max_retries, backoff
+            ))
+
+        report.chunks.extend(f.result() for f in wait(pending).done)
+
+    report.chunks.sort(key=lambda c: c.index)
+    report.seconds = time.perf_counter() - start
+    report.written = sum(c.size for c in report.chunks if c.error is None)
+    report.failed = sum(c.size for c in report.failed_chunks)
+    return report
@@ -0,0 +1,111 @@
+"""
+Concurrent recent-history fetch for many users at once.
+
+Repository reads are blocking, so each user's read runs in a worker
+thread while asyncio bounds how many run at a time (a semaphore), gives
+each user a timeout, and collects failures instead of aborting the whole
+fetch. Results come back as one long DataFrame with a `user` column.
+
+A timed-out read cannot be interrupted inside its thread; it is reported
+as timed out, its late result is discarded and it stops counting against
+`concurrency`. The pool grows past `concurrency` threads only to replace
+such abandoned reads, so they can't starve the users after them.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import pandas as pd
+
+from monitoring.metrics import get_metrics
+
+CONCURRENCY = 8
+TIMEOUT_SECONDS = 5.0
+
+
+@dataclass
+class CohortFetchResult:
+    frame: pd.DataFrame
+    counts: Dict[str, int] = field(default_factory=dict)  # user -> logs fetched
+    failed: Dict[str, str] = field(default_factory=dict)  # user -> error
+    timed_out: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def ok(self):
+        return not self.failed and not self.timed_out
+
+
+def _combine(per_user, users):
+    frames = []
+    for user in users:
+        logs = per_user.get(user)
+        if logs:
+            df = pd.DataFrame.from_records(logs)
+            df.insert(0, "user", user)
+            frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=["user", "timestamp"])
+
+    df = pd.concat(frames, ignore_index=True)
+    if "timestamp" in df:
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        df = df.sort_values(["user", "timestamp"], kind="stable", ignore_index=True)
+    return df
+
+
+async def fetch_cohort_logs(
+    repository,
+    users,
+    limit=30,
+    fields=None,
+    concurrency=CONCURRENCY,
+    timeout=TIMEOUT_SECONDS
+):
+    """
+    Each user's `limit` most recent logs, at most `concurrency` reads in
+    flight. Returns a CohortFetchResult; per-user errors and timeouts are
+    reported there rather than raised.
+    """
+    users = list(dict.fromkeys(users))
+    start = time.perf_counter()
+    metrics = get_metrics()
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    per_user, failed, timed_out = {}, {}, []
+
+    # Own pool so slow reads can't starve the loop's default executor. Threads
+    # start lazily and idle ones are reused, so with the semaphore at most
+    # `concurrency` live reads plus the abandoned ones hold a thread, and every
+    # read starts (and its timeout runs) as soon as it gets a semaphore slot.
+    executor = ThreadPoolExecutor(
+        max_workers=max(concurrency, len(users)), thread_name_prefix="wellpath-cohort"
+    )
+
+    async def fetch(user):
+        async with semaphore:
+            read = loop.run_in_executor(executor, lambda: repository.get_logs(user, limit=limit, fields=fields))
+            try:
+                with metrics.timer("db.cohort_read"):
+                    per_user[user] = await asyncio.wait_for(read, timeout)
+            except asyncio.TimeoutError:
+                timed_out.append(user)
+            except Exception as e:
+                failed[user] = repr(e)
+
+    try:
+        await asyncio.gather(*(fetch(user) for user in users))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    metrics.incr("db.cohort_users", len(per_user))
+    return CohortFetchResult(
+        frame=_combine(per_user, users),
+        counts={user: len(per_user[user]) for user in users if user in per_user},
+        failed=failed,
+        timed_out=[u for u in users if u in timed_out],
+        seconds=round(time.perf_counter() - start, 4),
+    )
@@ -1,42 +1,255 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+import asyncio
 
-# Prevent re-initialization error
-if not firebase_admin._apps:
-    cred = credentials.Certificate("config/serviceAccountKey.json")
-    firebase_admin.initialize_app(cred)
+from analysis.disagreement import day_of, disagreement_report
+from database.base import HealthLogRepository, split_id
+from database.bulk_writer import MAX_BATCH_SIZE, bulk_save
+from database.cohort_fetch import fetch_cohort_logs
+from database.log_cache import get_log_cache
+from database.repository import get_repository, get_write_queue
+from database.rollups import get_rollup_store
+from database.streaming import iter_log_batches, iter_log_frames
+from database.summaries import get_summary_store
+from monitoring.metrics import get_metrics
+
+CREDENTIALS_PATH = "config/serviceAccountKey.json"
+
+
+class FirestoreRepository(HealthLogRepository):
+    """
+    users/{email}/health_logs/{id} in Cloud Firestore. The client is
+    created on first use, so importing this module needs no credentials.
+    """
+
+    name = "firestore"
+
+    def __init__(self, credentials_path=CREDENTIALS_PATH):
+        self.credentials_path = credentials_path
+        self._db = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            import firebase_admin
+            from firebase_admin import credentials, firestore
+
+            # Prevent re-initialization error
+            if not firebase_admin._apps:
+                cred = credentials.Certificate(self.credentials_path)
+                firebase_admin.initialize_app(cred)
+
+            self._db = firestore.client()
+        return self._db
+
+    def _logs_ref(self, user_email):
+        return self.db.collection("users").document(user_email).collection("health_logs")
+
+    def save(self, user_email, log):
+        doc_id, data = split_id(log)
+        if doc_id is not None:
+            self._logs_ref(user_email).document(doc_id).set(data)
+            return doc_id
+        _, doc_ref = self._logs_ref(user_email).add(data)
+        return doc_ref.id
+
+    def save_bulk(self, user_email, logs):
+        """Sequential commits of at most MAX_BATCH_SIZE writes each."""
+        logs_ref = self._logs_ref(user_email)
+        logs = list(logs)
+
+        ids = []
+        for i in range(0, len(logs), MAX_BATCH_SIZE):
+            batch = self.db.batch()
+            for log in logs[i:i + MAX_BATCH_SIZE]:
+                doc_id, data = split_id(log)
+                doc_ref = logs_ref.document(doc_id) if doc_id else logs_ref.document()
+                batch.set(doc_ref, data)
+                ids.append(doc_ref.id)
+            with get_metrics().timer("firestore.commit"):
+                batch.commit()
+
+        return ids
+
+    def list_users(self):
+        # User documents may exist only as parents of their subcollections
+        return [doc.id for doc in self.db.collection("users").list_documents()]
+
+    def _summary_ref(self, user_email):
+        return (
+            self.db.collection("users").document(user_email)
+            .collection("summaries").document("health")
+        )
+
+    def get_summary(self, user_email):
+        snapshot = self._summary_ref(user_email).get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    def save_summary(self, user_email, summary):
+        self._summary_ref(user_email).set(summary)
+
+    def _rollups_ref(self, user_email):
+        return self.db.collection("users").document(user_email).collection("rollups")
+
+    def get_rollups(self, user_email=None, start=None, end=None):
+        """One small document per user-day; all users via a collection-group query."""
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        if user_email is None:
+            query = self.db.collection_group("rollups")
+        else:
+            query = self._rollups_ref(user_email)
+        if start is not None:
+            query = query.where(filter=FieldFilter("day", ">=", start))
+        if end is not None:
+            query = query.where(filter=FieldFilter("day", "<", end))
+
+        with get_metrics().timer("firestore.query"):
+            return [doc.to_dict() for doc in query.stream()]
+
+    def save_rollups(self, user_email, rollups):
+        rollups_ref = self._rollups_ref(user_email)
+        rollups = list(rollups)
+        for i in range(0, len(rollups), MAX_BATCH_SIZE):
+            batch = self.db.batch()
+            for rollup in rollups[i:i + MAX_BATCH_SIZE]:
+                batch.set(rollups_ref.document(rollup["day"]), {**rollup, "user": user_email})
+            with get_metrics().timer("firestore.commit"):
+                batch.commit()
+
+    def get_page(
+        self, user_email, page_size, cursor=None, start=None, end=None, descending=True, fields=None
+    ):
+        from firebase_admin import firestore
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+        query = self._logs_ref(user_email)
+
+        if start is not None:
+            query = query.where(filter=FieldFilter("timestamp", ">=", start))
+        if end is not None:
+            query = query.where(filter=FieldFilter("timestamp", "<", end))
+
+        if fields is not None:
+            # Server-side projection; timestamp is needed for cursors
+            query = query.select([f for f in dict.fromkeys([*fields, "timestamp"]) if f != "id"])
+
+        query = query.order_by("timestamp", direction=direction)
+        if cursor is not None:
+            query = query.start_after(cursor)
+
+        with get_metrics().timer("firestore.query"):
+            docs = list(query.limit(page_size).stream())
+
+        data = []
+        for doc in docs:
+            record = doc.to_dict()
+            record["id"] = doc.id
+            data.append(record)
+
+        # The last snapshot doubles as the cursor for the next page
+        next_cursor = docs[-1] if len(docs) == page_size else None
+        return data, next_cursor
+
+
+def _load_logs(user_email, limit):
+    metrics = get_metrics()
+    with metrics.timer("db.read"):
+        logs = get_repository().get_logs(user_email, limit=limit)
+    metrics.incr("db.logs_read", len(logs))
+    return logs
 
-db = firestore.client()
 
 def save_health_log(user_email, data):
-    doc_ref = db.collection("users").document(user_email)
-    doc_ref.collection("health_logs").add(data)
+    """
+    Store one log. With write-behind enabled the log is queued locally
+    and committed in the background; the ID is the same either way, and
+    only in-memory state is updated here, so a slow or unreachable
+    backend never fails a save that was accepted.
+    """
+    metrics = get_metrics()
+    queue = get_write_queue()
+    with metrics.timer("db.save", mode="queued" if queue is not None else "direct"):
+        if queue is not None:
+            doc_id = queue.enqueue(user_email, data)
+        else:
+            doc_id = get_repository().save(user_email, data)
+    saved = {**data, "id": doc_id}
+    get_log_cache().append(user_email, saved)
+    with metrics.timer("db.summary_update"):
+        if queue is not None:
+            get_summary_store().record_local(user_email, saved)  # persisted after commit
+        else:
+            get_summary_store().record(user_email, saved)
+    with metrics.timer("db.rollup_update"):
+        if queue is not None:
+            get_rollup_store().record_local(user_email, saved)
+        else:
+            get_rollup_store().record(user_email, saved)
+    metrics.incr("db.logs_saved")
+    return doc_id
+
 
 def get_health_logs(user_email, limit=30):
-    logs_ref = (
-        db.collection("users")
-        .document(user_email)
-        .collection("health_logs")
-        .order_by("timestamp", direction=firestore.Query.DESCENDING)
-        .limit(limit)
+    return get_log_cache().get_logs(user_email, limit, _load_logs)
+
+
+def get_health_summary(user_email):
+    """The user's incrementally maintained UserSummary."""
+    return get_summary_store().get(user_email)
+
+
+def get_disagreement_report(user_email=None, freq="day", start=None, end=None):
+    """
+    AI-vs-rule disagreement rate, mean ML probability and confusion matrix
+    by day or week, from the daily rollups maintained on save. Covers the
+    user's whole history (or every user's with user_email=None), limited
+    to start <= day < end when given.
+    """
+    with get_metrics().timer("db.rollup_read"):
+        rollups = get_rollup_store().get(user_email, day_of(start), day_of(end))
+    return disagreement_report(rollups, freq)
+
+
+def get_health_frame(user_email, build_frame, limit=30):
+    """Cached build_frame(get_health_logs(...)); None when there are no logs."""
+    return get_log_cache().get_frame(user_email, limit, _load_logs, build_frame)
+
+
+def stream_health_logs(user_email, fields=None, start=None, end=None, **options):
+    """Yield record batches over the user's whole history (uncached)."""
+    return iter_log_batches(
+        get_repository(), user_email, fields=fields, start=start, end=end, **options
     )
 
-    docs = logs_ref.stream()
 
-    data = []
-    for doc in docs:
-        record = doc.to_dict()
-        record["id"] = doc.id
-        data.append(record)
+def stream_health_frames(user_email, fields=None, start=None, end=None, **options):
+    """Yield DataFrame chunks over the user's whole history (uncached)."""
+    return iter_log_frames(
+        get_repository(), user_email, fields=fields, start=start, end=end, **options
+    )
 
-    return data
 
-def save_bulk_health_logs(user_email, logs):
-    user_ref = db.collection("users").document(user_email)
-    batch = db.batch()
+def get_cohort_logs(user_emails, limit=30, fields=None, **options):
+    """
+    Recent logs of many users fetched concurrently, as one long DataFrame
+    in a CohortFetchResult. See database.cohort_fetch for options.
+    """
+    return asyncio.run(
+        fetch_cohort_logs(get_repository(), user_emails, limit=limit, fields=fields, **options)
+    )
 
-    for log in logs:
-        doc_ref = user_ref.collection("health_logs").document()
-        batch.set(doc_ref, log)
 
-    batch.commit()
+def save_bulk_health_logs(user_email, logs, **options):
+    """
+    Chunked, concurrent upload of any iterable of logs.
+    Returns a BulkWriteReport; see database.bulk_writer for options.
+    """
+    try:
+        with get_metrics().timer("db.save_bulk"):
+            report = bulk_save(get_repository(), user_email, logs, **options)
+        get_metrics().incr("db.logs_saved", report.written)
+        return report
+    finally:
+        get_log_cache().invalidate(user_email)
+        get_summary_store().rebuild(user_email)
+        get_rollup_store().rebuild(user_email)
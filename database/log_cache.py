@@ -0,0 +1,144 @@
+"""
+Read-through cache of each user's most recent logs.
+
+Entries expire after `ttl` seconds and the least recently used users are
+evicted past `max_users`. Saves append to (or invalidate) the entry, so
+a rerun right after a save still hits. Derived objects such as the
+dashboard DataFrame are cached per entry version.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+TTL_SECONDS = 300
+MAX_USERS = 256
+
+
+class _Entry:
+    __slots__ = ("logs", "limit", "loaded_at", "version", "generation", "frames")
+
+    def __init__(self, logs, limit, version, generation):
+        self.logs = logs  # newest first
+        self.limit = limit
+        self.loaded_at = time.monotonic()
+        self.version = version
+        self.generation = generation  # changes whenever the cached logs change
+        self.frames = {}  # limit -> DataFrame
+
+
+class LogCache:
+    def __init__(self, ttl=TTL_SECONDS, max_users=MAX_USERS):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "appends": 0}
+
+    def _fresh(self, user_email, limit):
+        entry = self._entries.get(user_email)
+        if entry is None or time.monotonic() - entry.loaded_at > self.ttl:
+            return None
+        if entry.limit < limit and len(entry.logs) >= entry.limit:
+            return None  # cached a shorter window than requested
+        self._entries.move_to_end(user_email)
+        return entry
+
+    def get_logs(self, user_email, limit, loader):
+        with self._lock:
+            entry = self._fresh(user_email, limit)
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry.logs[:limit]
+            self.stats["misses"] += 1
+            version = self._versions.get(user_email, 0)
+
+        logs = loader(user_email, limit)
+
+        with self._lock:
+            # Skip caching if a save landed while we were loading
+            if self._versions.get(user_email, 0) == version:
+                self._generation += 1
+                self._entries[user_email] = _Entry(logs, limit, version, self._generation)
+                self._entries.move_to_end(user_email)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+        return logs[:limit]
+
+    def get_frame(self, user_email, limit, loader, build_frame):
+        """build_frame(logs) -> DataFrame, rebuilt only when the logs change."""
+        logs = self.get_logs(user_email, limit, loader)
+
+        with self._lock:
+            entry = self._entries.get(user_email)
+            if entry is not None and limit in entry.frames:
+                return entry.frames[limit]
+
+        frame = build_frame(logs) if logs else None
+
+        with self._lock:
+            current = self._entries.get(user_email)
+            if current is not None and current is entry:
+                current.frames[limit] = frame
+        return frame
+
+    def data_version(self, user_email):
+        """
+        Token that changes whenever the user's cached logs change; usable
+        as a cache key for anything derived from them.
+        """
+        with self._lock:
+            entry = self._entries.get(user_email)
+            if entry is not None:
+                return entry.generation
+            # Not cached: hand out a token nobody has seen before
+            self._generation += 1
+            return self._generation
+
+    def _bump(self, user_email):
+        self._versions[user_email] = self._versions.get(user_email, 0) + 1
+
+    def append(self, user_email, record):
+        """Record a freshly saved log; falls back to invalidation if out of order."""
+        with self._lock:
+            self._bump(user_email)
+            entry = self._entries.get(user_email)
+            if entry is None:
+                return
+
+            head = entry.logs[0].get("timestamp") if entry.logs else None
+            try:
+                in_order = head is None or record.get("timestamp") >= head
+            except TypeError:  # e.g. naive vs tz-aware timestamps
+                in_order = False
+
+            if not in_order:
+                del self._entries[user_email]
+                self.stats["invalidations"] += 1
+                return
+
+            entry.logs = [record] + entry.logs[:entry.limit - 1]
+            entry.version = self._versions[user_email]
+            self._generation += 1
+            entry.generation = self._generation
+            entry.frames = {}
+            self.stats["appends"] += 1
+
+    def invalidate(self, user_email):
+        with self._lock:
+            self._bump(user_email)
+            if self._entries.pop(user_email, None) is not None:
+                self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = LogCache()
+
+
+def get_log_cache():
+    return _cache
@@ -0,0 +1,94 @@
+import copy
+import threading
+from datetime import datetime
+
+from database.base import HealthLogRepository, new_id, project, split_id
+
+
+def _sort_key(record):
+    ts = record.get("timestamp")
+    return (ts if isinstance(ts, datetime) else datetime.min, record["id"])
+
+
+class InMemoryRepository(HealthLogRepository):
+    """Process-local store for tests, benchmarks and offline runs."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._logs = {}    # user_email -> {id: record}
+        self._sorted = {}  # user_email -> records sorted by (timestamp, id)
+        self._summaries = {}
+        self._rollups = {}  # user_email -> {day: rollup}
+        self._lock = threading.Lock()
+
+    def _insert(self, user_email, log):
+        doc_id, data = split_id(log)
+        record = {**data, "id": doc_id or new_id()}
+        self._logs.setdefault(user_email, {})[record["id"]] = record
+        self._sorted.pop(user_email, None)
+        return record["id"]
+
+    def save(self, user_email, log):
+        with self._lock:
+            return self._insert(user_email, log)
+
+    def save_bulk(self, user_email, logs):
+        with self._lock:
+            return [self._insert(user_email, log) for log in logs]
+
+    def list_users(self):
+        with self._lock:
+            return [user for user, logs in self._logs.items() if logs]
+
+    def get_summary(self, user_email):
+        with self._lock:
+            summary = self._summaries.get(user_email)
+            return dict(summary) if summary is not None else None
+
+    def save_summary(self, user_email, summary):
+        with self._lock:
+            self._summaries[user_email] = dict(summary)
+
+    def get_rollups(self, user_email=None, start=None, end=None):
+        with self._lock:
+            users = [user_email] if user_email is not None else list(self._rollups)
+            return [
+                {**copy.deepcopy(rollup), "user": user}
+                for user in users
+                for day, rollup in sorted(self._rollups.get(user, {}).items())
+                if (start is None or day >= start) and (end is None or day < end)
+            ]
+
+    def save_rollups(self, user_email, rollups):
+        with self._lock:
+            days = self._rollups.setdefault(user_email, {})
+            for rollup in rollups:
+                days[rollup["day"]] = copy.deepcopy(rollup)
+
+    def _rows(self, user_email):
+        with self._lock:
+            rows = self._sorted.get(user_email)
+            if rows is None:
+                rows = sorted(self._logs.get(user_email, {}).values(), key=_sort_key)
+                self._sorted[user_email] = rows
+            return rows
+
+    def get_page(
+        self, user_email, page_size, cursor=None, start=None, end=None, descending=True, fields=None
+    ):
+        rows = self._rows(user_email)
+
+        if start is not None or end is not None:
+            rows = [
+                r for r in rows
+                if (start is None or r["timestamp"] >= start)
+                and (end is None or r["timestamp"] < end)
+            ]
+        if descending:
+            rows = rows[::-1]
+
+        offset = cursor or 0
+        page = [project(r, fields) for r in rows[offset:offset + page_size]]
+        next_cursor = offset + page_size if offset + page_size < len(rows) else None
+        return page, next_cursor
@@ -0,0 +1,77 @@
+"""
+Backend selection for health-log storage.
+
+WELLPATH_DB_BACKEND picks the implementation:
+  firestore (default)  Cloud Firestore, credentials from config/serviceAccountKey.json
+  sqlite               local file at WELLPATH_SQLITE_PATH
+  memory               in-process, lost on restart
+
+WELLPATH_WRITE_BEHIND=1 routes save_health_log through a durable local
+queue (WELLPATH_QUEUE_PATH) that commits to the backend in the background;
+the per-user summaries and rollups are then persisted by the queue's worker after
+each commit rather than on the save itself.
+"""
+import os
+import threading
+
+DEFAULT_BACKEND = "firestore"
+DEFAULT_SQLITE_PATH = "data/wellpath.db"
+
+_repository = None
+_write_queue = None
+_lock = threading.RLock()
+
+
+def create_repository(backend=None, **options):
+    backend = (backend or os.environ.get("WELLPATH_DB_BACKEND", DEFAULT_BACKEND)).lower()
+
+    if backend == "firestore":
+        from database.firestore import FirestoreRepository
+        return FirestoreRepository(**options)
+
+    if backend == "sqlite":
+        from database.sqlite_store import SQLiteRepository
+        path = options.get("path") or os.environ.get("WELLPATH_SQLITE_PATH", DEFAULT_SQLITE_PATH)
+        return SQLiteRepository(path)
+
+    if backend == "memory":
+        from database.memory import InMemoryRepository
+        return InMemoryRepository()
+
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_repository():
+    global _repository
+    if _repository is None:
+        with _lock:
+            if _repository is None:
+                _repository = create_repository()
+    return _repository
+
+
+def set_repository(repository):
+    """Swap the process-wide backend (tests, benchmarks)."""
+    global _repository
+    with _lock:
+        _repository = repository
+
+
+def get_write_queue():
+    """The write-behind queue when WELLPATH_WRITE_BEHIND is set, else None."""
+    global _write_queue
+    if _write_queue is None and os.environ.get("WELLPATH_WRITE_BEHIND", "") in ("1", "true", "yes"):
+        with _lock:
+            if _write_queue is None:
+                import atexit
+                from database.rollups import get_rollup_store
+                from database.summaries import get_summary_store
+                from database.write_queue import QUEUE_PATH, WriteBehindQueue
+
+                path = os.environ.get("WELLPATH_QUEUE_PATH", QUEUE_PATH)
+                queue = WriteBehindQueue(get_repository(), path)
+                queue.on_commit(get_summary_store().committed)
+                queue.on_commit(get_rollup_store().committed)
+                _write_queue = queue.start()
+                atexit.register(_write_queue.stop)
+    return _write_queue
@@ -0,0 +1,158 @@
+"""
+Per-user daily disagreement rollups kept next to the logs.
+
+record() folds each saved log into its day's rollup and writes back just
+that day, so the disagreement analytics read one small document per day
+instead of every log. Users without stored rollups are backfilled from
+their full history on first use, or all at once before a cross-user read.
+
+With write-behind on, record_local() and committed() split record() the
+same way as in database.summaries: the save only touches the cached
+rollups, and the queue worker persists the days once the logs commit.
+"""
+import copy
+import threading
+
+from analysis.disagreement import ROLLUP_FIELDS, add_log
+from database.streaming import iter_log_batches
+
+
+class RollupStore:
+    def __init__(self, repository):
+        self.repository = repository
+        self._rollups = {}  # user_email -> {day: rollup}
+        self._applied = {}  # user_email -> {id: day} folded in by record_local, not yet committed
+        self._stale = set()
+        self._lock = threading.Lock()
+
+    def _rebuild(self, user_email, log_id=None):
+        rollups, found = {}, False
+        for batch in iter_log_batches(self.repository, user_email, fields=list(ROLLUP_FIELDS)):
+            for log in batch:
+                add_log(rollups, log)
+                found = found or (log_id is not None and log.get("id") == log_id)
+
+        self.repository.save_rollups(user_email, list(rollups.values()))
+        with self._lock:
+            self._rollups[user_email] = rollups
+            self._applied.pop(user_email, None)
+            self._stale.discard(user_email)
+        return rollups, found
+
+    def rebuild(self, user_email):
+        return self._rebuild(user_email)[0]
+
+    def _load(self, user_email):
+        with self._lock:
+            if user_email in self._stale:
+                return None
+            rollups = self._rollups.get(user_email)
+        if rollups is not None:
+            return rollups
+
+        stored = self.repository.get_rollups(user_email)
+        if not stored:
+            return None
+        rollups = {r["day"]: {k: v for k, v in r.items() if k != "user"} for r in stored}
+        with self._lock:
+            return self._rollups.setdefault(user_email, rollups)
+
+    def backfill(self):
+        """Rebuild rollups for every user who has logs but none stored. Checks each user once per process."""
+        for user_email in self.repository.list_users():
+            if self._load(user_email) is None:
+                self.rebuild(user_email)
+
+    def get(self, user_email=None, start=None, end=None):
+        """
+        Rollups with start <= day < end, oldest first. user_email=None reads
+        every user's from the backend, after backfilling users without any.
+        """
+        if user_email is None:
+            self.backfill()
+            return self.repository.get_rollups(None, start, end)
+
+        rollups = self._load(user_email)
+        if rollups is None:
+            rollups = self.rebuild(user_email)
+        with self._lock:
+            return [
+                {**copy.deepcopy(rollup), "user": user_email}
+                for day, rollup in sorted(rollups.items())
+                if (start is None or day >= start) and (end is None or day < end)
+            ]
+
+    def record(self, user_email, log):
+        """Fold in one saved log (with its "id" when known) and persist its day."""
+        rollups = self._load(user_email)
+        if rollups is None:
+            # Backfill; the log itself is already in the history unless its save is still queued
+            rollups, found = self._rebuild(user_email, log.get("id"))
+            if found:
+                return
+
+        with self._lock:
+            day = add_log(rollups, log)
+            if day is None:
+                return
+            snapshot = copy.deepcopy(rollups[day])
+        self.repository.save_rollups(user_email, [snapshot])
+
+    def record_local(self, user_email, log):
+        """Fold a queued log (with its "id") into cached rollups only; committed() persists it."""
+        with self._lock:
+            rollups = self._rollups.get(user_email)
+            if rollups is None or user_email in self._stale:
+                return
+            day = add_log(rollups, log)
+            if day is not None:
+                self._applied.setdefault(user_email, {})[log["id"]] = day
+
+    def committed(self, user_email, logs):
+        """Write-behind hook: fold in delivered logs record_local didn't, then persist their days."""
+        try:
+            with self._lock:
+                applied = self._applied.get(user_email, {})
+                days, new = set(), []
+                for log in logs:
+                    day = applied.pop(log.get("id"), None)
+                    if day is None:
+                        new.append(log)
+                    else:
+                        days.add(day)
+            rollups = self._load(user_email)
+            if rollups is None:
+                self.rebuild(user_email)  # the history already holds these logs
+                return
+
+            with self._lock:
+                for log in new:
+                    days.add(add_log(rollups, log))
+                days.discard(None)
+                snapshot = [copy.deepcopy(rollups[day]) for day in sorted(days)]
+            self.repository.save_rollups(user_email, snapshot)
+        except Exception:
+            with self._lock:
+                self._rollups.pop(user_email, None)
+                self._applied.pop(user_email, None)
+                self._stale.add(user_email)
+            raise
+
+    def invalidate(self, user_email):
+        with self._lock:
+            self._rollups.pop(user_email, None)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_rollup_store():
+    global _store
+    if _store is None:
+        from database.repository import get_repository
+
+        with _store_lock:
+            if _store is None:
+                _store = RollupStore(get_repository())
+    return _store
@@ -0,0 +1,202 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from database.base import HealthLogRepository, new_id, split_id
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS health_logs (
+    user TEXT NOT NULL,
+    id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user, id)
+);
+CREATE INDEX IF NOT EXISTS idx_health_logs_user_ts
+    ON health_logs (user, timestamp, id);
+CREATE TABLE IF NOT EXISTS user_summaries (
+    user TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    user TEXT NOT NULL,
+    day TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user, day)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_rollups_day
+    ON daily_rollups (day);
+"""
+
+
+def encode_timestamp(ts):
+    """Fixed-width UTC text, so string order == time order."""
+    if isinstance(ts, datetime):
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+        return ts.strftime(TIMESTAMP_FORMAT)
+    return str(ts)
+
+
+def decode_timestamp(text):
+    try:
+        return datetime.strptime(text, TIMESTAMP_FORMAT)
+    except ValueError:
+        return text
+
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return encode_timestamp(value)
+    if hasattr(value, "item"):  # NumPy scalars
+        return value.item()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Cannot store {type(value).__name__} in a health log")
+
+
+class SQLiteRepository(HealthLogRepository):
+    """
+    Local SQLite store, indexed on (user, timestamp) so paged reads are
+    index range scans. One connection shared behind a lock.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def _row(self, user_email, log):
+        doc_id, data = split_id(log)
+        data = dict(data)
+        ts = data.pop("timestamp", None)
+        return (
+            user_email,
+            doc_id or new_id(),
+            encode_timestamp(ts) if ts is not None else "",
+            json.dumps(data, default=json_default),
+        )
+
+    def save_bulk(self, user_email, logs):
+        rows = [self._row(user_email, log) for log in logs]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO health_logs (user, id, timestamp, data) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        return [r[1] for r in rows]
+
+    def save(self, user_email, log):
+        return self.save_bulk(user_email, [log])[0]
+
+    def get_page(
+        self, user_email, page_size, cursor=None, start=None, end=None, descending=True, fields=None
+    ):
+        clauses = ["user = ?"]
+        params = [user_email]
+
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(encode_timestamp(start))
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(encode_timestamp(end))
+
+        # Keyset pagination: continue strictly after the last (timestamp, id)
+        if cursor is not None:
+            clauses.append("(timestamp, id) < (?, ?)" if descending else "(timestamp, id) > (?, ?)")
+            params.extend(cursor)
+
+        # Projection happens inside SQLite, so only the requested values
+        # are decoded in Python
+        if fields is None:
+            column = "data"
+        else:
+            fields = [f for f in fields if f not in ("timestamp", "id")]
+            column = "json_array(" + ", ".join("json_extract(data, ?)" for _ in fields) + ")"
+            params = [f"$.{f}" for f in fields] + params
+
+        order = "DESC" if descending else "ASC"
+        sql = (
+            f"SELECT id, timestamp, {column} FROM health_logs WHERE {' AND '.join(clauses)} "
+            f"ORDER BY timestamp {order}, id {order} LIMIT ?"
+        )
+        params.append(page_size + 1)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        records = []
+        for doc_id, ts, data in rows:
+            if fields is None:
+                record = json.loads(data)
+            else:
+                record = dict(zip(fields, json.loads(data)))
+            record["timestamp"] = decode_timestamp(ts)
+            record["id"] = doc_id
+            records.append(record)
+
+        next_cursor = (rows[-1][1], rows[-1][0]) if has_more else None
+        return records, next_cursor
+
+    def list_users(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT user FROM health_logs")]
+
+    def get_summary(self, user_email):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM user_summaries WHERE user = ?", (user_email,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_summary(self, user_email, summary):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_summaries (user, data) VALUES (?, ?)",
+                (user_email, json.dumps(summary, default=json_default))
+            )
+
+    def get_rollups(self, user_email=None, start=None, end=None):
+        clauses, params = [], []
+        if user_email is not None:
+            clauses.append("user = ?")
+            params.append(user_email)
+        if start is not None:
+            clauses.append("day >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("day < ?")
+            params.append(end)
+
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT user, data FROM daily_rollups {where}ORDER BY user, day", params
+            ).fetchall()
+        return [{**json.loads(data), "user": user} for user, data in rows]
+
+    def save_rollups(self, user_email, rollups):
+        rows = [
+            (user_email, r["day"], json.dumps({k: v for k, v in r.items() if k != "user"}))
+            for r in rollups
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO daily_rollups (user, day, data) VALUES (?, ?, ?)", rows
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,45 @@
+"""
+Cursor-paginated streaming over a user's full history.
+
+Pages are fetched lazily, so callers can walk years of logs in constant
+memory and ask the backend only for the fields they use.
+"""
+import pandas as pd
+
+PAGE_SIZE = 500
+
+
+def iter_log_batches(
+    repository,
+    user_email,
+    fields=None,
+    start=None,
+    end=None,
+    page_size=PAGE_SIZE,
+    descending=False
+):
+    """Yield lists of log records, oldest first unless descending=True."""
+    cursor = None
+    while True:
+        records, cursor = repository.get_page(
+            user_email,
+            page_size,
+            cursor=cursor,
+            start=start,
+            end=end,
+            descending=descending,
+            fields=fields
+        )
+        if records:
+            yield records
+        if cursor is None:
+            return
+
+
+def iter_log_frames(repository, user_email, fields=None, **options):
+    """Same as iter_log_batches, one DataFrame per page."""
+    columns = None if fields is None else list(dict.fromkeys(["id", "timestamp", *fields]))
+    for records in iter_log_batches(repository, user_email, fields=fields, **options):
+        df = pd.DataFrame.from_records(records, columns=columns)
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        yield df
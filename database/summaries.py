@@ -0,0 +1,153 @@
+"""
+Per-user rolling summaries kept next to the logs.
+
+record() folds each saved log into the user's UserSummary and persists
+it. Logs that arrive out of timestamp order (e.g. bulk-imported history)
+and users without a stored summary trigger a rebuild from the full
+history instead.
+
+With write-behind on, saves go through record_local() instead, which
+only updates a cached summary in memory; the queue worker calls
+committed() once the logs reach the backend, which folds in anything not
+yet applied and persists the summary. If that fails the user is marked
+stale and rebuilt from the committed history on next use.
+"""
+import threading
+
+from analysis.rolling_stats import METRICS, UserSummary
+from database.sqlite_store import encode_timestamp
+from database.streaming import iter_log_batches
+
+
+class SummaryStore:
+    def __init__(self, repository):
+        self.repository = repository
+        self._summaries = {}
+        self._applied = {}  # user_email -> ids folded in by record_local, not yet committed
+        self._stale = set()
+        self._lock = threading.Lock()
+
+    def _rebuild(self, user_email, log_id=None):
+        summary, found = UserSummary(), False
+        for batch in iter_log_batches(self.repository, user_email, fields=list(METRICS)):
+            for log in batch:
+                summary.update(log)
+                found = found or (log_id is not None and log.get("id") == log_id)
+
+        self.repository.save_summary(user_email, summary.to_dict())
+        with self._lock:
+            self._summaries[user_email] = summary
+            # Queued logs applied to the old summary are folded in again when committed
+            self._applied.pop(user_email, None)
+            self._stale.discard(user_email)
+        return summary, found
+
+    def rebuild(self, user_email):
+        return self._rebuild(user_email)[0]
+
+    def _load(self, user_email):
+        with self._lock:
+            if user_email in self._stale:
+                return None
+            summary = self._summaries.get(user_email)
+        if summary is not None:
+            return summary
+
+        stored = self.repository.get_summary(user_email)
+        if stored is None:
+            return None
+        summary = UserSummary.from_dict(stored)
+        with self._lock:
+            return self._summaries.setdefault(user_email, summary)
+
+    def get(self, user_email):
+        summary = self._load(user_email)
+        return summary if summary is not None else self.rebuild(user_email)
+
+    def record(self, user_email, log):
+        """Fold in one saved log (with its "id" when known)."""
+        summary = self._load(user_email)
+        if summary is None:
+            # The log itself is already in the history unless its save is still queued
+            summary, found = self._rebuild(user_email, log.get("id"))
+            if found:
+                return summary
+
+        last = summary.last_timestamp
+        ts = log.get("timestamp")
+        if last is not None and (ts is None or encode_timestamp(ts) < encode_timestamp(last)):
+            return self.rebuild(user_email)
+
+        with self._lock:
+            summary.update(log)
+            snapshot = summary.to_dict()
+        self.repository.save_summary(user_email, snapshot)
+        return summary
+
+    def record_local(self, user_email, log):
+        """
+        Fold a queued log (with its "id") into the cached summary without
+        touching the backend; committed() persists it. Users not in memory
+        are left to committed().
+        """
+        with self._lock:
+            summary = self._summaries.get(user_email)
+            if summary is None or user_email in self._stale:
+                return None
+            last = summary.last_timestamp
+            ts = log.get("timestamp")
+            if last is not None and (ts is None or encode_timestamp(ts) < encode_timestamp(last)):
+                return summary  # out of order: committed() rebuilds
+            summary.update(log)
+            self._applied.setdefault(user_email, set()).add(log["id"])
+            return summary
+
+    def committed(self, user_email, logs):
+        """Write-behind hook: fold in delivered logs record_local didn't, then persist."""
+        try:
+            with self._lock:
+                applied = self._applied.get(user_email, set())
+                new = [log for log in logs if log.get("id") not in applied]
+                applied.difference_update(log.get("id") for log in logs)
+
+            summary = self._load(user_email)
+            if summary is None:
+                self.rebuild(user_email)  # the history already holds these logs
+                return
+            for log in new:
+                last = summary.last_timestamp
+                ts = log.get("timestamp")
+                if last is not None and (ts is None or encode_timestamp(ts) < encode_timestamp(last)):
+                    self.rebuild(user_email)
+                    return
+                with self._lock:
+                    summary.update(log)
+
+            with self._lock:
+                snapshot = summary.to_dict()
+            self.repository.save_summary(user_email, snapshot)
+        except Exception:
+            with self._lock:
+                self._summaries.pop(user_email, None)
+                self._applied.pop(user_email, None)
+                self._stale.add(user_email)
+            raise
+
+    def invalidate(self, user_email):
+        with self._lock:
+            self._summaries.pop(user_email, None)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_summary_store():
+    global _store
+    if _store is None:
+        from database.repository import get_repository
+
+        with _store_lock:
+            if _store is None:
+                _store = SummaryStore(get_repository())
+    return _store
@@ -0,0 +1,307 @@
+"""
+Durable write-behind queue for health-log saves.
+
+enqueue() appends the log to a local SQLite file (WAL mode) and returns
+at once; a background worker coalesces queued logs into save_bulk calls
+per user. Rows are deleted only after the backend commit succeeds, and
+every log carries its document ID from the moment it is queued, so a
+crash or retry re-sends the same documents: delivery is at-least-once and
+the result is idempotent. Logs left over from a previous run are flushed
+when the worker starts.
+
+A failed commit only holds back the rows it contained: each row backs off
+on its own schedule while later rows keep flowing. Rows that keep failing
+are retried one at a time, so a single rejected document can't sink the
+logs batched with it, and after MAX_ATTEMPTS a row moves to the dead_logs
+table (requeue_dead() puts those back).
+
+Callbacks registered with on_commit(callback) run in the worker after
+each successful commit as callback(user_email, logs); the summary and
+rollup stores use this to persist their updates off the request path.
+A failing callback is counted in the stats and never re-sends the logs.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+from database.base import new_id, split_id
+from database.sqlite_store import decode_timestamp, encode_timestamp, json_default
+
+QUEUE_PATH = "data/write_queue.db"
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.25
+RETRY_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+ROW_MAX_BACKOFF = 300.0
+ISOLATE_AFTER = 3   # failed attempts after which a row is sent on its own
+MAX_ATTEMPTS = 12   # ~20 minutes of retries with the default backoff
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_logs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    timestamp TEXT,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS dead_logs (
+    seq INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    timestamp TEXT,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL,
+    error TEXT,
+    failed_at REAL NOT NULL
+);
+"""
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        repository,
+        path=QUEUE_PATH,
+        batch_size=BATCH_SIZE,
+        flush_interval=FLUSH_INTERVAL,
+        max_attempts=MAX_ATTEMPTS,
+        retry_backoff=RETRY_BACKOFF
+    ):
+        self.repository = repository
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker = None
+        self._backoff = 0.0
+        self._on_commit = []
+
+        self.stats = {
+            "enqueued": 0,
+            "flushed": 0,
+            "commits": 0,
+            "failures": 0,
+            "dead_lettered": 0,
+            "hook_failures": 0,
+            "last_flush_ms": 0.0,
+            "last_error": None,
+            "last_hook_error": None,
+        }
+
+    def on_commit(self, callback):
+        """Call callback(user_email, logs) in the worker after each successful commit."""
+        self._on_commit.append(callback)
+        return callback
+
+    # ---------------- PRODUCER ----------------
+    def enqueue(self, user_email, log):
+        """Queue one log; returns the document ID it will be stored under."""
+        doc_id, data = split_id(log)
+        doc_id = doc_id or new_id()
+        data = dict(data)
+        ts = data.pop("timestamp", None)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO pending_logs (user, doc_id, timestamp, payload, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    user_email,
+                    doc_id,
+                    encode_timestamp(ts) if ts is not None else None,
+                    json.dumps(data, default=json_default),
+                    time.time(),
+                )
+            )
+            self.stats["enqueued"] += 1
+
+        if self.depth() >= self.batch_size:
+            self._wakeup.set()
+        return doc_id
+
+    def depth(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending_logs").fetchone()[0]
+
+    def oldest_age(self):
+        """Seconds the oldest queued log has been waiting (0 when empty)."""
+        with self._lock:
+            oldest = self._conn.execute("SELECT MIN(enqueued_at) FROM pending_logs").fetchone()[0]
+        return time.time() - oldest if oldest else 0.0
+
+    def _migrate(self):
+        # Queue files from before per-row backoff lack next_attempt_at
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pending_logs)")}
+        if columns and "next_attempt_at" not in columns:
+            self._conn.execute(
+                "ALTER TABLE pending_logs ADD COLUMN next_attempt_at REAL NOT NULL DEFAULT 0"
+            )
+
+    # ---------------- CONSUMER ----------------
+    def _next_batch(self):
+        """Oldest rows that are due: (seq, user, doc_id, timestamp, payload, attempts)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, user, doc_id, timestamp, payload, attempts FROM pending_logs "
+                "WHERE next_attempt_at <= ? ORDER BY seq LIMIT ?",
+                (time.time(), self.batch_size)
+            ).fetchall()
+
+    def _failed(self, items, error):
+        """Back off each row on its own; rows out of attempts move to dead_logs."""
+        now = time.time()
+        retry, dead = [], []
+        for seq, attempts, _ in items:
+            if attempts + 1 >= self.max_attempts:
+                dead.append((repr(error), now, seq))
+            else:
+                delay = min(ROW_MAX_BACKOFF, self.retry_backoff * 2 ** attempts)
+                retry.append((now + delay, seq))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE pending_logs SET attempts = attempts + 1, next_attempt_at = ? WHERE seq = ?",
+                retry
+            )
+            self._conn.executemany(
+                "INSERT INTO dead_logs "
+                "SELECT seq, user, doc_id, timestamp, payload, enqueued_at, attempts + 1, ?, ? "
+                "FROM pending_logs WHERE seq = ?",
+                dead
+            )
+            self._conn.executemany("DELETE FROM pending_logs WHERE seq = ?", [(d[-1],) for d in dead])
+            self.stats["failures"] += 1
+            self.stats["dead_lettered"] += len(dead)
+            self.stats["last_error"] = repr(error)
+
+    def _deliver(self, user, items):
+        """save_bulk one group of (seq, attempts, log); returns the number delivered."""
+        logs = [log for _, _, log in items]
+        try:
+            self.repository.save_bulk(user, logs)
+        except Exception as e:
+            self._failed(items, e)
+            return 0
+
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM pending_logs WHERE seq = ?", [(s,) for s, _, _ in items])
+            self.stats["commits"] += 1
+            self.stats["flushed"] += len(items)
+
+        for callback in self._on_commit:
+            try:
+                callback(user, logs)
+            except Exception as e:
+                self.stats["hook_failures"] += 1
+                self.stats["last_hook_error"] = repr(e)
+        return len(items)
+
+    def flush_once(self):
+        """Commit one coalesced batch. Returns the number of logs delivered."""
+        rows = self._next_batch()
+        if not rows:
+            return 0
+
+        by_user = {}
+        for seq, user, doc_id, ts, payload, attempts in rows:
+            log = json.loads(payload)
+            if ts is not None:
+                log["timestamp"] = decode_timestamp(ts)
+            log["id"] = doc_id
+            by_user.setdefault(user, []).append((seq, attempts, log))
+
+        start = time.perf_counter()
+        delivered = 0
+        for user, items in by_user.items():
+            # Rows that failed repeatedly go alone, so one bad log can't hold back the rest
+            groups = [[item] for item in items if item[1] >= ISOLATE_AFTER]
+            fresh = [item for item in items if item[1] < ISOLATE_AFTER]
+            if fresh:
+                groups.append(fresh)
+            for group in groups:
+                delivered += self._deliver(user, group)
+
+        self.stats["last_flush_ms"] = (time.perf_counter() - start) * 1000
+        if delivered < len(rows):
+            raise RuntimeError(self.stats["last_error"])
+        return delivered
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self._backoff or self.flush_interval)
+            self._wakeup.clear()
+            try:
+                while self.flush_once() == self.batch_size:
+                    pass
+                self._backoff = 0.0
+            except Exception:
+                self._backoff = min(MAX_BACKOFF, max(RETRY_BACKOFF, self._backoff * 2))
+
+    def start(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="wellpath-write-behind", daemon=True)
+            self._worker.start()
+        return self
+
+    def flush(self, timeout=10.0):
+        """Block until the queue drains or timeout passes; returns True if empty."""
+        deadline = time.monotonic() + timeout
+        while self.depth():
+            if time.monotonic() > deadline:
+                return False
+            if self._worker is not None and self._worker.is_alive():
+                self._wakeup.set()
+                time.sleep(0.01)
+            else:
+                try:
+                    self.flush_once()
+                except Exception:
+                    time.sleep(0.05)
+        return True
+
+    def stop(self, timeout=5.0):
+        self.flush(timeout)
+        self._stopping.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def dead_depth(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM dead_logs").fetchone()[0]
+
+    def requeue_dead(self):
+        """Move every dead-lettered log back to the queue with fresh attempts; returns how many."""
+        with self._lock, self._conn:
+            moved = self._conn.execute(
+                "INSERT INTO pending_logs (user, doc_id, timestamp, payload, enqueued_at) "
+                "SELECT user, doc_id, timestamp, payload, enqueued_at FROM dead_logs ORDER BY seq"
+            ).rowcount
+            self._conn.execute("DELETE FROM dead_logs")
+        self._wakeup.set()
+        return moved
+
+    def metrics(self):
+        return {
+            **self.stats,
+            "depth": self.depth(),
+            "dead": self.dead_depth(),
+            "oldest_age_s": round(self.oldest_age(), 3),
+        }
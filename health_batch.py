@@ -0,0 +1,269 @@
+"""
+Struct-of-arrays container for many health inputs / logs.
+
+HealthBatch keeps one typed NumPy array per HealthInput field instead of
+one Python object (or dict) per log, with symptoms packed into a bitmask
+over the engine's symptom_weights vocabulary. Everything else a log
+carries (timestamp, risk_score, id, ...) goes into `extra` columns,
+typed where the values allow it.
+
+Conversions are lossless: symptom lists that are not in canonical
+vocabulary order, repeat a name, or use names outside the vocabulary are
+kept verbatim in a small side table, and keys missing from some logs
+stay missing.
+"""
+import numpy as np
+import pandas as pd
+
+from risk_engine import SYMPTOM_WEIGHTS, HealthInput
+
+URINE_VALUES = ("normal", "increased")
+
+# Stored log name -> HealthInput field name
+LOG_FIELDS = {
+    "age": "age",
+    "weight": "weight",
+    "stress": "stress_level",
+    "sleep": "sleep_hours",
+    "urine": "urine_frequency",
+    "symptoms": "symptoms",
+}
+CORE_DTYPES = {
+    "age": np.int16,
+    "weight": np.float64,
+    "stress": np.float64,  # simulated logs carry fractional stress
+    "sleep": np.float64,
+    "urine": np.int8,
+}
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+
+def _mask_dtype(vocab_size):
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        if vocab_size < np.iinfo(dtype).bits:
+            return dtype
+    raise ValueError("Symptom vocabulary too large for a bitmask")
+
+
+def _extra_list(values):
+    if values.dtype.kind == "M":
+        return list(pd.DatetimeIndex(values).to_pydatetime())
+    return values.tolist()
+
+
+def _extra_array(values):
+    """Typed array when every value is present and of one plain type, else object."""
+    kinds = {type(v) for v in values}
+    if kinds == {bool}:
+        return np.array(values, dtype=bool)
+    if kinds == {int}:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            pass
+    if kinds == {float}:
+        return np.array(values, dtype=np.float64)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class HealthBatch:
+    __slots__ = (
+        "age", "weight", "stress", "sleep", "urine", "symptom_mask",
+        "vocabulary", "symptom_overrides", "extra"
+    )
+
+    def __init__(
+        self, age, weight, stress, sleep, urine, symptom_mask,
+        vocabulary=None, symptom_overrides=None, extra=None
+    ):
+        self.vocabulary = tuple(vocabulary or SYMPTOM_WEIGHTS)
+        self.age = np.asarray(age, dtype=CORE_DTYPES["age"])
+        self.weight = np.asarray(weight, dtype=CORE_DTYPES["weight"])
+        self.stress = np.asarray(stress, dtype=CORE_DTYPES["stress"])
+        self.sleep = np.asarray(sleep, dtype=CORE_DTYPES["sleep"])
+        self.urine = np.asarray(urine, dtype=CORE_DTYPES["urine"])
+        self.symptom_mask = np.asarray(symptom_mask, dtype=_mask_dtype(len(self.vocabulary)))
+        self.symptom_overrides = dict(symptom_overrides or {})  # row -> exact symptom list
+        self.extra = dict(extra or {})
+
+    # ---------------- ENCODING ----------------
+    @staticmethod
+    def _encode_urine(values):
+        index = {v: i for i, v in enumerate(URINE_VALUES)}
+        try:
+            return [index[v] for v in values]
+        except KeyError as e:
+            raise ValueError(f"Unknown urine frequency: {e.args[0]!r}") from None
+
+    @classmethod
+    def _encode_symptoms(cls, lists, vocabulary):
+        index = {name: i for i, name in enumerate(vocabulary)}
+        masks = []
+        overrides = {}
+        seen = {}  # tuple(symptoms) -> (mask, canonical)
+        for row, symptoms in enumerate(lists):
+            key = tuple(symptoms)
+            if key not in seen:
+                mask = 0
+                for name in key:
+                    if name in index:
+                        mask |= 1 << index[name]
+                canonical = key == tuple(n for i, n in enumerate(vocabulary) if mask & (1 << i))
+                seen[key] = (mask, canonical)
+            mask, canonical = seen[key]
+            masks.append(mask)
+            if not canonical:
+                overrides[row] = list(symptoms)
+        return masks, overrides
+
+    def symptoms(self, row):
+        if row in self.symptom_overrides:
+            return list(self.symptom_overrides[row])
+        mask = int(self.symptom_mask[row])
+        return [name for i, name in enumerate(self.vocabulary) if mask & (1 << i)]
+
+    # ---------------- LOG DICTS ----------------
+    @classmethod
+    def from_logs(cls, logs, vocabulary=None):
+        """Build from stored-log dicts (age, weight, stress, sleep, urine, symptoms, ...)."""
+        logs = list(logs)
+        vocabulary = tuple(vocabulary or SYMPTOM_WEIGHTS)
+        core = {key: [log[key] for log in logs] for key in LOG_FIELDS}
+
+        extra_keys = {}
+        for log in logs:
+            for key in log:
+                if key not in LOG_FIELDS:
+                    extra_keys.setdefault(key, None)
+        extra = {key: _extra_array([log.get(key, MISSING) for log in logs]) for key in extra_keys}
+
+        masks, overrides = cls._encode_symptoms(core["symptoms"], vocabulary)
+        return cls(
+            core["age"], core["weight"], core["stress"], core["sleep"],
+            cls._encode_urine(core["urine"]), masks,
+            vocabulary=vocabulary, symptom_overrides=overrides, extra=extra
+        )
+
+    def to_logs(self):
+        columns = {
+            "age": self.age.tolist(),
+            "weight": self.weight.tolist(),
+            "stress": self.stress.tolist(),
+            "sleep": self.sleep.tolist(),
+            "urine": [URINE_VALUES[u] for u in self.urine.tolist()],
+            "symptoms": [self.symptoms(i) for i in range(len(self))],
+            **{key: _extra_list(values) for key, values in self.extra.items()},
+        }
+        keys = list(columns)
+        return [
+            {k: v for k, v in zip(keys, row) if v is not MISSING}
+            for row in zip(*columns.values())
+        ]
+
+    # ---------------- HEALTH INPUTS ----------------
+    @classmethod
+    def from_inputs(cls, inputs, vocabulary=None):
+        return cls.from_logs(
+            ({log_key: getattr(x, field) for log_key, field in LOG_FIELDS.items()} for x in inputs),
+            vocabulary
+        )
+
+    def input(self, row):
+        stress = self.stress[row].item()
+        return HealthInput(
+            int(self.age[row]),
+            float(self.weight[row]),
+            int(stress) if stress.is_integer() else stress,
+            float(self.sleep[row]),
+            URINE_VALUES[self.urine[row]],
+            self.symptoms(row),
+        )
+
+    def to_inputs(self):
+        return [self.input(i) for i in range(len(self))]
+
+    # ---------------- DATAFRAMES ----------------
+    @classmethod
+    def from_frame(cls, df, vocabulary=None):
+        """
+        From a DataFrame with stored-log columns. Symptoms may be a column of
+        lists (`symptoms`) or of bitmasks (`symptom_mask`).
+        """
+        vocabulary = tuple(vocabulary or SYMPTOM_WEIGHTS)
+        if "symptoms" in df:
+            masks, overrides = cls._encode_symptoms(df["symptoms"].tolist(), vocabulary)
+        else:
+            masks, overrides = df["symptom_mask"].to_numpy(), {}
+
+        urine = df["urine"]
+        if isinstance(urine.dtype, pd.CategoricalDtype) or not pd.api.types.is_integer_dtype(urine):
+            urine = cls._encode_urine(urine.astype(object).tolist())
+
+        skip = set(LOG_FIELDS) | {"symptom_mask"}
+        extra = {c: df[c].to_numpy() for c in df.columns if c not in skip}
+        return cls(
+            df["age"].to_numpy(), df["weight"].to_numpy(), df["stress"].to_numpy(),
+            df["sleep"].to_numpy(), urine, masks,
+            vocabulary=vocabulary, symptom_overrides=overrides, extra=extra
+        )
+
+    def to_frame(self, symptoms="list"):
+        """symptoms="list" for a column of lists, "mask" for the symptom_mask bitmask."""
+        data = {
+            "age": self.age,
+            "weight": self.weight,
+            "stress": self.stress,
+            "sleep": self.sleep,
+            "urine": pd.Categorical.from_codes(self.urine, categories=list(URINE_VALUES)),
+        }
+        if symptoms == "mask":
+            data["symptom_mask"] = self.symptom_mask
+        else:
+            data["symptoms"] = [self.symptoms(i) for i in range(len(self))]
+        for key, values in self.extra.items():
+            if values.dtype == object:
+                values = np.where([v is MISSING for v in values], None, values)
+            data[key] = values
+        return pd.DataFrame(data)
+
+    # ---------------- ENGINE ----------------
+    def columns(self):
+        """Column mapping accepted by HealthRiskEngine.assess_batch."""
+        symptoms = self.symptom_mask
+        if any(len(set(s)) != len(s) for s in self.symptom_overrides.values()):
+            # Repeated symptoms score once per occurrence, which a bitmask can't express
+            symptoms = [self.symptoms(i) for i in range(len(self))]
+        return {
+            "age": self.age,
+            "stress": self.stress,
+            "sleep": self.sleep,
+            "urine": np.array(URINE_VALUES, dtype=object)[self.urine],
+            "symptoms": symptoms,
+        }
+
+    def assess(self, engine):
+        if tuple(engine.symptom_weights) != self.vocabulary:
+            raise ValueError("Engine symptom vocabulary differs from the batch's")
+        return engine.assess_batch(self.columns())
+
+    # ---------------- SIZE ----------------
+    def __len__(self):
+        return len(self.age)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the typed core arrays (excludes extra and overrides)."""
+        return sum(
+            a.nbytes for a in (self.age, self.weight, self.stress, self.sleep, self.urine, self.symptom_mask)
+        )
@@ -0,0 +1,213 @@
+"""
+Cross-validated training with a small hyperparameter sweep.
+
+Every (params, fold) pair is an independent LogisticRegression fit, run
+across CPU cores in a process pool. Results are cached on disk keyed by
+the dataset fingerprint plus the parameters, so re-running on unchanged
+data only reads the cache. The winning parameters are refit on all rows
+(also cached) and handed back for the caller to save.
+"""
+import hashlib
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+from ml.linear_scorer import fingerprint_dataset
+
+CACHE_DIR = "ml/cv_cache"
+N_FOLDS = 5
+RANDOM_STATE = 42
+
+PARAM_GRID = [
+    {"C": C, "class_weight": class_weight}
+    for C in (0.1, 1.0, 10.0)
+    for class_weight in (None, "balanced")
+]
+
+
+@dataclass
+class ParamResult:
+    params: dict
+    folds: list  # [{"fold", "accuracy", "auc", "fit_seconds"}]
+    cached: bool = False
+
+    @property
+    def mean_accuracy(self):
+        return float(np.mean([f["accuracy"] for f in self.folds]))
+
+    @property
+    def std_accuracy(self):
+        return float(np.std([f["accuracy"] for f in self.folds]))
+
+
+@dataclass
+class CVReport:
+    fingerprint: str
+    n_folds: int
+    results: list = field(default_factory=list)
+    best: ParamResult = None
+    model: object = None
+    seconds: float = 0.0
+    fits: int = 0
+    cache_hits: int = 0
+
+    @property
+    def accuracy(self):
+        """Mean cross-validated accuracy of the best parameters, in percent."""
+        return round(self.best.mean_accuracy * 100, 2)
+
+    def table(self):
+        return [
+            {
+                **r.params,
+                "mean_accuracy": round(r.mean_accuracy, 4),
+                "std_accuracy": round(r.std_accuracy, 4),
+                **{f"fold_{f['fold']}": round(f["accuracy"], 4) for f in r.folds},
+                "cached": r.cached,
+            }
+            for r in self.results
+        ]
+
+
+# ---------------- WORKERS ----------------
+_X = _y = None
+
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+
+def _make_model(params, base_params):
+    return LogisticRegression(**{**base_params, **params})
+
+
+def _fit_fold(params, base_params, fold, train_idx, test_idx):
+    start = time.perf_counter()
+    model = _make_model(params, base_params).fit(_X[train_idx], _y[train_idx])
+    y_test = _y[test_idx]
+    proba = model.predict_proba(_X[test_idx])[:, 1]
+    return params, {
+        "fold": fold,
+        "accuracy": float(accuracy_score(y_test, model.predict(_X[test_idx]))),
+        "auc": float(roc_auc_score(y_test, proba)) if len(np.unique(y_test)) == 2 else None,
+        "fit_seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+# ---------------- CACHE ----------------
+def _key(fingerprint, params, base_params, n_folds, kind):
+    text = json.dumps(
+        [fingerprint, params, base_params, n_folds, RANDOM_STATE, kind], sort_keys=True
+    )
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+def _cache_read(cache_dir, key):
+    if cache_dir is None:
+        return None
+    try:
+        with open(os.path.join(cache_dir, f"{key}.pkl"), "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def _cache_write(cache_dir, key, value):
+    if cache_dir is None:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{key}.pkl")
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        pickle.dump(value, f)
+    os.replace(tmp, path)
+
+
+# ---------------- RUNNER ----------------
+def cross_validate(
+    X,
+    y,
+    param_grid=PARAM_GRID,
+    base_params=None,
+    n_folds=N_FOLDS,
+    n_jobs=None,
+    cache_dir=CACHE_DIR
+):
+    """
+    k-fold CV over param_grid, then refit the best parameters on all rows.
+    n_jobs=None uses every core; n_jobs=1 runs in-process.
+    """
+    start = time.perf_counter()
+    base_params = dict(base_params or {})
+    X_arr = np.ascontiguousarray(np.asarray(X, dtype=np.float64))
+    y_arr = np.asarray(y)
+
+    _, class_counts = np.unique(y_arr, return_counts=True)
+    if len(class_counts) < 2:
+        raise ValueError("Need at least two target classes to train")
+    n_folds = max(2, min(n_folds, int(class_counts.min())))
+
+    fingerprint = fingerprint_dataset(X, y)
+    report = CVReport(fingerprint=fingerprint, n_folds=n_folds)
+
+    results = {}
+    todo = []
+    for params in param_grid:
+        key = _key(fingerprint, params, base_params, n_folds, "cv")
+        folds = _cache_read(cache_dir, key)
+        if folds is not None:
+            results[key] = ParamResult(params, folds, cached=True)
+            report.cache_hits += 1
+        else:
+            results[key] = ParamResult(params, [])
+            todo.append(params)
+
+    if todo:
+        splits = list(StratifiedKFold(n_folds, shuffle=True, random_state=RANDOM_STATE).split(X_arr, y_arr))
+        tasks = [
+            (params, base_params, i, train_idx, test_idx)
+            for params in todo
+            for i, (train_idx, test_idx) in enumerate(splits)
+        ]
+        n_jobs = n_jobs or os.cpu_count() or 1
+
+        if n_jobs == 1:
+            _init_worker(X_arr, y_arr)
+            outputs = [_fit_fold(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(n_jobs, len(tasks)), initializer=_init_worker, initargs=(X_arr, y_arr)
+            ) as pool:
+                outputs = list(pool.map(_fit_fold, *zip(*tasks)))
+        report.fits = len(outputs)
+
+        for params, fold in outputs:
+            results[_key(fingerprint, params, base_params, n_folds, "cv")].folds.append(fold)
+        for params in todo:
+            key = _key(fingerprint, params, base_params, n_folds, "cv")
+            results[key].folds.sort(key=lambda f: f["fold"])
+            _cache_write(cache_dir, key, results[key].folds)
+
+    report.results = list(results.values())
+    report.best = max(report.results, key=lambda r: r.mean_accuracy)
+
+    key = _key(fingerprint, report.best.params, base_params, n_folds, "final")
+    report.model = _cache_read(cache_dir, key)
+    if report.model is None:
+        report.model = _make_model(report.best.params, base_params).fit(X, y)
+        report.fits += 1
+        _cache_write(cache_dir, key, report.model)
+    else:
+        report.cache_hits += 1
+
+    report.seconds = round(time.perf_counter() - start, 3)
+    return report
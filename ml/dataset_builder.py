@@ -1,22 +1,200 @@
+import os
+from itertools import chain, islice
+
+import numpy as np
 import pandas as pd
 
-def build_dataset(logs):
-    df = pd.DataFrame(logs)
+from risk_engine import HealthRiskEngine
+
+URINE_CODES = {"normal": 0, "increased": 1}
+
+# Risk label (target): anything above LOW counts as at-risk
+TARGET_CODES = {
+    "LOW": 0,
+    "MEDIUM": 1,
+    "HIGH": 1
+}
+
+FEATURES = ["age", "weight", "stress", "sleep", "urine"]
+REQUIRED_COLUMNS = FEATURES + ["target"]  # rows missing any of these are dropped
+
+DROP_COLUMNS = ["timestamp", "recommended_action", "id"]
+RISK_LEVEL_DTYPE = pd.CategoricalDtype(list(TARGET_CODES))
+BATCH_ROWS = 100_000
+
+_engine = HealthRiskEngine()
+
+
+# ---------------- BATCHING ----------------
+def _slices(logs, size):
+    it = iter(logs)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_batches(logs, batch_rows=BATCH_ROWS):
+    """
+    Normalize the accepted inputs to a stream of batches: a list of log
+    dicts, a DataFrame, or any iterable of either (e.g. the pages from
+    database.streaming.iter_log_batches). Long lists are sliced so no
+    intermediate object frame is larger than batch_rows.
+    """
+    if isinstance(logs, pd.DataFrame):
+        yield logs
+        return
+
+    it = iter(logs)
+    first = next(it, None)
+    if first is None:
+        return
+    it = chain([first], it)
+
+    if isinstance(first, dict):  # flat stream of logs
+        yield from _slices(it, batch_rows)
+        return
+
+    for batch in it:
+        if isinstance(batch, pd.DataFrame):
+            yield batch
+        else:
+            yield from _slices(batch, batch_rows)
+
+
+# ---------------- ENCODING ----------------
+def _is_text(series):
+    sample = series.dropna()
+    return not sample.empty and isinstance(sample.iloc[0], str)
+
+
+def encode_batch(batch):
+    """build_dataset for one batch, with compact dtypes."""
+    df = batch if isinstance(batch, pd.DataFrame) else pd.DataFrame.from_records(batch)
 
     # Drop unnecessary fields
-    df = df.drop(columns=["timestamp", "recommended_action", "id"], errors="ignore")
+    df = df.drop(columns=DROP_COLUMNS, errors="ignore")
+    for column in (*FEATURES, "risk_level"):
+        if column not in df.columns:
+            df[column] = np.nan
+
+    # Encode urine frequency and risk label (target)
+    df["urine"] = df["urine"].astype(object).map(URINE_CODES)
+    df["target"] = df["risk_level"].astype(object).map(TARGET_CODES)
 
-    # Encode urine frequency
-    df["urine"] = df["urine"].map({"normal": 0, "increased": 1})
+    # Drop rows missing a feature or the label. Only this fixed set, so that
+    # batches with different optional fields (e.g. logs from before
+    # ml_risk_label existed) keep the same rows whatever the batch size.
+    df = df.dropna(subset=REQUIRED_COLUMNS)
 
-    # Encode risk label (target)
-    df["target"] = df["risk_level"].map({
-        "LOW": 0,
-        "MEDIUM": 1,
-        "HIGH": 1
-    })
+    # Symptom lists -> one bitmask per row (bit i = i-th SYMPTOM_WEIGHTS key)
+    if "symptoms" in df.columns:
+        symptoms = [s if isinstance(s, list) else [] for s in df.pop("symptoms")]
+        df["symptom_mask"] = _engine.symptom_codes(symptoms).astype(np.int16)
 
-    # Drop rows with missing values
-    df = df.dropna()
+    # Downcast: features to float32, codes to int8, labels to categoricals
+    for column in df.columns:
+        series = df[column]
+        if column in ("urine", "target"):
+            df[column] = series.astype(np.int8)
+        elif column == "risk_level":
+            df[column] = series.astype(RISK_LEVEL_DTYPE)
+        elif pd.api.types.is_bool_dtype(series):
+            continue
+        elif column in FEATURES or pd.api.types.is_float_dtype(series):
+            df[column] = series.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast="integer")
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        elif _is_text(series):
+            df[column] = series.astype("category")
 
     return df
+
+
+def _concat(frames):
+    """Concatenate encoded batches, keeping categoricals with differing categories."""
+    if not frames:
+        return pd.DataFrame({**{c: pd.Series(dtype=np.float32) for c in FEATURES},
+                             "target": pd.Series(dtype=np.int8)})
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+
+    # Batches may carry different optional columns: take their union, with
+    # the encoded columns last, so the layout doesn't depend on batch size
+    derived = ["target", "symptom_mask"]
+    columns = list(dict.fromkeys(c for f in frames for c in f.columns if c not in derived))
+    columns += [c for c in derived if any(c in f for f in frames)]
+
+    for column in columns:
+        # Batches where the column is missing or all-NaN don't decide its dtype
+        present = [f[column] for f in frames if column in f and f[column].notna().any()]
+        if present and all(isinstance(s.dtype, pd.CategoricalDtype) for s in present):
+            if all(s.dtype == present[0].dtype for s in present):
+                categories = present[0].cat.categories  # e.g. the fixed risk_level order
+            else:  # sorted, as astype("category") gives a single batch
+                categories = pd.api.types.union_categoricals(present, sort_categories=True).categories
+            for f in frames:
+                values = f[column] if column in f else [None] * len(f)
+                f[column] = pd.Categorical(values, categories=categories)
+
+    return pd.concat(frames, ignore_index=True)[columns]
+
+
+def build_dataset(logs, batch_rows=BATCH_ROWS):
+    """
+    Training frame from health logs: encoded urine and target, rows
+    missing a feature or label dropped, symptom lists packed into a symptom_mask
+    bitmask, numerics downcast to float32/small ints and labels
+    categorical. `logs` may be a list of logs or an iterable of batches,
+    which are encoded as they stream in.
+    """
+    return _concat([encode_batch(b) for b in iter_batches(logs, batch_rows)])
+
+
+# ---------------- SHARDS ----------------
+def write_dataset_shards(logs, shard_dir, batch_rows=BATCH_ROWS):
+    """
+    Stream batches straight to Parquet shards (one per batch) without
+    holding the dataset in memory. Needs pyarrow. Returns the shard paths.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Writing dataset shards requires pyarrow") from e
+
+    os.makedirs(shard_dir, exist_ok=True)
+    paths = []
+    for i, batch in enumerate(iter_batches(logs, batch_rows)):
+        path = os.path.join(shard_dir, f"part-{i:05d}.parquet")
+        encode_batch(batch).to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def load_dataset_shards(shard_dir, columns=None):
+    """Read shards written by write_dataset_shards back into one frame."""
+    paths = sorted(
+        os.path.join(shard_dir, name) for name in os.listdir(shard_dir) if name.endswith(".parquet")
+    )
+    return _concat([pd.read_parquet(path, columns=columns) for path in paths])
+
+
+def encode_log(log):
+    """
+    Single-log version of build_dataset: (feature row, target), or None
+    when a field is missing or unknown.
+    """
+    try:
+        row = [
+            float(log["age"]),
+            float(log["weight"]),
+            float(log["stress"]),
+            float(log["sleep"]),
+            URINE_CODES[log["urine"]],
+        ]
+        return row, TARGET_CODES[log["risk_level"]]
+    except (KeyError, TypeError, ValueError):
+        return None
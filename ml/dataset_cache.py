@@ -0,0 +1,216 @@
+"""
+Columnar, content-addressed cache for CSV datasets.
+
+A CSV is parsed once, in chunks, into one raw binary file per column
+under data/cache/<sha256 of the CSV>/. Integer columns are stored in the
+smallest dtype that holds them, text columns as small integer codes plus
+a category list in meta.json. Later loads memory-map the columns, so
+nothing is re-parsed and only the columns (and rows) that are touched
+are paged in. Editing the CSV changes its hash and triggers a rebuild.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+CACHE_ROOT = "data/cache"
+CHUNK_ROWS = 100_000
+FORMAT_VERSION = 1
+MISSING_CODE = -1
+
+_digests = {}  # abspath -> (mtime_ns, size, sha256)
+_lock = threading.Lock()
+
+
+def file_digest(path):
+    """sha256 of the file contents, memoized on (mtime, size)."""
+    key = os.path.abspath(path)
+    st = os.stat(path)
+    cached = _digests.get(key)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    _digests[key] = (st.st_mtime_ns, st.st_size, h.hexdigest())
+    return h.hexdigest()
+
+
+def _min_int_dtype(values):
+    lo, hi = (int(values.min()), int(values.max())) if len(values) else (0, 0)
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _code_dtype(n_categories):
+    return np.dtype(np.int8) if n_categories <= 127 else _min_int_dtype(np.array([n_categories]))
+
+
+class _ColumnWriter:
+    """Appends chunks to <name>.bin, widening the file's dtype if a chunk needs it."""
+
+    def __init__(self, directory, name):
+        self.path = os.path.join(directory, f"{name}.bin")
+        self.kind = None  # "int", "float" or "category"
+        self.dtype = None
+        self.categories = {}  # value -> code, in order of first appearance
+        self.rows = 0
+        self.missing = 0  # leading all-missing rows not written yet
+
+    def _widen(self, dtype):
+        if self.dtype is not None and self.rows:
+            old = np.fromfile(self.path, dtype=self.dtype)
+            old.astype(dtype).tofile(self.path)
+        self.dtype = dtype
+
+    def append(self, series):
+        if self.kind is None and len(series) and series.isna().all():
+            # pandas reads an all-empty chunk as float64 even in a text column,
+            # so it can't decide the kind: hold the rows until a chunk does
+            self.missing += len(series)
+            return
+        if self.missing:
+            series = pd.concat([pd.Series(np.nan, index=range(self.missing)), series], ignore_index=True)
+            self.missing = 0
+
+        if pd.api.types.is_numeric_dtype(series) and self.kind != "category":
+            if pd.api.types.is_integer_dtype(series) and self.kind in (None, "int"):
+                self.kind = "int"
+                values = series.to_numpy()
+                needed = _min_int_dtype(values)
+            else:
+                self.kind = "float"
+                values = series.to_numpy(np.float64)
+                needed = np.dtype(np.float64)
+        else:
+            if self.kind in ("int", "float"):
+                raise ValueError(f"Column {os.path.basename(self.path)[:-4]!r} mixes numbers and text")
+            self.kind = "category"
+            codes, uniques = pd.factorize(series.astype(object), use_na_sentinel=True)
+            mapping = np.array(
+                [self.categories.setdefault(v, len(self.categories)) for v in uniques], dtype=np.int64
+            )
+            values = np.where(codes >= 0, mapping[codes] if len(mapping) else 0, MISSING_CODE)
+            needed = _code_dtype(len(self.categories))
+
+        dtype = needed if self.dtype is None else np.result_type(self.dtype, needed)
+        if self.dtype is None or dtype != self.dtype:
+            self._widen(dtype)
+        with open(self.path, "ab") as f:
+            np.ascontiguousarray(values, dtype=self.dtype).tofile(f)
+        self.rows += len(values)
+
+    def close(self):
+        """Write held rows of a column that was missing all the way through, as float NaN."""
+        if self.missing:
+            missing, self.missing = self.missing, 0
+            self.kind = "float"
+            self.append(pd.Series(np.full(missing, np.nan)))
+
+    def meta(self):
+        entry = {"kind": self.kind, "dtype": self.dtype.str}
+        if self.kind == "category":
+            entry["categories"] = list(self.categories)
+        return entry
+
+
+class ColumnarDataset:
+    """Read side of one cached dataset; columns are opened as read-only memmaps."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.columns = list(self.meta["columns"])
+        self._maps = {}
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def column(self, name):
+        """Raw stored values (category codes for text columns), memory-mapped."""
+        if name not in self._maps:
+            entry = self.meta["columns"][name]
+            if len(self) == 0:
+                self._maps[name] = np.empty(0, dtype=entry["dtype"])
+            else:
+                self._maps[name] = np.memmap(
+                    os.path.join(self.directory, f"{name}.bin"),
+                    dtype=entry["dtype"], mode="r", shape=(len(self),)
+                )
+        return self._maps[name]
+
+    def categories(self, name):
+        return self.meta["columns"][name].get("categories")
+
+    def frame(self, columns=None, decode=False):
+        """
+        DataFrame over the cached columns without copying numeric data.
+        Text columns come back as integer codes (-1 = missing), or as
+        pandas Categoricals when decode=True.
+        """
+        data = {}
+        for name in columns or self.columns:
+            values = self.column(name)
+            categories = self.categories(name)
+            if decode and categories is not None:
+                values = pd.Categorical.from_codes(np.asarray(values), categories=categories)
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+
+def _build(csv_path, directory, chunk_rows):
+    tmp = f"{directory}.tmp-{os.getpid()}-{threading.get_ident()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    try:
+        writers = {}
+        rows = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+            for name in chunk.columns:
+                writers.setdefault(name, _ColumnWriter(tmp, name)).append(chunk[name])
+            rows += len(chunk)
+        for writer in writers.values():
+            writer.close()
+
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "source": os.path.basename(csv_path),
+            "sha256": file_digest(csv_path),
+            "rows": rows,
+            "columns": {name: w.meta() for name, w in writers.items()},
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+        try:
+            os.rename(tmp, directory)
+        except OSError:  # someone else finished first
+            pass
+    finally:
+        # Gone after a successful rename; left over when the build failed
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def ingest_csv(csv_path, cache_root=None, chunk_rows=CHUNK_ROWS):
+    """
+    Return the cached ColumnarDataset for csv_path, converting it on first
+    use. cache_root defaults to CACHE_ROOT.
+    """
+    cache_root = cache_root or CACHE_ROOT
+    directory = os.path.join(cache_root, f"v{FORMAT_VERSION}-{file_digest(csv_path)}")
+    with _lock:
+        if not os.path.exists(os.path.join(directory, "meta.json")):
+            os.makedirs(cache_root, exist_ok=True)
+            _build(csv_path, directory, chunk_rows)
+    return ColumnarDataset(directory)
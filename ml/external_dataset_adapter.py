@@ -1,29 +1,39 @@
-import pandas as pd
+from ml.dataset_cache import ingest_csv
 
-def load_heart_dataset(path):
-    df = pd.read_csv(path)
+# ---- Heart dataset columns -> WellPath-style features ----
+FEATURE_MAP = {
+    "resting_blood_pressure": "stress",
+    "cholestoral": "cholesterol",
+    "Max_heart_rate": "sleep"
+}
+FEATURES = ["age", "cholesterol", "stress", "sleep", "urine"]
+
+
+def load_heart_table(path, decode=False):
+    """
+    Every column of the dataset (sex, chest pain type, oldpeak,
+    thalassemia, ...) served from the columnar cache. Text columns are
+    integer codes unless decode=True.
+    """
+    return ingest_csv(path).frame(decode=decode)
 
-    # ---- Rename to WellPath-style features ----
-    df = df.rename(columns={
-        "resting_blood_pressure": "stress",
-        "cholestoral": "cholesterol",
-        "Max_heart_rate": "sleep"
-    })
+
+def load_heart_dataset(path):
+    dataset = ingest_csv(path)
+    source = {FEATURE_MAP.get(c, c): c for c in dataset.columns}
 
     # ---- Required columns check ----
     required = ["age", "stress", "cholesterol", "sleep", "target"]
-    missing = [c for c in required if c not in df.columns]
+    missing = [c for c in required if c not in source]
 
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
 
     # ---- Feature Engineering ----
+    df = dataset.frame([source[c] for c in required]).rename(columns=FEATURE_MAP)
     df["urine"] = 0  # not available → assume normal
 
-    X = df[
-        ["age", "cholesterol", "stress", "sleep", "urine"]
-    ]
-
+    X = df[FEATURES]
     y = df["target"]
 
     return X, y
@@ -0,0 +1,78 @@
+"""
+Dependency-light inference for the logistic-regression risk models.
+
+Training pickles a full scikit-learn LogisticRegression; this module also
+writes its coefficients to a small JSON artifact and scores it with a dot
+product and a sigmoid, so prediction-only processes never import sklearn.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def fingerprint_dataset(X, y=None):
+    """Stable sha256 over feature names, feature values and labels."""
+    h = hashlib.sha256()
+    columns = getattr(X, "columns", None)
+    if columns is not None:
+        h.update(",".join(map(str, columns)).encode())
+    h.update(np.ascontiguousarray(np.asarray(X, dtype=np.float64)).tobytes())
+    if y is not None:
+        h.update(np.ascontiguousarray(np.asarray(y, dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def export_linear_model(model, feature_names, path, X=None, y=None):
+    artifact = {
+        "format_version": FORMAT_VERSION,
+        "model_type": type(model).__name__,
+        "features": list(feature_names),
+        "coef": np.asarray(model.coef_, dtype=float).ravel().tolist(),
+        "intercept": float(np.asarray(model.intercept_, dtype=float).ravel()[0]),
+        "classes": np.asarray(model.classes_).tolist(),
+        "training_fingerprint": fingerprint_dataset(X, y) if X is not None else None,
+        "exported_at": datetime.utcnow().isoformat(),
+    }
+
+    with open(path, "w") as f:
+        json.dump(artifact, f, indent=2)
+
+    return artifact
+
+
+def artifact_path(model_path):
+    """ml/foo.pkl -> ml/foo.json"""
+    stem = model_path[:-4] if model_path.endswith(".pkl") else model_path
+    return stem + ".json"
+
+
+class LinearScorer:
+    def __init__(self, artifact):
+        if artifact.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported artifact version: {artifact.get('format_version')}")
+
+        self.features = artifact["features"]
+        self.coef = np.asarray(artifact["coef"], dtype=np.float64)
+        self.intercept = float(artifact["intercept"])
+        self.fingerprint = artifact.get("training_fingerprint")
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def predict_proba(self, X):
+        """Probability of the positive class for an (N, n_features) array."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        z = X @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def predict_record(self, record):
+        """Score one dict of named features."""
+        return float(self.predict_proba([record[f] for f in self.features])[0])
@@ -0,0 +1,198 @@
+"""
+Per-user personal model storage.
+
+Models live under ml/models/<user>/v<N>.pkl with a meta.json listing every
+version. Loaded models are kept in a bounded LRU so inference does not go
+back to disk on every request. Users without a personal model fall back
+to the external medical-dataset model.
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+from ml.linear_scorer import export_linear_model
+from ml.predictor import predict_risk
+from risk_engine import DEFAULT_CHOLESTEROL
+
+MODELS_DIR = "ml/models"
+CACHE_SIZE = 32
+
+
+def _user_key(user_email):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", user_email.lower()).strip("_")[:40]
+    digest = hashlib.sha1(user_email.lower().encode()).hexdigest()[:10]
+    return f"{slug}_{digest}"
+
+
+def _atomic_write(path, data, mode="wb"):
+    tmp = f"{path}.tmp"
+    with open(tmp, mode) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class PersonalModelRegistry:
+    def __init__(self, root=MODELS_DIR, cache_size=CACHE_SIZE):
+        self.root = root
+        self.cache_size = cache_size
+        # user_email -> (meta, model), or None when the user has no model
+        self._cache = OrderedDict()
+        self._pinned = set()  # users whose cached model has unsaved changes; never evicted
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "fallbacks": 0}
+
+    # ---------------- STORAGE ----------------
+    def _user_dir(self, user_email):
+        return os.path.join(self.root, _user_key(user_email))
+
+    def _read_meta(self, user_email):
+        path = os.path.join(self._user_dir(user_email), "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def versions(self, user_email):
+        meta = self._read_meta(user_email)
+        return meta["versions"] if meta else []
+
+    def latest(self, user_email):
+        versions = self.versions(user_email)
+        return versions[-1] if versions else None
+
+    def save(self, user_email, model, features, accuracy=None, X=None, y=None):
+        user_dir = self._user_dir(user_email)
+        os.makedirs(user_dir, exist_ok=True)
+
+        meta = self._read_meta(user_email) or {"user": user_email, "versions": []}
+        version = meta["versions"][-1]["version"] + 1 if meta["versions"] else 1
+
+        model_file = f"v{version}.pkl"
+        _atomic_write(os.path.join(user_dir, model_file), pickle.dumps(model))
+        export_linear_model(model, features, os.path.join(user_dir, f"v{version}.json"), X, y)
+
+        entry = {
+            "version": version,
+            "trained_at": datetime.utcnow().isoformat(),
+            "features": list(features),
+            "accuracy": accuracy,
+            "file": model_file,
+        }
+        meta["versions"].append(entry)
+        _atomic_write(os.path.join(user_dir, "meta.json"), json.dumps(meta, indent=2), mode="w")
+
+        self._put(user_email, (entry, model))
+        return entry
+
+    def update(self, user_email, model, n_updates=1):
+        """
+        Overwrite the latest version in place, for incrementally trained
+        models. Counts updates instead of creating a new version.
+        """
+        user_dir = self._user_dir(user_email)
+        meta = self._read_meta(user_email)
+        if not meta or not meta["versions"]:
+            raise ValueError(f"No model to update for {user_email}")
+
+        entry = meta["versions"][-1]
+        _atomic_write(os.path.join(user_dir, entry["file"]), pickle.dumps(model))
+        export_linear_model(
+            model, entry["features"], os.path.join(user_dir, f"v{entry['version']}.json")
+        )
+
+        entry["updates"] = entry.get("updates", 0) + n_updates
+        entry["updated_at"] = datetime.utcnow().isoformat()
+        _atomic_write(os.path.join(user_dir, "meta.json"), json.dumps(meta, indent=2), mode="w")
+
+        self._put(user_email, (entry, model))
+        return entry
+
+    # ---------------- LRU CACHE ----------------
+    def _put(self, user_email, loaded):
+        with self._lock:
+            self._cache[user_email] = loaded
+            self._cache.move_to_end(user_email)
+            while len(self._cache) > self.cache_size:
+                victim = next((user for user in self._cache if user not in self._pinned), None)
+                if victim is None:
+                    break
+                del self._cache[victim]
+                self.stats["evictions"] += 1
+
+    def pin(self, user_email, loaded):
+        """
+        Cache (meta entry, model) and keep it out of eviction until unpin(),
+        for a model updated in memory that isn't saved yet.
+        """
+        with self._lock:
+            self._pinned.add(user_email)
+        self._put(user_email, loaded)
+
+    def unpin(self, user_email):
+        with self._lock:
+            self._pinned.discard(user_email)
+
+    def load(self, user_email):
+        """Return (meta entry, model) for the latest version, or None."""
+        with self._lock:
+            if user_email in self._cache:
+                self._cache.move_to_end(user_email)
+                self.stats["hits"] += 1
+                return self._cache[user_email]
+            self.stats["misses"] += 1
+
+        entry = self.latest(user_email)
+        loaded = None
+        if entry is not None:
+            with open(os.path.join(self._user_dir(user_email), entry["file"]), "rb") as f:
+                loaded = entry, pickle.load(f)
+
+        self._put(user_email, loaded)
+        return loaded
+
+    def evict(self, user_email):
+        with self._lock:
+            if user_email not in self._pinned:
+                self._cache.pop(user_email, None)
+
+    # ---------------- INFERENCE ----------------
+    def predict(self, user_email, features):
+        """
+        Score a dict of named features with the user's personal model,
+        falling back to the external model.
+        Returns (probability %, label, source).
+        """
+        loaded = self.load(user_email) if user_email else None
+
+        if loaded is None:
+            with self._lock:
+                self.stats["fallbacks"] += 1
+            prob, label = predict_risk(
+                age=features["age"],
+                cholesterol=features.get("cholesterol", DEFAULT_CHOLESTEROL),
+                stress=features["stress"],
+                sleep=features["sleep"],
+                urine=0
+            )
+            return prob, label, "external"
+
+        entry, model = loaded
+        X = np.array([[features[f] for f in entry["features"]]], dtype=float)
+        prob = model.predict_proba(X)[0][1]
+        label = "HIGH" if prob >= 0.5 else "LOW"
+
+        return round(prob * 100, 2), label, f"personal v{entry['version']}"
+
+
+_registry = PersonalModelRegistry()
+
+
+def get_personal_registry():
+    return _registry
@@ -0,0 +1,181 @@
+"""
+Incremental personal models.
+
+Each saved health log updates the user's model with a single
+partial_fit step instead of refitting on the whole history. Every
+`refit_every` updates (or when the user has no online model yet) the
+model is refit from the full history to catch drift, and stored as a
+new version in the personal model registry. Between checkpoints the
+updated model is pinned in the registry's cache so it can't be evicted
+before it is saved; flush() saves every pending update and runs at exit.
+"""
+import atexit
+import threading
+
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+from ml.dataset_builder import FEATURES, encode_log
+from ml.model_registry import get_personal_registry
+
+CLASSES = np.array([0, 1])
+MIN_LOGS = 20
+REFIT_EVERY = 200
+CHECKPOINT_EVERY = 10
+REFIT_EPOCHS = 5
+
+
+class OnlineRiskModel:
+    """Logistic regression trained by SGD on running-standardized features."""
+
+    def __init__(self, alpha=1e-4, random_state=42):
+        self.alpha = alpha
+        self.random_state = random_state
+        self.features = list(FEATURES)
+        self._reset()
+
+    def _reset(self):
+        self.scaler = StandardScaler()
+        self.clf = SGDClassifier(
+            loss="log_loss", alpha=self.alpha, random_state=self.random_state
+        )
+        self.n_seen = 0
+
+    def partial_fit(self, X, y):
+        X = np.asarray(X, dtype=float)
+        self.scaler.partial_fit(X)
+        self.clf.partial_fit(self.scaler.transform(X), y, classes=CLASSES)
+        self.n_seen += len(X)
+        return self
+
+    def fit(self, X, y, epochs=REFIT_EPOCHS):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y)
+        self._reset()
+
+        self.scaler.fit(X)
+        Xs = self.scaler.transform(X)
+        rng = np.random.default_rng(self.random_state)
+        for _ in range(epochs):
+            order = rng.permutation(len(Xs))
+            self.clf.partial_fit(Xs[order], y[order], classes=CLASSES)
+
+        self.n_seen = len(X)
+        return self
+
+    def predict_proba(self, X):
+        return self.clf.predict_proba(self.scaler.transform(np.asarray(X, dtype=float)))
+
+    def predict(self, X):
+        return self.clf.predict(self.scaler.transform(np.asarray(X, dtype=float)))
+
+    # Raw-feature-space parameters, so export_linear_model works unchanged
+    @property
+    def coef_(self):
+        return self.clf.coef_ / self.scaler.scale_
+
+    @property
+    def intercept_(self):
+        return self.clf.intercept_ - self.coef_ @ self.scaler.mean_
+
+    @property
+    def classes_(self):
+        return self.clf.classes_
+
+
+class OnlineTrainer:
+    """
+    history_fn(user_email) -> list of log dicts; only called for full refits.
+    """
+
+    def __init__(
+        self,
+        history_fn,
+        registry=None,
+        refit_every=REFIT_EVERY,
+        checkpoint_every=CHECKPOINT_EVERY,
+        min_logs=MIN_LOGS
+    ):
+        self.history_fn = history_fn
+        self.registry = registry or get_personal_registry()
+        self.refit_every = refit_every
+        self.checkpoint_every = checkpoint_every
+        self.min_logs = min_logs
+
+        self._pending = {}  # user_email -> updates not yet checkpointed
+        self._since_refit = {}
+        self._lock = threading.Lock()
+
+    def refit(self, user_email):
+        rows = [r for r in map(encode_log, self.history_fn(user_email)) if r is not None]
+        if len(rows) < self.min_logs:
+            return None
+
+        X = np.array([r[0] for r in rows])
+        y = np.array([r[1] for r in rows])
+        model = OnlineRiskModel().fit(X, y)
+        acc = float((model.predict(X) == y).mean())
+
+        self.registry.save(
+            user_email, model, model.features, accuracy=round(acc * 100, 2), X=X, y=y
+        )
+        with self._lock:
+            self._pending[user_email] = 0
+            self._since_refit[user_email] = 0
+        self.registry.unpin(user_email)
+        return model
+
+    def observe(self, user_email, log):
+        """
+        Update the user's model with one freshly saved log.
+        Returns "skipped", "updated" or "refit".
+        """
+        encoded = encode_log(log)
+        if encoded is None:
+            return "skipped"
+
+        loaded = self.registry.load(user_email)
+        model = loaded[1] if loaded else None
+
+        with self._lock:
+            since_refit = self._since_refit.get(user_email, 0)
+
+        if not isinstance(model, OnlineRiskModel) or since_refit >= self.refit_every:
+            return "refit" if self.refit(user_email) is not None else "skipped"
+
+        row, target = encoded
+        model.partial_fit([row], [target])
+
+        with self._lock:
+            self._since_refit[user_email] = since_refit + 1
+            pending = self._pending.get(user_email, 0) + 1
+            self._pending[user_email] = 0 if pending >= self.checkpoint_every else pending
+
+        if pending >= self.checkpoint_every:
+            self.registry.update(user_email, model, n_updates=pending)
+            self.registry.unpin(user_email)
+        else:
+            self.registry.pin(user_email, loaded)  # only in memory until the next checkpoint
+        return "updated"
+
+    def flush(self, user_email=None):
+        """Save pending updates for one user, or for every user."""
+        with self._lock:
+            users = list(self._pending) if user_email is None else [user_email]
+            pending = {user: self._pending.pop(user, 0) for user in users}
+        for user, n_updates in pending.items():
+            if n_updates:
+                self.registry.update(user, self.registry.load(user)[1], n_updates=n_updates)
+                self.registry.unpin(user)
+
+
+_trainer = None
+
+
+def get_online_trainer(history_fn):
+    global _trainer
+    if _trainer is None:
+        _trainer = OnlineTrainer(history_fn)
+        atexit.register(_trainer.flush)
+    return _trainer
@@ -1,15 +1,130 @@
+import hashlib
+import os
 import pickle
+import threading
+import time
+
 import numpy as np
 
+from monitoring.metrics import get_metrics
+
 MODEL_PATH = "ml/external_risk_model.pkl"
 
-def predict_risk(age, cholesterol, stress, sleep, urine):
-    with open(MODEL_PATH, "rb") as f:
-        model = pickle.load(f)
 
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Keeps an unpickled model in memory for the life of the process.
+
+    The file's mtime is checked on every access; when it moves (e.g. after
+    train_from_external_data rewrites the pickle) the content hash decides
+    whether the model is actually reloaded.
+    """
+
+    def __init__(self, path=MODEL_PATH):
+        self.path = path
+        self._model = None
+        self._mtime = None
+        self._hash = None
+        self._lock = threading.Lock()
+        self.stats = {
+            "loads": 0,
+            "cache_hits": 0,
+            "predict_calls": 0,
+            "rows_scored": 0,
+            "last_latency_ms": 0.0,
+            "total_latency_ms": 0.0,
+        }
+
+    def get(self):
+        mtime = os.stat(self.path).st_mtime_ns
+
+        with self._lock:
+            if self._model is not None and mtime == self._mtime:
+                self.stats["cache_hits"] += 1
+                return self._model
+
+            digest = _file_hash(self.path)
+            if self._model is not None and digest == self._hash:
+                # Touched but unchanged
+                self._mtime = mtime
+                self.stats["cache_hits"] += 1
+                return self._model
+
+            with get_metrics().timer("model.load"), open(self.path, "rb") as f:
+                self._model = pickle.load(f)
+
+            self._mtime = mtime
+            self._hash = digest
+            self.stats["loads"] += 1
+            return self._model
+
+    def invalidate(self):
+        with self._lock:
+            self._model = None
+            self._mtime = None
+            self._hash = None
+
+    def predict_proba(self, X):
+        start = time.perf_counter()
+        probs = self.get().predict_proba(X)[:, 1]
+        elapsed = (time.perf_counter() - start) * 1000
+
+        metrics = get_metrics()
+        if metrics.active:
+            metrics.observe("model.predict", elapsed / 1000)
+            metrics.incr("model.rows_scored", len(probs))
+
+        with self._lock:
+            self.stats["predict_calls"] += 1
+            self.stats["rows_scored"] += len(probs)
+            self.stats["last_latency_ms"] = elapsed
+            self.stats["total_latency_ms"] += elapsed
+
+        return probs
+
+
+_registry = ModelRegistry()
+
+
+def get_registry():
+    return _registry
+
+
+def get_model_stats():
+    stats = dict(_registry.stats)
+    calls = stats["predict_calls"]
+    stats["mean_latency_ms"] = stats["total_latency_ms"] / calls if calls else 0.0
+    return stats
+
+
+def predict_risk(age, cholesterol, stress, sleep, urine):
     X = np.array([[age, cholesterol, stress, sleep, urine]])
 
-    prob = model.predict_proba(X)[0][1]  # probability of high risk
+    prob = _registry.predict_proba(X)[0]  # probability of high risk
     label = "HIGH" if prob >= 0.5 else "LOW"
 
     return round(prob * 100, 2), label
+
+
+def predict_batch(X):
+    """
+    Score an (N, 5) array of [age, cholesterol, stress, sleep, urine]
+    rows with a single predict_proba call.
+    Returns (probabilities in %, labels) as arrays.
+    """
+    X = np.asarray(X, dtype=float)
+    if X.ndim != 2 or X.shape[1] != 5:
+        raise ValueError(f"Expected an (N, 5) array, got shape {X.shape}")
+
+    probs = _registry.predict_proba(X)
+    labels = np.where(probs >= 0.5, "HIGH", "LOW")
+
+    return np.round(probs * 100, 2), labels
@@ -1,19 +1,17 @@
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
 import pickle
 
-def train_from_external_data(X, y):
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+from ml.cv_runner import cross_validate
+from ml.linear_scorer import artifact_path, export_linear_model
 
-    model = LogisticRegression(max_iter=1000)
-    model.fit(X_train, y_train)
+MODEL_PATH = "ml/external_risk_model.pkl"
 
-    acc = accuracy_score(y_test, model.predict(X_test))
+def train_from_external_data(X, y, with_report=False, **cv_options):
+    report = cross_validate(X, y, base_params={"max_iter": 1000}, **cv_options)
+    model = report.model
 
-    with open("ml/external_risk_model.pkl", "wb") as f:
+    with open(MODEL_PATH, "wb") as f:
         pickle.dump(model, f)
 
-    return round(acc * 100, 2)
+    export_linear_model(model, X.columns, artifact_path(MODEL_PATH), X, y)
+
+    return (report.accuracy, report) if with_report else report.accuracy
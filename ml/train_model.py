@@ -1,22 +1,35 @@
 import pickle
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
 
-def train_risk_model(df):
-    X = df[["age", "weight", "stress", "sleep", "urine"]]
-    y = df["target"]
+from ml.cv_runner import cross_validate
+from ml.dataset_builder import FEATURES
+from ml.linear_scorer import artifact_path, export_linear_model
+from ml.model_registry import get_personal_registry
+
+MODEL_PATH = "ml/risk_model.pkl"
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+def train_risk_model(df, user_email=None, with_report=False, **cv_options):
+    """
+    Fit a personal model on a build_dataset frame, picking the best
+    parameters by cross-validation. With user_email the model is stored
+    as a new version in the personal model registry, otherwise it goes to
+    the shared MODEL_PATH. Returns the CV accuracy in percent (and the
+    CVReport when with_report=True). cv_options go to cross_validate.
+    """
+    X = df[FEATURES]
+    y = df["target"]
 
-    model = LogisticRegression()
-    model.fit(X_train, y_train)
+    report = cross_validate(X, y, **cv_options)
+    model = report.model
+    acc = report.accuracy
 
-    acc = accuracy_score(y_test, model.predict(X_test))
+    if user_email:
+        get_personal_registry().save(
+            user_email, model, X.columns, accuracy=acc, X=X, y=y
+        )
+    else:
+        with open(MODEL_PATH, "wb") as f:
+            pickle.dump(model, f)
 
-    with open("ml/risk_model.pkl", "wb") as f:
-        pickle.dump(model, f)
+        export_linear_model(model, X.columns, artifact_path(MODEL_PATH), X, y)
 
-    return round(acc * 100, 2)
+    return (acc, report) if with_report else acc
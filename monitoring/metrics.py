@@ -0,0 +1,274 @@
+"""
+Lightweight timers, counters and per-rerun traces.
+
+    from monitoring.metrics import get_metrics, timed
+
+    with get_metrics().timer("db.read"):
+        ...
+    get_metrics().incr("db.logs_read", len(logs))
+
+    @timed("engine.assess_risk")
+    def assess_risk(...): ...
+
+Recording is on when WELLPATH_METRICS is set (or enable() is called), and
+inside a trace (begin_trace/end_trace) so the dashboard can show a
+per-rerun breakdown on demand. Otherwise timer() hands back a shared no-op
+context manager and @timed calls straight through, so instrumented code
+pays one flag check.
+
+Aggregates export as Prometheus text (overwritten) or JSON lines
+(appended), chosen by the file extension of WELLPATH_METRICS_FILE. In
+JSON-lines mode recording exports on its own every EXPORT_INTERVAL, or
+once MAX_PENDING_EVENTS are buffered, so processes that never call
+export() (the scoring service, batch jobs) don't grow without bound.
+"""
+import contextvars
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+METRICS_FILE = "data/metrics.prom"
+EXPORT_INTERVAL = 5.0  # seconds between automatic exports
+MAX_PENDING_EVENTS = 10_000  # buffered JSON-lines events that force an export
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = "wellpath_"
+
+_trace = contextvars.ContextVar("wellpath_trace", default=None)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, error=exc_type is not None, **self.labels)
+        return False
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+
+class Metrics:
+    def __init__(self, enabled=False, path=None):
+        self.enabled = enabled
+        self.path = path
+        self._lock = threading.Lock()
+        self._timers = {}  # key -> [count, sum, max, errors, bucket counts...]
+        self._counters = defaultdict(float)
+        self._events = []  # pending JSON-lines records
+        self._last_export = time.monotonic()
+
+    def enable(self, path=None):
+        self.enabled = True
+        self.path = path or self.path
+
+    def disable(self):
+        self.enabled = False
+
+    @property
+    def active(self):
+        return self.enabled or _trace.get() is not None
+
+    # ---------------- RECORDING ----------------
+    def timer(self, name, **labels):
+        if not self.enabled and _trace.get() is None:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def observe(self, name, seconds, error=False, **labels):
+        spans = _trace.get()
+        if spans is not None:
+            spans.append((name, labels, seconds))
+        if not self.enabled:
+            return
+
+        key = _key(name, labels)
+        pending = 0
+        with self._lock:
+            agg = self._timers.get(key)
+            if agg is None:
+                agg = self._timers[key] = [0, 0.0, 0.0, 0] + [0] * len(BUCKETS)
+            agg[0] += 1
+            agg[1] += seconds
+            agg[2] = max(agg[2], seconds)
+            agg[3] += error
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    agg[4 + i] += 1
+            if self.path and self.path.endswith(".jsonl"):
+                self._events.append({"ts": time.time(), "metric": name, "labels": labels,
+                                     "seconds": round(seconds, 6), "error": error})
+                pending = len(self._events)
+        if pending:
+            self.export(force=pending >= MAX_PENDING_EVENTS)
+
+    def incr(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[_key(name, labels)] += value
+
+    # ---------------- TRACES ----------------
+    def begin_trace(self):
+        """Start collecting spans for the current context (e.g. one app rerun)."""
+        return _trace.set([])
+
+    def end_trace(self, token=None):
+        """Stop collecting; returns [(name, labels, seconds)] in completion order."""
+        spans = _trace.get() or []
+        if token is not None:
+            _trace.reset(token)
+        else:
+            _trace.set(None)
+        return spans
+
+    # ---------------- EXPORT ----------------
+    def snapshot(self):
+        with self._lock:
+            timers = {
+                (name, labels): {
+                    "count": agg[0], "sum": agg[1], "max": agg[2], "errors": agg[3],
+                    "buckets": dict(zip(BUCKETS, agg[4:])),
+                }
+                for (name, labels), agg in self._timers.items()
+            }
+            counters = dict(self._counters)
+        return {"timers": timers, "counters": counters}
+
+    def to_prometheus(self):
+        snap = self.snapshot()
+        lines = []
+
+        def fmt_labels(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+        seen = set()
+        for (name, labels), t in sorted(snap["timers"].items()):
+            metric = _prom_name(name) + "_seconds"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} histogram")
+                seen.add(metric)
+            for bound, count in t["buckets"].items():
+                lines.append(f"{metric}_bucket{fmt_labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{metric}_bucket{fmt_labels(labels, [('le', '+Inf')])} {t['count']}")
+            lines.append(f"{metric}_sum{fmt_labels(labels)} {t['sum']:.6f}")
+            lines.append(f"{metric}_count{fmt_labels(labels)} {t['count']}")
+
+        for (name, labels), value in sorted(snap["counters"].items()):
+            metric = _prom_name(name) + "_total"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{fmt_labels(labels)} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=None, force=False):
+        """
+        Write metrics to path (default self.path): Prometheus text for
+        .prom/.txt (whole file replaced), JSON lines for .jsonl (pending
+        events appended). Rate-limited to EXPORT_INTERVAL unless force=True.
+        """
+        path = path or self.path
+        if not self.enabled or not path:
+            return False
+        now = time.monotonic()
+        if not force and now - self._last_export < EXPORT_INTERVAL:
+            return False
+        self._last_export = now
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if path.endswith(".jsonl"):
+            with self._lock:
+                events, self._events = self._events, []
+            with open(path, "a") as f:
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+                for (name, labels), value in self.snapshot()["counters"].items():
+                    f.write(json.dumps({"ts": time.time(), "metric": name, "labels": dict(labels),
+                                        "total": value}) + "\n")
+        else:
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp, path)
+        return True
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self._events.clear()
+
+
+def summarize_trace(spans):
+    """Total ms and call count per span name (labels folded in), slowest first."""
+    totals = {}
+    for name, labels, seconds in spans:
+        label = name + ("[" + ",".join(f"{v}" for _, v in sorted(labels.items())) + "]" if labels else "")
+        calls, total = totals.get(label, (0, 0.0))
+        totals[label] = (calls + 1, total + seconds)
+    return [
+        {"span": label, "calls": calls, "ms": round(total * 1000, 2)}
+        for label, (calls, total) in sorted(totals.items(), key=lambda kv: -kv[1][1])
+    ]
+
+
+def _prom_name(name):
+    return PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+_metrics = Metrics(
+    enabled=bool(os.environ.get("WELLPATH_METRICS")),
+    path=os.environ.get("WELLPATH_METRICS_FILE", METRICS_FILE)
+)
+
+
+def get_metrics():
+    return _metrics
+
+
+def timed(name, **labels):
+    """Decorator form of get_metrics().timer(name)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _metrics.enabled and _trace.get() is None:
+                return fn(*args, **kwargs)
+            with _Timer(_metrics, name, labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,100 @@
+"""
+Cohort-wide recommendations in one vectorized pass.
+
+Takes one long DataFrame of many users' logs and produces, per user, the
+same recommendation codes generate_recommendations would for that user's
+time-ordered logs, packed as a bitmask over recommender.CODES. Text is
+resolved only when asked for (expand_codes / with_text).
+"""
+import numpy as np
+import pandas as pd
+
+from recommendation.recommender import CODE_BITS, expand_codes
+
+RECENT = 5
+
+
+def _nan_mean(values, recent, codes, n_groups):
+    valid = recent & ~np.isnan(values)
+    sums = np.bincount(codes, weights=np.where(valid, values, 0.0), minlength=n_groups)
+    counts = np.bincount(codes, weights=valid, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def generate_recommendations_batch(
+    logs,
+    rule_levels=None,
+    ml_labels=None,
+    by="user",
+    time_col="timestamp"
+):
+    """
+    logs: long DataFrame with by, time_col, stress, sleep, risk_score.
+    rule_levels / ml_labels: per-user values (Series or dict keyed by
+    user). Default to each user's latest risk_level / ml_risk_label.
+
+    Returns a DataFrame indexed by user with the inputs that drove the
+    decision (avg_stress, avg_sleep, risk_start, risk_end, disagree) and
+    a `codes` bitmask.
+    """
+    df = logs.sort_values([by, time_col], kind="stable")
+    user_codes, users = pd.factorize(df[by], sort=False)
+    n_groups = len(users)
+
+    sizes = np.bincount(user_codes, minlength=n_groups)
+    ends = np.cumsum(sizes)
+    from_end = ends[user_codes] - 1 - np.arange(len(df))  # 0 = latest log
+    recent = from_end < RECENT
+
+    avg_stress = _nan_mean(df["stress"].to_numpy(np.float64), recent, user_codes, n_groups)
+    avg_sleep = _nan_mean(df["sleep"].to_numpy(np.float64), recent, user_codes, n_groups)
+
+    risk = df["risk_score"].to_numpy()
+    last_row = ends - 1
+    first_recent = ends - np.minimum(sizes, RECENT)
+    risk_start = risk[first_recent]
+    risk_end = risk[last_row]
+
+    def per_user(values, column):
+        if values is None:
+            return df[column].to_numpy()[last_row] if column in df else np.full(n_groups, None)
+        return pd.Series(values).reindex(users).to_numpy()
+
+    rule = per_user(rule_levels, "risk_level").astype(object)
+    ml = per_user(ml_labels, "ml_risk_label").astype(object)
+    disagree = rule != ml
+
+    mask = np.where(risk_end > risk_start, CODE_BITS["RISK_RISING"], CODE_BITS["RISK_STABLE"])
+    mask |= np.select(
+        [avg_stress >= 7, avg_stress >= 5],
+        [CODE_BITS["STRESS_HIGH"], CODE_BITS["STRESS_MODERATE"]],
+        0
+    )
+    mask |= np.where(avg_sleep < 6, CODE_BITS["SLEEP_LOW"], 0)
+    mask |= np.select(
+        [rule == "HIGH", rule == "MEDIUM"],
+        [CODE_BITS["LEVEL_HIGH"], CODE_BITS["LEVEL_MEDIUM"]],
+        CODE_BITS["LEVEL_LOW"]
+    )
+    mask |= np.where(disagree, CODE_BITS["AI_RULE_DISAGREE"], 0)
+
+    # Fewer than two logs: only the "log more" nudge
+    mask = np.where(sizes < 2, CODE_BITS["LOG_MORE"], mask)
+
+    return pd.DataFrame({
+        "n_logs": sizes,
+        "avg_stress": avg_stress,
+        "avg_sleep": avg_sleep,
+        "risk_start": risk_start,
+        "risk_end": risk_end,
+        "disagree": disagree,
+        "codes": mask.astype(np.int16),
+    }, index=pd.Index(users, name=by))
+
+
+def with_text(result):
+    """Add a `recommendations` column of text lists (resolved per user)."""
+    result = result.copy()
+    result["recommendations"] = [expand_codes(m) for m in result["codes"]]
+    return result
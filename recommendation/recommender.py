@@ -1,12 +1,27 @@
-def generate_recommendations(df, rule_risk_level, ml_label):
-    recommendations = []
+# Recommendation codes, in the order they are emitted. Batch jobs store
+# them as a bitmask (bit i = CODES[i]) and resolve text only on demand.
+RECOMMENDATION_TEXT = {
+    "LOG_MORE": "Log your health daily to unlock personalized recommendations.",
+    "RISK_RISING": "Your health risk has been increasing recently. Focus on recovery and stress reduction.",
+    "RISK_STABLE": "Your recent health trend is stable or improving. Keep maintaining these habits.",
+    "STRESS_HIGH": "High stress levels detected. Consider breathing exercises, reduced screen time, or short breaks.",
+    "STRESS_MODERATE": "Moderate stress levels observed. Improving work-life balance may help.",
+    "SLEEP_LOW": "Consistently low sleep detected. Aim for at least 7–8 hours to support recovery.",
+    "LEVEL_HIGH": "High overall risk detected. Avoid strenuous activity and consider consulting a healthcare professional.",
+    "LEVEL_MEDIUM": "Moderate risk detected. Lifestyle improvements can significantly reduce future risk.",
+    "LEVEL_LOW": "Low risk detected. Continue healthy habits and regular monitoring.",
+    "AI_RULE_DISAGREE": "AI and rule-based assessments differ. Monitor closely and log more data for clarity.",
+}
+
+CODES = list(RECOMMENDATION_TEXT)
+CODE_BITS = {code: 1 << i for i, code in enumerate(CODES)}
+
 
+def recommendation_codes(df, rule_risk_level, ml_label):
     if df is None or len(df) < 2:
-        recommendations.append(
-            "Log your health daily to unlock personalized recommendations."
-        )
-        return recommendations
+        return ["LOG_MORE"]
 
+    codes = []
     recent = df.tail(5)
 
     avg_stress = recent["stress"].mean()
@@ -16,49 +31,41 @@ def generate_recommendations(df, rule_risk_level, ml_label):
     risk_end = recent["risk_score"].iloc[-1]
 
     # -------- RISK TREND --------
-    if risk_end > risk_start:
-        recommendations.append(
-            "Your health risk has been increasing recently. Focus on recovery and stress reduction."
-        )
-    else:
-        recommendations.append(
-            "Your recent health trend is stable or improving. Keep maintaining these habits."
-        )
+    codes.append("RISK_RISING" if risk_end > risk_start else "RISK_STABLE")
 
     # -------- STRESS --------
     if avg_stress >= 7:
-        recommendations.append(
-            "High stress levels detected. Consider breathing exercises, reduced screen time, or short breaks."
-        )
+        codes.append("STRESS_HIGH")
     elif avg_stress >= 5:
-        recommendations.append(
-            "Moderate stress levels observed. Improving work-life balance may help."
-        )
+        codes.append("STRESS_MODERATE")
 
     # -------- SLEEP --------
     if avg_sleep < 6:
-        recommendations.append(
-            "Consistently low sleep detected. Aim for at least 7–8 hours to support recovery."
-        )
+        codes.append("SLEEP_LOW")
 
     # -------- RISK LEVEL BASED --------
     if rule_risk_level == "HIGH":
-        recommendations.append(
-            "High overall risk detected. Avoid strenuous activity and consider consulting a healthcare professional."
-        )
+        codes.append("LEVEL_HIGH")
     elif rule_risk_level == "MEDIUM":
-        recommendations.append(
-            "Moderate risk detected. Lifestyle improvements can significantly reduce future risk."
-        )
+        codes.append("LEVEL_MEDIUM")
     else:
-        recommendations.append(
-            "Low risk detected. Continue healthy habits and regular monitoring."
-        )
+        codes.append("LEVEL_LOW")
 
     # -------- AI vs RULE DISAGREEMENT --------
     if rule_risk_level != ml_label:
-        recommendations.append(
-            "AI and rule-based assessments differ. Monitor closely and log more data for clarity."
-        )
+        codes.append("AI_RULE_DISAGREE")
+
+    return codes
+
+
+def generate_recommendations(df, rule_risk_level, ml_label):
+    return [
+        RECOMMENDATION_TEXT[code]
+        for code in recommendation_codes(df, rule_risk_level, ml_label)
+    ]
+
 
-    return recommendations
+def expand_codes(mask):
+    """Bitmask from the batch job -> recommendation texts, in display order."""
+    mask = int(mask)
+    return [RECOMMENDATION_TEXT[code] for code in CODES if mask & CODE_BITS[code]]
@@ -1,7 +1,12 @@
 from dataclasses import dataclass
-from typing import List, Dict
+from itertools import chain
+from typing import List, Dict, Mapping
 
-@dataclass
+import numpy as np
+
+from monitoring.metrics import timed
+
+@dataclass(slots=True)
 class HealthInput:
     age: int
     weight: float
@@ -10,17 +15,62 @@ class HealthInput:
     urine_frequency: str    # "normal" or "increased"
     symptoms: List[str]     # e.g. ["fatigue", "fever"]
 
+SYMPTOM_WEIGHTS = {
+    "fever": 25,
+    "fatigue": 15,
+    "chest_pain": 40,
+    "shortness_of_breath": 40,
+    "dizziness": 20,
+    "frequent_urination": 20
+}
+
+# Reason bits for assess_batch. Symptom reasons follow from bit
+# SYMPTOM_REASON_OFFSET in symptom_weights order.
+REASON_AGE = 1 << 0
+REASON_STRESS = 1 << 1
+REASON_SLEEP = 1 << 2
+REASON_URINE = 1 << 3
+SYMPTOM_REASON_OFFSET = 4
+
+FACTOR_REASONS = (
+    (REASON_AGE, "Age above 45 increases health risk"),
+    (REASON_STRESS, "High stress levels detected"),
+    (REASON_SLEEP, "Insufficient sleep"),
+    (REASON_URINE, "Increased urination may indicate metabolic issues"),
+)
+
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH")
+RISK_ACTIONS = (
+    "Continue monitoring and maintain a healthy lifestyle.",
+    "Consider consulting a general physician within 1–2 weeks.",
+    "Seek medical attention as soon as possible.",
+)
+
+# The form doesn't collect cholesterol; the ML models get this instead
+DEFAULT_CHOLESTEROL = 200
+
+# Column aliases so both HealthInput names and stored log names work
+BATCH_COLUMNS = {
+    "age": ("age",),
+    "stress_level": ("stress_level", "stress"),
+    "sleep_hours": ("sleep_hours", "sleep"),
+    "urine_frequency": ("urine_frequency", "urine"),
+    "symptoms": ("symptoms",),
+}
+
+
+def _column(data, name):
+    for key in BATCH_COLUMNS[name]:
+        if key in data:
+            return data[key]
+    raise KeyError(f"Missing column for {name}: expected one of {BATCH_COLUMNS[name]}")
+
+
 class HealthRiskEngine:
     def __init__(self):
-        self.symptom_weights = {
-            "fever": 25,
-            "fatigue": 15,
-            "chest_pain": 40,
-            "shortness_of_breath": 40,
-            "dizziness": 20,
-            "frequent_urination": 20
-        }
+        self.symptom_weights = dict(SYMPTOM_WEIGHTS)
 
+    @timed("engine.assess_risk")
     def assess_risk(self, data: HealthInput) -> Dict:
         score = 0
         reasons = []
@@ -71,3 +121,129 @@ class HealthRiskEngine:
             "reasons": reasons,
             "recommended_action": action
         }
+
+    # ---------------- BATCH SCORING ----------------
+    def _symptom_pairs(self, symptoms):
+        # Flatten a column of symptom lists into (row, vocab index) pairs
+        lists = [s if isinstance(s, (list, tuple)) else () for s in symptoms]
+        n = len(lists)
+        lengths = np.fromiter(map(len, lists), dtype=np.intp, count=n)
+        flat = np.array(list(chain.from_iterable(lists)), dtype=object)
+        if flat.size == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return n, empty, empty
+
+        index = {name: i for i, name in enumerate(self.symptom_weights)}
+        uniq, inverse = np.unique(flat, return_inverse=True)
+        codes = np.array([index.get(u, -1) for u in uniq], dtype=np.int64)[inverse]
+
+        rows = np.repeat(np.arange(n), lengths)
+        known = codes >= 0
+        return n, rows[known], codes[known]
+
+    def symptom_codes(self, symptoms) -> np.ndarray:
+        """
+        Encode a column of symptom lists as one bitmask per row
+        (bit i = i-th key of symptom_weights). Unknown symptoms are dropped.
+        """
+        n, rows, codes = self._symptom_pairs(symptoms)
+        mask = np.zeros(n, dtype=np.int64)
+        np.bitwise_or.at(mask, rows, np.int64(1) << codes)
+        return mask
+
+    def symptom_counts(self, symptoms) -> np.ndarray:
+        """
+        Per-row occurrence counts of each known symptom, shape (N, V).
+        Repeated symptoms count once per occurrence, like assess_risk.
+        Integer columns are treated as symptom_codes bitmasks.
+        """
+        vocab_size = len(self.symptom_weights)
+        if isinstance(symptoms, np.ndarray) and symptoms.dtype.kind in "iu":
+            bits = np.int64(1) << np.arange(vocab_size, dtype=np.int64)
+            return ((symptoms.astype(np.int64)[:, None] & bits) != 0).astype(np.int64)
+
+        n, rows, codes = self._symptom_pairs(symptoms)
+        counts = np.zeros((n, vocab_size), dtype=np.int64)
+        np.add.at(counts, (rows, codes), 1)
+        return counts
+
+    @timed("engine.assess_batch")
+    def assess_batch(self, data: Mapping) -> Dict[str, np.ndarray]:
+        """
+        Vectorized assess_risk over many inputs at once.
+
+        data: DataFrame or mapping of columns. Accepts HealthInput field
+        names (stress_level, sleep_hours, urine_frequency) or stored log
+        names (stress, sleep, urine). symptoms may be lists of names or an
+        integer bitmask column from symptom_codes.
+
+        Returns arrays risk_score, risk_level, recommended_action and
+        reason_mask; use expand_reasons to turn a mask into text.
+        """
+        age = np.asarray(_column(data, "age"))
+        stress = np.asarray(_column(data, "stress_level"))
+        sleep = np.asarray(_column(data, "sleep_hours"))
+        urine = np.asarray(_column(data, "urine_frequency"))
+        symptoms = _column(data, "symptoms")
+        if not isinstance(symptoms, (list, tuple)):
+            symptoms = np.asarray(symptoms)
+
+        weights = np.array(list(self.symptom_weights.values()))
+        counts = self.symptom_counts(symptoms)
+
+        age_hit = age >= 45
+        stress_hit = stress >= 7
+        sleep_hit = sleep < 6
+        urine_hit = urine == "increased"
+
+        score = (
+            age_hit * 15
+            + stress_hit * 15
+            + sleep_hit * 10
+            + urine_hit * 20
+            + counts @ weights
+        )
+        score = np.minimum(score, 100)
+
+        level_idx = (score >= 30).astype(np.int8) + (score >= 60)
+        levels = np.array(RISK_LEVELS, dtype=object)[level_idx]
+        actions = np.array(RISK_ACTIONS, dtype=object)[level_idx]
+
+        symptom_bits = np.int64(1) << np.arange(
+            SYMPTOM_REASON_OFFSET, SYMPTOM_REASON_OFFSET + len(weights), dtype=np.int64
+        )
+        reason_mask = (
+            age_hit * REASON_AGE
+            | stress_hit * REASON_STRESS
+            | sleep_hit * REASON_SLEEP
+            | urine_hit * REASON_URINE
+            | ((counts > 0) * symptom_bits).sum(axis=1)
+        ).astype(np.int64)
+
+        return {
+            "risk_score": score,
+            "risk_level": levels,
+            "recommended_action": actions,
+            "reason_mask": reason_mask,
+        }
+
+    def expand_reasons(self, mask: int, symptoms=None) -> List[str]:
+        """
+        Turn a reason_mask value into assess_risk-style reason strings.
+
+        A mask records which symptoms scored, not their order or repeats.
+        Pass the row's symptom list to get exactly assess_risk's reasons
+        (input order, one per occurrence); without it, symptoms come out
+        in symptom_weights order, once each.
+        """
+        mask = int(mask)
+        reasons = [text for bit, text in FACTOR_REASONS if mask & bit]
+        if symptoms is None:
+            symptoms = [
+                symptom for i, symptom in enumerate(self.symptom_weights)
+                if mask & (1 << (SYMPTOM_REASON_OFFSET + i))
+            ]
+        for symptom in symptoms:
+            if symptom in self.symptom_weights:
+                reasons.append(f"Symptom reported: {symptom.replace('_', ' ')}")
+        return reasons
@@ -0,0 +1,327 @@
+"""
+Headless scoring service: rule engine + external ML model over HTTP.
+
+A small asyncio HTTP/1.1 server (no web framework) with:
+
+    POST /score        one health input  -> one result
+    POST /score/batch  {"records": [...]} -> {"results": [...]}
+    GET  /health       status and batching stats
+
+Concurrent /score requests are queued and scored together in
+micro-batches of up to max_batch records, waiting at most max_wait_ms for
+a batch to fill: one assess_batch pass and one predict_proba call per
+batch. Results have the fields app.py stores with each log. If a batch
+fails, its records are rescored one at a time so only the request that
+caused the error gets it.
+
+Run from the repo root:  python -m service.scoring_server --port 8765
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+
+import numpy as np
+
+from ml.predictor import predict_batch
+from risk_engine import DEFAULT_CHOLESTEROL, HealthRiskEngine
+
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_BATCH = 64
+MAX_WAIT_MS = 5.0
+MAX_BODY_BYTES = 1 << 20
+
+REQUIRED_FIELDS = ("age", "stress", "sleep", "urine")
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# ---------------- SCORING ----------------
+def validate_record(record):
+    """Normalize one request body to a stored-log style dict, or raise BadRequest."""
+    if not isinstance(record, dict):
+        raise BadRequest("Each record must be a JSON object")
+    missing = [f for f in REQUIRED_FIELDS if f not in record]
+    if missing:
+        raise BadRequest(f"Missing fields: {missing}")
+    symptoms = record.get("symptoms") or []
+    if not isinstance(symptoms, list):
+        raise BadRequest("symptoms must be a list")
+    try:
+        clean = {
+            "age": float(record["age"]),
+            "stress": float(record["stress"]),
+            "sleep": float(record["sleep"]),
+            "urine": str(record["urine"]),
+            "symptoms": [str(s) for s in symptoms],
+            "cholesterol": float(record.get("cholesterol", DEFAULT_CHOLESTEROL)),
+        }
+    except (TypeError, ValueError):
+        raise BadRequest("age, stress, sleep and cholesterol must be numbers") from None
+    if not all(math.isfinite(clean[f]) for f in ("age", "stress", "sleep", "cholesterol")):
+        raise BadRequest("age, stress, sleep and cholesterol must be finite numbers")
+    if clean["urine"] not in ("normal", "increased"):
+        raise BadRequest("urine must be 'normal' or 'increased'")
+    return clean
+
+
+def score_records(records, engine):
+    """
+    Vectorized scoring of validated records: one rule-engine pass and one
+    predict_proba call. ML features follow the app's fallback path
+    (default cholesterol, urine 0).
+    """
+    columns = {
+        "age": np.array([r["age"] for r in records]),
+        "stress": np.array([r["stress"] for r in records]),
+        "sleep": np.array([r["sleep"] for r in records]),
+        "urine": np.array([r["urine"] for r in records], dtype=object),
+        "symptoms": [r["symptoms"] for r in records],
+    }
+    rules = engine.assess_batch(columns)
+
+    X = np.column_stack([
+        columns["age"],
+        [r["cholesterol"] for r in records],
+        columns["stress"],
+        columns["sleep"],
+        np.zeros(len(records)),
+    ])
+    ml_prob, ml_label = predict_batch(X)
+
+    return [
+        {
+            "risk_level": str(rules["risk_level"][i]),
+            "risk_score": int(rules["risk_score"][i]),
+            "recommended_action": str(rules["recommended_action"][i]),
+            "reasons": engine.expand_reasons(rules["reason_mask"][i], records[i]["symptoms"]),
+            "ml_risk_label": str(ml_label[i]),
+            "ml_risk_probability": float(ml_prob[i]),
+            "ai_rule_disagree": bool(rules["risk_level"][i] != ml_label[i]),
+        }
+        for i in range(len(records))
+    ]
+
+
+class MicroBatcher:
+    """Collects concurrently submitted records and scores them together."""
+
+    def __init__(self, score_fn, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.score_fn = score_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = asyncio.Queue()
+        self._worker = None
+        self.stats = {
+            "requests": 0, "batches": 0, "largest_batch": 0, "last_batch_ms": 0.0, "failed_batches": 0
+        }
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, record):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        self.stats["requests"] += 1
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            records = [record for record, _ in batch]
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(None, self.score_fn, records)
+            except Exception as e:
+                self.stats["failed_batches"] += 1
+                results = [e] if len(records) == 1 else await self._score_each(loop, records)
+
+            self.stats["batches"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+            self.stats["last_batch_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            for (_, future), result in zip(batch, results):
+                if future.done():  # client may have gone away
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def _score_each(self, loop, records):
+        """Score records one per call; a record's result is its exception if it fails."""
+        results = []
+        for record in records:
+            try:
+                results.append((await loop.run_in_executor(None, self.score_fn, [record]))[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+# ---------------- HTTP ----------------
+class ScoringServer:
+    def __init__(self, host=HOST, port=PORT, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, engine=None):
+        self.host = host
+        self.port = port
+        self.engine = engine or HealthRiskEngine()
+        self.batcher = MicroBatcher(self._score, max_batch, max_wait_ms)
+        self._server = None
+
+    def _score(self, records):
+        return score_records(records, self.engine)
+
+    async def start(self):
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # resolves port=0
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _route(self, method, path, body):
+        if path == "/health":
+            if method != "GET":
+                return 405, {"error": "Use GET"}
+            return 200, {"status": "ok", **self.batcher.stats}
+
+        if path not in ("/score", "/score/batch"):
+            return 404, {"error": f"No route for {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            return 400, {"error": "Body must be JSON"}
+
+        try:
+            if path == "/score":
+                return 200, await self.batcher.submit(validate_record(payload))
+
+            records = payload.get("records") if isinstance(payload, dict) else payload
+            if not isinstance(records, list):
+                raise BadRequest('Expected {"records": [...]}')
+            records = [validate_record(r) for r in records]
+        except BadRequest as e:
+            return 400, {"error": str(e)}
+
+        if not records:
+            return 200, {"results": []}
+        # Already a batch: score it in one call, outside the micro-batcher
+        results = await asyncio.get_running_loop().run_in_executor(None, self._score, records)
+        return 200, {"results": results}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, close=True)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = headers.get("content-length") or "0"
+                if not length.isdecimal():  # also rejects "-1"
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, close=True)
+                    break
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Body too large"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, payload = await self._route(method, path.split("?")[0], body)
+                except Exception as e:
+                    status, payload = 500, {"error": repr(e)}
+
+                close = headers.get("connection", "").lower() == "close"
+                await self._respond(writer, status, payload, close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, close=False):
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+        )
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WellPath scoring service")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    server = ScoringServer(args.host, args.port, args.max_batch, args.max_wait_ms)
+    print(f"Scoring service on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
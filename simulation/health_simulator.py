@@ -1,93 +1,203 @@
-import random
-from datetime import datetime, timedelta
+from datetime import datetime
 
+import numpy as np
+import pandas as pd
 
-def generate_health_logs(
-    days: int = 30,
-    base_age: int = 25,
-    pattern: str = "worsening"
-):
+from risk_engine import SYMPTOM_WEIGHTS
+
+SYMPTOM_NAMES = list(SYMPTOM_WEIGHTS)
+FATIGUE_BIT = 1 << SYMPTOM_NAMES.index("fatigue")
+DIZZINESS_BIT = 1 << SYMPTOM_NAMES.index("dizziness")
+CHEST_PAIN_BIT = 1 << SYMPTOM_NAMES.index("chest_pain")
+
+RISK_LEVELS = np.array(["LOW", "MEDIUM", "HIGH"])
+URINE_VALUES = np.array(["normal", "increased"])
+
+CHUNK_USERS = 10_000
+
+
+def simulated_risk_score(stress, sleep, cholesterol, bp):
+    """Rule-based risk score used by the simulator (vectorized)."""
+    risk_score = (
+        stress * 6
+        + np.maximum(0, (7 - sleep)) * 8
+        + (cholesterol - 180) * 0.15
+        + (bp - 120) * 0.3
+    )
+    return np.clip(risk_score, 5, 100).astype(np.int16)
+
+
+def simulated_risk_codes(risk_score):
+    """Index into RISK_LEVELS: LOW < 35 <= MEDIUM < 65 <= HIGH."""
+    return (risk_score >= 35).astype(np.int8) + (risk_score >= 65)
+
+
+def initial_state(rng, n_users):
+    """Starting values for n_users, each a float array of shape (n_users,)."""
+    return {
+        "stress": rng.integers(4, 7, n_users).astype(float),
+        "sleep": rng.uniform(6.5, 7.5, n_users),
+        "weight": rng.uniform(65, 75, n_users),
+        "cholesterol": rng.integers(180, 211, n_users).astype(float),
+        "bp": rng.integers(110, 126, n_users).astype(float),
+        "heart_rate": rng.integers(65, 81, n_users).astype(float),
+    }
+
+
+def step_state(rng, state, direction):
     """
-    Generate realistic simulated health logs for demo & ML training
-    pattern: 'worsening' or 'improving'
+    Advance every user by one day of gradual drift, in place.
+    direction: +1 (worsening) or -1 (improving), scalar or per-user array.
     """
+    n = len(state["stress"])
+    state["stress"] = np.clip(state["stress"] + direction * rng.uniform(0.1, 0.4, n), 1, 10)
+    state["sleep"] = np.clip(state["sleep"] - direction * rng.uniform(0.1, 0.3, n), 4, 9)
+    state["weight"] = np.clip(state["weight"] + direction * rng.uniform(0.05, 0.2, n), 40, 120)
 
-    logs = []
-    now = datetime.utcnow()
+    state["cholesterol"] = np.clip(
+        state["cholesterol"] + direction * rng.integers(1, 5, n), 150, 300
+    )
+    state["bp"] = np.clip(state["bp"] + direction * rng.integers(1, 4, n), 90, 180)
+    state["heart_rate"] = np.clip(state["heart_rate"] + direction * rng.integers(1, 3, n), 55, 120)
+    return state
 
-    # ---------------- BASE VALUES ----------------
-    stress = random.randint(4, 6)
-    sleep = random.uniform(6.5, 7.5)
-    weight = random.uniform(65, 75)
 
-    cholesterol = random.randint(180, 210)
-    bp = random.randint(110, 125)
-    heart_rate = random.randint(65, 80)
+def simulate_cohort(
+    n_users: int,
+    days: int = 30,
+    base_age=25,
+    pattern="worsening",
+    seed=None,
+    end=None,
+    user_offset: int = 0
+):
+    """
+    Simulate n_users trajectories at once, one vectorized step per day.
 
-    # Trend direction
-    direction = 1 if pattern == "worsening" else -1
+    base_age and pattern may be scalars or per-user arrays. Rows are
+    ordered user-major (all days of user 0, then user 1, ...). Symptoms
+    are returned as a `symptom_mask` bitmask over SYMPTOM_WEIGHTS.
+    """
+    rng = np.random.default_rng(seed)
+    end = end or datetime.utcnow()
+
+    pattern = np.broadcast_to(np.asarray(pattern), (n_users,))
+    direction = np.where(pattern == "worsening", 1, -1)
+    age = np.broadcast_to(np.asarray(base_age, dtype=np.int16), (n_users,))
+
+    state = initial_state(rng, n_users)
+    columns = {
+        # (users, days) so the final user-major ravel is a view, not a copy
+        name: np.empty((n_users, days), dtype=dtype)
+        for name, dtype in [
+            ("weight", np.float64), ("stress", np.float64), ("sleep", np.float64),
+            ("cholesterol", np.int16), ("blood_pressure", np.int16), ("heart_rate", np.int16),
+            ("risk_score", np.int16), ("symptom_mask", np.int16),
+            ("exercise", np.int8), ("urine", np.int8),
+        ]
+    }
 
     for i in range(days):
-        timestamp = now - timedelta(days=(days - i))
-
-        # ---- Gradual drift ----
-        stress = min(10, max(1, stress + direction * random.uniform(0.1, 0.4)))
-        sleep = min(9, max(4, sleep - direction * random.uniform(0.1, 0.3)))
-        weight = min(120, max(40, weight + direction * random.uniform(0.05, 0.2)))
-
-        cholesterol = min(300, max(150, cholesterol + direction * random.randint(1, 4)))
-        bp = min(180, max(90, bp + direction * random.randint(1, 3)))
-        heart_rate = min(120, max(55, heart_rate + direction * random.randint(1, 2)))
-
-        # ---- Rule-based risk score simulation ----
-        risk_score = (
-            stress * 6
-            + max(0, (7 - sleep)) * 8
-            + (cholesterol - 180) * 0.15
-            + (bp - 120) * 0.3
+        step_state(rng, state, direction)
+
+        columns["weight"][:, i] = np.round(state["weight"], 1)
+        columns["stress"][:, i] = np.round(state["stress"], 1)
+        columns["sleep"][:, i] = np.round(state["sleep"], 1)
+        columns["cholesterol"][:, i] = state["cholesterol"]
+        columns["blood_pressure"][:, i] = state["bp"]
+        columns["heart_rate"][:, i] = state["heart_rate"]
+
+        columns["risk_score"][:, i] = simulated_risk_score(
+            state["stress"], state["sleep"], state["cholesterol"], state["bp"]
+        )
+        columns["symptom_mask"][:, i] = (
+            (state["stress"] > 7) * FATIGUE_BIT
+            | (state["sleep"] < 6) * DIZZINESS_BIT
+            | (state["bp"] > 140) * CHEST_PAIN_BIT
         )
 
-        risk_score = int(min(100, max(5, risk_score)))
-
-        # ---- Risk level ----
-        if risk_score < 35:
-            risk_level = "LOW"
-        elif risk_score < 65:
-            risk_level = "MEDIUM"
-        else:
-            risk_level = "HIGH"
-
-        # ---- Symptoms logic ----
-        symptoms = []
-        if stress > 7:
-            symptoms.append("fatigue")
-        if sleep < 6:
-            symptoms.append("dizziness")
-        if bp > 140:
-            symptoms.append("chest_pain")
-
-        log = {
-            "timestamp": timestamp,
-            "age": base_age,
-            "weight": round(weight, 1),
-            "stress": round(stress, 1),
-            "sleep": round(sleep, 1),
-
-            # Medical features
-            "cholesterol": cholesterol,
-            "blood_pressure": bp,
-            "heart_rate": heart_rate,
-
-            # Risk outputs
-            "risk_score": risk_score,
-            "risk_level": risk_level,
-
-            # Lifestyle
-            "exercise": random.choice([0, 1]),
-            "urine": random.choice(["normal", "increased"]),
-            "symptoms": symptoms,
-        }
-
-        logs.append(log)
-
-    return logs
+        columns["exercise"][:, i] = rng.integers(0, 2, n_users)
+        columns["urine"][:, i] = rng.integers(0, 2, n_users)
+
+    # ---- Flatten to user-major rows ----
+    flat = {name: values.ravel() for name, values in columns.items()}
+    timestamps = pd.Timestamp(end) - pd.to_timedelta(np.arange(days, 0, -1), unit="D")
+
+    df = pd.DataFrame({
+        "user": np.repeat(np.arange(user_offset, user_offset + n_users, dtype=np.int32), days),
+        "timestamp": np.tile(timestamps.values, n_users),
+        "age": np.repeat(age, days),
+        **{k: flat[k] for k in ["weight", "stress", "sleep", "cholesterol",
+                                "blood_pressure", "heart_rate", "risk_score"]},
+        "risk_level": pd.Categorical.from_codes(
+            simulated_risk_codes(flat["risk_score"]), categories=RISK_LEVELS
+        ),
+        "exercise": flat["exercise"],
+        "urine": pd.Categorical.from_codes(flat["urine"], categories=URINE_VALUES),
+        "symptom_mask": flat["symptom_mask"],
+    }, copy=False)
+    return df
+
+
+def iter_cohort_chunks(
+    n_users: int,
+    days: int = 30,
+    base_age=25,
+    pattern="worsening",
+    seed=None,
+    chunk_users: int = CHUNK_USERS,
+    end=None
+):
+    """
+    Yield simulate_cohort DataFrames for blocks of chunk_users users so
+    large cohorts can be streamed to disk. Each chunk gets its own child
+    seed, so output is reproducible for a given seed and chunk_users.
+    """
+    end = end or datetime.utcnow()
+    n_chunks = -(-n_users // chunk_users)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    base_age = np.broadcast_to(np.asarray(base_age), (n_users,))
+    pattern = np.broadcast_to(np.asarray(pattern), (n_users,))
+
+    for k, child in enumerate(seeds):
+        lo, hi = k * chunk_users, min(n_users, (k + 1) * chunk_users)
+        yield simulate_cohort(
+            hi - lo, days, base_age[lo:hi], pattern[lo:hi],
+            seed=child, end=end, user_offset=lo
+        )
+
+
+def symptoms_from_mask(mask):
+    return [name for i, name in enumerate(SYMPTOM_NAMES) if mask & (1 << i)]
+
+
+def cohort_to_logs(df):
+    """Convert simulate_cohort rows to health log dicts with plain Python values."""
+    columns = {
+        "timestamp": list(df["timestamp"].dt.to_pydatetime()),
+        **{
+            key: df[key].tolist()
+            for key in ["age", "weight", "stress", "sleep", "cholesterol",
+                        "blood_pressure", "heart_rate", "risk_score", "exercise"]
+        },
+        "risk_level": df["risk_level"].astype(str).tolist(),
+        "urine": df["urine"].astype(str).tolist(),
+        "symptoms": [symptoms_from_mask(m) for m in df["symptom_mask"].tolist()],
+    }
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def generate_health_logs(
+    days: int = 30,
+    base_age: int = 25,
+    pattern: str = "worsening",
+    seed=None
+):
+    """
+    Generate realistic simulated health logs for demo & ML training
+    pattern: 'worsening' or 'improving'
+    seed: pass an int for reproducible logs
+    """
+    return cohort_to_logs(simulate_cohort(1, days, base_age, pattern, seed=seed))
@@ -0,0 +1,247 @@
+"""
+Monte Carlo what-if scenarios from a user's current state.
+
+    start = start_from_logs(user_logs)
+    report = run_scenarios(start, [Scenario("baseline"), Scenario("+1h sleep", sleep_hours=1)])
+
+Every scenario runs the same seeded trajectories (common random numbers),
+differing only by its starting-state change, so the gap between
+scenarios is the effect of the change rather than sampling noise. Each
+trajectory drifts with the simulator's step_state, worsening or
+improving day by day with probability `p_worsen`, and every day is scored
+with both the simulator's risk formula and HealthRiskEngine.
+
+Trajectories are vectorized in chunks of CHUNK_TRAJECTORIES, and chunks
+run in a reusable process pool. Workers send back per-day score
+histograms (scores are integers 0-100), which add up exactly across
+chunks and give the level distribution and quantiles without shipping
+every trajectory.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from risk_engine import DEFAULT_CHOLESTEROL, RISK_LEVELS, HealthRiskEngine
+from simulation.health_simulator import (
+    CHEST_PAIN_BIT,
+    DIZZINESS_BIT,
+    FATIGUE_BIT,
+    simulated_risk_codes,
+    simulated_risk_score,
+    step_state,
+)
+
+TRAJECTORIES = 5_000
+DAYS = 30
+CHUNK_TRAJECTORIES = 2_500  # fixed, so results depend on the seed only, not on n_jobs
+SCORE_BINS = 101  # scores are integers 0..100
+SCORERS = ("engine", "simulator")
+
+# Used when the latest log doesn't carry a value
+DEFAULT_START = {
+    "age": 25,
+    "weight": 70.0,
+    "stress": 5.0,
+    "sleep": 7.0,
+    "cholesterol": float(DEFAULT_CHOLESTEROL),
+    "bp": 120.0,
+    "heart_rate": 72.0,
+    "urine": "normal",
+}
+LOG_KEYS = {"bp": "blood_pressure"}  # start key -> stored log key, where they differ
+STATE_KEYS = ("stress", "sleep", "weight", "cholesterol", "bp", "heart_rate")
+
+_SCORES = np.arange(SCORE_BINS)
+LEVEL_CODES = {
+    "engine": (_SCORES >= 30).astype(np.int8) + (_SCORES >= 60),
+    "simulator": simulated_risk_codes(_SCORES),
+}
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    sleep_hours: float = 0.0  # change to current sleep, hours
+    stress: float = 0.0       # change to current stress level
+
+
+# ---------------- STARTING STATE ----------------
+def start_from_logs(logs):
+    """Starting values from the most recent log, with DEFAULT_START for missing keys."""
+    logs = [log for log in logs if log.get("timestamp") is not None]
+    if not logs:
+        return dict(DEFAULT_START)
+    latest = max(logs, key=lambda log: pd.Timestamp(log["timestamp"]))
+
+    start = {}
+    for key, default in DEFAULT_START.items():
+        value = latest.get(LOG_KEYS.get(key, key))
+        start[key] = default if value is None else type(default)(value)
+    return start
+
+
+def worsening_probability(logs, low=0.1, high=0.9):
+    """Share of day-over-day risk_score increases in logs, clipped to [low, high]; 0.5 without history."""
+    scores = [
+        log["risk_score"]
+        for log in sorted(logs, key=lambda log: pd.Timestamp(log["timestamp"]))
+        if log.get("risk_score") is not None
+    ]
+    if len(scores) < 2:
+        return 0.5
+    return float(np.clip(np.mean(np.diff(scores) > 0), low, high))
+
+
+# ---------------- WORKERS ----------------
+def _simulate_chunk(start, scenario, n, days, p_worsen, seed):
+    """Per-day score histograms, shape (days, SCORE_BINS), for n trajectories."""
+    rng = np.random.default_rng(seed)
+    state = {key: np.full(n, float(start[key])) for key in STATE_KEYS}
+    state["sleep"] = np.clip(state["sleep"] + scenario.sleep_hours, 4, 9)
+    state["stress"] = np.clip(state["stress"] + scenario.stress, 1, 10)
+
+    stress = np.empty((days, n))
+    sleep = np.empty((days, n))
+    bp = np.empty((days, n))
+    sim_scores = np.empty((days, n), dtype=np.int16)
+    for day in range(days):
+        direction = np.where(rng.random(n) < p_worsen, 1, -1)
+        step_state(rng, state, direction)
+        stress[day], sleep[day], bp[day] = state["stress"], state["sleep"], state["bp"]
+        sim_scores[day] = simulated_risk_score(state["stress"], state["sleep"], state["cholesterol"], state["bp"])
+
+    # One engine pass over every (day, trajectory); symptoms follow the simulator's rules
+    symptom_mask = (stress > 7) * FATIGUE_BIT | (sleep < 6) * DIZZINESS_BIT | (bp > 140) * CHEST_PAIN_BIT
+    engine_scores = HealthRiskEngine().assess_batch({
+        "age": np.full(days * n, start["age"]),
+        "stress": stress.ravel(),
+        "sleep": sleep.ravel(),
+        "urine": np.full(days * n, start["urine"], dtype=object),
+        "symptoms": symptom_mask.ravel(),
+    })["risk_score"].reshape(days, n)
+
+    return {
+        "engine": _histograms(engine_scores),
+        "simulator": _histograms(sim_scores),
+    }
+
+
+def _histograms(scores):
+    days = scores.shape[0]
+    offsets = np.arange(days)[:, None] * SCORE_BINS
+    counts = np.bincount((scores.astype(np.int64) + offsets).ravel(), minlength=days * SCORE_BINS)
+    return counts.reshape(days, SCORE_BINS)
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(n_jobs):
+    """Process pool kept between calls, so interactive reruns skip worker start-up."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != n_jobs:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=n_jobs)
+            _pool_workers = n_jobs
+        return _pool
+
+
+# ---------------- RESULTS ----------------
+@dataclass
+class ScenarioResult:
+    scenario: Scenario
+    trajectories: int
+    days: int
+    histograms: dict  # scorer -> (days, SCORE_BINS) counts
+
+    def level_probabilities(self, scorer="engine", day=-1):
+        """Share of trajectories at each risk level on `day` (default: the last)."""
+        counts = np.bincount(LEVEL_CODES[scorer], weights=self.histograms[scorer][day], minlength=len(RISK_LEVELS))
+        return dict(zip(RISK_LEVELS, (counts / self.trajectories).round(4).tolist()))
+
+    def quantiles(self, q=(0.1, 0.5, 0.9), scorer="engine"):
+        """Per-day score quantiles, one column per q, indexed by day 1..days."""
+        cumulative = self.histograms[scorer].cumsum(axis=1)
+        columns = {
+            f"p{round(p * 100)}": [int(np.searchsorted(row, p * self.trajectories)) for row in cumulative]
+            for p in q
+        }
+        return pd.DataFrame(columns, index=pd.RangeIndex(1, self.days + 1, name="day"))
+
+    def mean_score(self, scorer="engine", day=-1):
+        return float(self.histograms[scorer][day] @ _SCORES / self.trajectories)
+
+
+@dataclass
+class ScenarioReport:
+    results: list = field(default_factory=list)
+    p_worsen: float = 0.5
+    seconds: float = 0.0
+
+    def __getitem__(self, name):
+        return next(r for r in self.results if r.scenario.name == name)
+
+    def table(self):
+        return [
+            {
+                "scenario": r.scenario.name,
+                **{f"{level} %": round(p * 100, 1) for level, p in r.level_probabilities().items()},
+                "mean_score": round(r.mean_score(), 1),
+                "simulator_HIGH %": round(r.level_probabilities("simulator")["HIGH"] * 100, 1),
+                "simulator_mean": round(r.mean_score("simulator"), 1),
+            }
+            for r in self.results
+        ]
+
+
+# ---------------- RUNNER ----------------
+def run_scenarios(
+    start,
+    scenarios,
+    trajectories=TRAJECTORIES,
+    days=DAYS,
+    p_worsen=0.5,
+    seed=0,
+    n_jobs=None
+):
+    """
+    Run every scenario on the same seeded trajectories from `start`
+    (see start_from_logs). n_jobs=None uses every core; n_jobs=1 runs
+    in-process.
+    """
+    begin = time.perf_counter()
+    start = {**DEFAULT_START, **start}
+    sizes = [min(CHUNK_TRAJECTORIES, trajectories - lo) for lo in range(0, trajectories, CHUNK_TRAJECTORIES)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [
+        (start, scenario, n, days, p_worsen, child)
+        for scenario in scenarios
+        for n, child in zip(sizes, seeds)
+    ]
+
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(tasks))
+    if n_jobs == 1:
+        outputs = [_simulate_chunk(*task) for task in tasks]
+    else:
+        outputs = list(_get_pool(n_jobs).map(_simulate_chunk, *zip(*tasks)))
+
+    report = ScenarioReport(p_worsen=p_worsen)
+    for i, scenario in enumerate(scenarios):
+        chunks = outputs[i * len(sizes):(i + 1) * len(sizes)]
+        report.results.append(ScenarioResult(
+            scenario=scenario,
+            trajectories=trajectories,
+            days=days,
+            histograms={scorer: sum(chunk[scorer] for chunk in chunks) for scorer in SCORERS},
+        ))
+    report.seconds = round(time.perf_counter() - begin, 3)
+    return report
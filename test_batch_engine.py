@@ -0,0 +1,75 @@
+import random
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+
+from risk_engine import HealthInput, HealthRiskEngine
+
+SYMPTOMS = [
+    "fatigue", "fever", "chest_pain",
+    "shortness_of_breath", "dizziness",
+    "frequent_urination", "headache"
+]
+
+
+def _random_inputs(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        HealthInput(
+            age=rng.randint(18, 90),
+            weight=rng.uniform(40, 120),
+            stress_level=rng.randint(1, 10),
+            sleep_hours=round(rng.uniform(3, 10), 1),
+            urine_frequency=rng.choice(["normal", "increased"]),
+            symptoms=rng.sample(SYMPTOMS, rng.randint(0, 4)),
+        )
+        for _ in range(n)
+    ]
+
+
+def test_assess_batch_matches_assess_risk():
+    engine = HealthRiskEngine()
+    inputs = _random_inputs(2000)
+
+    df = pd.DataFrame([asdict(x) for x in inputs])
+    batch = engine.assess_batch(df)
+
+    for i, x in enumerate(inputs):
+        expected = engine.assess_risk(x)
+        assert batch["risk_score"][i] == expected["risk_score"]
+        assert batch["risk_level"][i] == expected["risk_level"]
+        assert batch["recommended_action"][i] == expected["recommended_action"]
+        assert engine.expand_reasons(batch["reason_mask"][i], x.symptoms) == expected["reasons"]
+
+
+def test_expand_reasons_order_and_repeats():
+    engine = HealthRiskEngine()
+    x = HealthInput(50, 70, 8, 5, "increased", ["fatigue", "fever", "fatigue", "unknown"])
+    expected = engine.assess_risk(x)["reasons"]
+    mask = engine.assess_batch({k: [v] for k, v in asdict(x).items()})["reason_mask"][0]
+
+    # Exact with the row's symptoms
+    assert engine.expand_reasons(mask, x.symptoms) == expected
+    # From the mask alone: vocabulary order, each symptom once
+    assert engine.expand_reasons(mask) == expected[:4] + [
+        "Symptom reported: fever", "Symptom reported: fatigue"
+    ]
+
+
+def test_assess_batch_accepts_log_columns_and_bitmasks():
+    engine = HealthRiskEngine()
+    inputs = _random_inputs(200, seed=1)
+    symptoms = [x.symptoms for x in inputs]
+
+    columns = {
+        "age": [x.age for x in inputs],
+        "stress": [x.stress_level for x in inputs],
+        "sleep": [x.sleep_hours for x in inputs],
+        "urine": [x.urine_frequency for x in inputs],
+    }
+    by_list = engine.assess_batch({**columns, "symptoms": symptoms})
+    by_mask = engine.assess_batch({**columns, "symptoms": engine.symptom_codes(symptoms)})
+
+    np.testing.assert_array_equal(by_list["risk_score"], by_mask["risk_score"])
+    np.testing.assert_array_equal(by_list["reason_mask"], by_mask["reason_mask"])
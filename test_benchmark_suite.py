@@ -0,0 +1,23 @@
+from benchmarks.suite import compare, run
+
+
+def test_compare_flags_regressions_against_baseline():
+    baseline = {"results": [
+        {"case": "a", "size": 1, "median_s": 1.0},
+        {"case": "b", "size": 1, "median_s": 1.0},
+        {"case": "c", "size": 1, "median_s": 1.0},
+    ]}
+    results = [
+        {"case": "a", "size": 1, "median_s": 1.1},
+        {"case": "b", "size": 1, "median_s": 1.5},
+        {"case": "c", "size": 1, "median_s": 0.5},
+        {"case": "d", "size": 1, "median_s": 0.1},
+    ]
+    status = {r["case"]: r["status"] for r in compare(results, baseline, threshold=0.25)}
+    assert status == {"a": "ok", "b": "regression", "c": "improved", "d": "new"}
+
+
+def test_quick_run_reports_each_case():
+    results = run(names=["compute_health_change", "assess_risk"], quick=True)
+    assert [(r["case"], r["size"]) for r in results] == [("assess_risk", 100), ("compute_health_change", 30)]
+    assert all(r["median_s"] > 0 and r["repeats"] >= 1 for r in results)
@@ -0,0 +1,47 @@
+import threading
+
+from database.bulk_writer import bulk_save
+from database.memory import InMemoryRepository
+
+
+class FlakyRepository(InMemoryRepository):
+    """Fails the first commit of every chunk containing a log with fail=True."""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+        self._failed = set()
+        self._flaky_lock = threading.Lock()
+
+    def save_bulk(self, user_email, logs):
+        with self._flaky_lock:
+            self.batch_sizes.append(len(logs))
+            key = logs[0]["id"]
+            if any(log.get("fail") for log in logs) and key not in self._failed:
+                self._failed.add(key)
+                raise ConnectionError("transient")
+        return super().save_bulk(user_email, logs)
+
+
+def test_bulk_save_chunks_retries_and_stays_idempotent():
+    repo = FlakyRepository()
+    logs = ({"risk_score": i, "fail": i == 700} for i in range(1234))
+
+    report = bulk_save(repo, "a@x.com", logs, max_workers=3, backoff=0)
+
+    assert report.written == 1234 and report.failed == 0
+    assert [c.size for c in report.chunks] == [500, 500, 234]
+    assert [c.attempts for c in report.chunks] == [1, 2, 1]
+    assert max(repo.batch_sizes) <= 500
+    assert len(repo.get_logs("a@x.com", limit=5000)) == 1234
+
+
+def test_bulk_save_reports_chunks_that_never_succeed():
+    class DownRepository(InMemoryRepository):
+        def save_bulk(self, user_email, logs):
+            raise TimeoutError("backend down")
+
+    report = bulk_save(DownRepository(), "a@x.com", [{"x": 1}] * 10, chunk_size=4, max_retries=1, backoff=0)
+
+    assert report.written == 0 and report.failed == 10
+    assert all(c.attempts == 2 and "backend down" in c.error for c in report.chunks)
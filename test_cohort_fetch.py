@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+from database.cohort_fetch import fetch_cohort_logs
+from database.memory import InMemoryRepository
+
+
+class SlowRepository(InMemoryRepository):
+    """Adds read latency, fails for 'broken' users and stalls for 'stuck' ones."""
+
+    def __init__(self, latency=0.02):
+        super().__init__()
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._count_lock = threading.Lock()
+
+    def get_logs(self, user_email, limit=30, fields=None):
+        with self._count_lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if user_email.startswith("broken"):
+                raise ConnectionError("backend unavailable")
+            time.sleep(1.0 if user_email.startswith("stuck") else self.latency)
+            return super().get_logs(user_email, limit=limit, fields=fields)
+        finally:
+            with self._count_lock:
+                self.in_flight -= 1
+
+
+def _seed(repo, users, n=5):
+    start = datetime(2024, 1, 1)
+    for u, user in enumerate(users):
+        repo.save_bulk(user, [
+            {"timestamp": start + timedelta(days=d), "risk_score": u * 10 + d, "stress": 5}
+            for d in range(n)
+        ])
+
+
+def test_concurrent_fetch_combines_users_and_reports_failures():
+    repo = SlowRepository()
+    users = [f"user{i}@x.com" for i in range(12)] + ["broken@x.com", "stuck@x.com"]
+    _seed(repo, users)
+
+    result = asyncio.run(fetch_cohort_logs(repo, users, limit=3, concurrency=4, timeout=0.3))
+
+    ok_users = users[:12]
+    assert result.counts == {u: 3 for u in ok_users}
+    assert set(result.failed) == {"broken@x.com"} and "ConnectionError" in result.failed["broken@x.com"]
+    assert result.timed_out == ["stuck@x.com"]
+    assert not result.ok
+    assert repo.max_in_flight <= 4 + 1  # the abandoned stuck read no longer holds a slot
+
+    df = result.frame
+    assert len(df) == 36 and set(df["user"]) == set(ok_users)
+    # Long format, each user's most recent logs in time order
+    first = df[df["user"] == "user0@x.com"]
+    assert first["risk_score"].tolist() == [2, 3, 4]
+    assert first["timestamp"].is_monotonic_increasing
+
+
+def test_concurrency_beats_sequential_latency():
+    repo = SlowRepository(latency=0.05)
+    users = [f"user{i}@x.com" for i in range(16)]
+    _seed(repo, users, n=2)
+
+    result = asyncio.run(fetch_cohort_logs(repo, users, concurrency=8, fields=["risk_score"]))
+
+    assert result.ok and len(result.frame) == 32
+    assert list(result.frame.columns[:1]) == ["user"]
+    assert result.seconds < 16 * 0.05 / 2
+
+
+def test_stuck_reads_do_not_starve_later_users():
+    repo = SlowRepository()
+    stuck = [f"stuck{i}@x.com" for i in range(4)]
+    users = stuck + [f"user{i}@x.com" for i in range(8)]
+    _seed(repo, users)
+
+    # As many stuck users as slots: the rest must still be read, not time out unstarted
+    result = asyncio.run(fetch_cohort_logs(repo, users, concurrency=4, timeout=0.3))
+
+    assert result.timed_out == stuck
+    assert result.counts == {u: 5 for u in users[4:]}
+    assert result.seconds < 0.9
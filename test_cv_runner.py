@@ -0,0 +1,42 @@
+import numpy as np
+
+from ml.cv_runner import cross_validate
+
+
+def _data(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 3))
+    y = (X[:, 0] + 0.5 * rng.normal(size=n) > 0).astype(int)
+    return X, y
+
+
+def test_sweep_reports_folds_and_caches(tmp_path):
+    X, y = _data()
+    grid = [{"C": 0.01}, {"C": 1.0}]
+
+    first = cross_validate(X, y, param_grid=grid, n_folds=4, n_jobs=1, cache_dir=tmp_path)
+    assert first.fits == 2 * 4 + 1
+    assert first.cache_hits == 0
+    assert all(len(r.folds) == 4 for r in first.results)
+    assert first.best.mean_accuracy == max(r.mean_accuracy for r in first.results)
+    assert first.model.predict(X).shape == (200,)
+
+    again = cross_validate(X, y, param_grid=grid, n_folds=4, n_jobs=1, cache_dir=tmp_path)
+    assert again.fits == 0
+    assert again.cache_hits == 3
+    assert again.table() == [{**row, "cached": True} for row in first.table()]
+
+    changed = cross_validate(X, 1 - y, param_grid=grid, n_folds=4, n_jobs=1, cache_dir=tmp_path)
+    assert changed.fits == 9
+
+
+def test_process_pool_matches_in_process():
+    X, y = _data(seed=1)
+    grid = [{"C": 0.1, "class_weight": "balanced"}, {"C": 10.0, "class_weight": None}]
+
+    serial = cross_validate(X, y, param_grid=grid, n_folds=3, n_jobs=1, cache_dir=None)
+    pooled = cross_validate(X, y, param_grid=grid, n_folds=3, n_jobs=2, cache_dir=None)
+
+    strip = lambda rows: [{k: v for k, v in r.items() if k != "fit_seconds"} for r in rows]
+    assert strip(serial.table()) == strip(pooled.table())
+    assert serial.best.params == pooled.best.params
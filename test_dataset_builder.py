@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.dataset_builder import FEATURES, build_dataset, load_dataset_shards, write_dataset_shards
+from simulation.health_simulator import generate_health_logs, symptoms_from_mask
+
+
+def _logs():
+    logs = generate_health_logs(days=30, seed=1) + generate_health_logs(days=30, pattern="improving", seed=2)
+    logs[3] = {**logs[3], "urine": "unknown"}
+    del logs[7]["sleep"]
+    return logs
+
+
+def _reference(logs):
+    # The original all-at-once implementation
+    df = pd.DataFrame(logs).drop(columns=["timestamp", "recommended_action", "id"], errors="ignore")
+    df["urine"] = df["urine"].map({"normal": 0, "increased": 1})
+    df["target"] = df["risk_level"].map({"LOW": 0, "MEDIUM": 1, "HIGH": 1})
+    return df.dropna().reset_index(drop=True)
+
+
+def test_streamed_batches_match_reference():
+    logs = _logs()
+    expected = _reference(logs)
+
+    whole = build_dataset(logs)
+    streamed = build_dataset(logs[i:i + 7] for i in range(0, len(logs), 7))
+
+    for df in (whole, streamed):
+        assert len(df) == len(expected) == len(logs) - 2
+        np.testing.assert_allclose(df[FEATURES].to_numpy(np.float64), expected[FEATURES].to_numpy(np.float64), rtol=1e-6)
+        np.testing.assert_array_equal(df["target"], expected["target"])
+        assert df["risk_level"].astype(str).tolist() == expected["risk_level"].tolist()
+
+    assert streamed["age"].dtype == np.float32
+    assert streamed["urine"].dtype == np.int8 and streamed["target"].dtype == np.int8
+    assert isinstance(streamed["risk_level"].dtype, pd.CategoricalDtype)
+
+    assert [set(symptoms_from_mask(m)) for m in streamed["symptom_mask"]] == \
+        [set(s) for s in expected["symptoms"]]
+
+
+def test_parquet_shards_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    logs = _logs()
+
+    paths = write_dataset_shards(logs, tmp_path, batch_rows=25)
+    assert len(paths) == 3
+
+    loaded = load_dataset_shards(tmp_path, columns=FEATURES + ["target"])
+    pd.testing.assert_frame_equal(loaded, build_dataset(logs)[FEATURES + ["target"]])
+
+
+def test_mixed_schema_batches_do_not_depend_on_batch_rows():
+    # Older logs predate the ML fields; one newer log is missing a feature
+    logs = generate_health_logs(days=20, seed=3)
+    mixed = logs[:8] + [
+        {**log, "ml_risk_label": "HIGH" if i % 2 else "LOW", "ml_risk_probability": 50.0 + i, "ai_rule_disagree": i % 3 == 0}
+        for i, log in enumerate(logs[8:])
+    ]
+    del mixed[12]["weight"]
+
+    expected = build_dataset(mixed)
+    assert len(expected) == len(mixed) - 1
+    assert expected["ml_risk_label"].isna().sum() == 8
+    assert isinstance(expected["ml_risk_label"].dtype, pd.CategoricalDtype)
+    for batch_rows in (1, 3, 5, 8):
+        pd.testing.assert_frame_equal(build_dataset(mixed, batch_rows=batch_rows), expected)
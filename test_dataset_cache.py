@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.dataset_cache import ingest_csv
+
+
+def _write_csv(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def test_round_trip_with_widening_and_categories(tmp_path):
+    csv = tmp_path / "cohort.csv"
+    _write_csv(csv, {
+        "age": [40, 50, 60, 70000],            # last chunk needs a wider int
+        "sex": ["Male", "Female", None, "Other"],
+        "oldpeak": [1.0, 3.1, 0.0, 2.6],
+        "target": [0, 1, 1, 0],
+    })
+
+    ds = ingest_csv(csv, cache_root=tmp_path / "cache", chunk_rows=2)
+    original = pd.read_csv(csv)
+
+    assert len(ds) == 4
+    assert ds.column("age").dtype == np.int32
+    assert ds.column("target").dtype == np.int8
+    assert ds.column("sex").dtype == np.int8
+    assert ds.column("sex").tolist() == [0, 1, -1, 2]
+
+    decoded = ds.frame(decode=True)
+    np.testing.assert_array_equal(decoded["age"], original["age"])
+    np.testing.assert_array_equal(decoded["oldpeak"], original["oldpeak"])
+    assert decoded["sex"].astype(object).where(decoded["sex"].notna(), None).tolist() == \
+        ["Male", "Female", None, "Other"]
+
+
+def test_cache_is_keyed_by_content(tmp_path):
+    csv = tmp_path / "d.csv"
+    cache = tmp_path / "cache"
+    _write_csv(csv, {"age": [1, 2], "target": [0, 1]})
+
+    first = ingest_csv(csv, cache_root=cache)
+    assert ingest_csv(csv, cache_root=cache).directory == first.directory
+
+    _write_csv(csv, {"age": [1, 3], "target": [0, 1]})
+    second = ingest_csv(csv, cache_root=cache)
+    assert second.directory != first.directory
+    assert second.column("age").tolist() == [1, 3]
+
+
+def test_heart_features_match_direct_parse():
+    from ml.external_dataset_adapter import load_heart_dataset
+
+    X, y = load_heart_dataset("data/heart.csv")
+    raw = pd.read_csv("data/heart.csv")
+
+    assert list(X.columns) == ["age", "cholesterol", "stress", "sleep", "urine"]
+    np.testing.assert_array_equal(X["cholesterol"], raw["cholestoral"])
+    np.testing.assert_array_equal(X["stress"], raw["resting_blood_pressure"])
+    np.testing.assert_array_equal(X["sleep"], raw["Max_heart_rate"])
+    np.testing.assert_array_equal(y, raw["target"])
+
+
+def test_empty_leading_chunk_and_failed_build(tmp_path):
+    csv = tmp_path / "late.csv"
+    _write_csv(csv, {
+        "note": [None, None, "chest pain", None, "ok"],  # first chunk parses as float64
+        "empty": [None] * 5,
+        "chol": [None, None, 210, 190, 250],
+    })
+    ds = ingest_csv(csv, cache_root=tmp_path / "cache", chunk_rows=2)
+    assert ds.meta["columns"]["note"]["kind"] == "category"
+    assert ds.column("note").tolist() == [-1, -1, 0, -1, 1]
+    assert np.isnan(ds.column("empty")).all()
+    np.testing.assert_array_equal(ds.column("chol"), pd.read_csv(csv)["chol"])
+
+    bad = tmp_path / "bad.csv"
+    _write_csv(bad, {"age": [40, 50, "unknown"]})
+    with pytest.raises(ValueError, match="mixes numbers and text"):
+        ingest_csv(bad, cache_root=tmp_path / "cache2", chunk_rows=2)
+    assert os.listdir(tmp_path / "cache2") == []
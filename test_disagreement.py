@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.disagreement import disagreement_report, rollup_logs
+from database.memory import InMemoryRepository
+from database.rollups import RollupStore
+from database.sqlite_store import SQLiteRepository
+
+START = datetime(2024, 1, 1, 6)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repo(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryRepository()
+    return SQLiteRepository(str(tmp_path / "logs.db"))
+
+
+def _logs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    logs = []
+    for i in range(n):
+        rule = str(rng.choice(["LOW", "MEDIUM", "HIGH"]))
+        ml = str(rng.choice(["LOW", "HIGH"]))
+        logs.append({
+            "timestamp": START + timedelta(hours=7 * i),
+            "risk_level": rule,
+            "ml_risk_label": ml,
+            "ml_risk_probability": round(float(rng.uniform()), 3),
+            "ai_rule_disagree": rule != ml,
+        })
+    return logs
+
+
+def _expected(logs, freq):
+    df = pd.DataFrame(logs)
+    period = df["timestamp"].dt.normalize()
+    if freq == "week":
+        period = df["timestamp"].dt.to_period("W").dt.start_time
+    grouped = df.groupby(period)
+    return pd.DataFrame({
+        "logs": grouped.size(),
+        "disagree_rate": grouped["ai_rule_disagree"].mean(),
+        "mean_ml_probability": grouped["ml_risk_probability"].mean(),
+    })
+
+
+@pytest.mark.parametrize("freq", ["day", "week"])
+def test_report_matches_raw_logs(freq):
+    logs = _logs(200)
+    report = disagreement_report(rollup_logs(logs).values(), freq)
+    expected = _expected(logs, freq)
+
+    trend = report.trend.set_index("period")
+    assert trend["logs"].tolist() == expected["logs"].tolist()
+    np.testing.assert_allclose(trend["disagree_rate"], expected["disagree_rate"])
+    np.testing.assert_allclose(trend["mean_ml_probability"], expected["mean_ml_probability"])
+
+    df = pd.DataFrame(logs)
+    confusion = pd.crosstab(df["risk_level"], df["ml_risk_label"])
+    assert report.confusion.loc[confusion.index, confusion.columns].equals(confusion.rename_axis(
+        index="risk_level", columns="ml_risk_label"
+    ))
+    assert list(report.confusion.index) == ["LOW", "MEDIUM", "HIGH"]
+    assert report.disagreements == sum(log["ai_rule_disagree"] for log in logs)
+
+
+def test_store_backfills_and_updates_on_write(repo):
+    logs = _logs(60, seed=1)
+    repo.save_bulk("a@x.com", logs[:40])
+    store = RollupStore(repo)
+
+    # First write backfills from history; an already-saved log is not double counted
+    doc_id = repo.save("a@x.com", logs[40])
+    store.record("a@x.com", {**logs[40], "id": doc_id})
+    for log in logs[41:]:
+        store.record("a@x.com", {**log, "id": repo.save("a@x.com", log)})
+
+    stored = {r["day"]: r for r in repo.get_rollups("a@x.com")}
+    for day, expected in rollup_logs(logs).items():
+        assert stored[day] == {**expected, "user": "a@x.com"}
+    assert len(stored) == len(rollup_logs(logs))
+
+    # A fresh store reads the stored rollups instead of the logs
+    fresh = RollupStore(repo)
+    assert fresh.get("a@x.com") == store.get("a@x.com")
+    assert sum(r["logs"] for r in fresh.get("a@x.com", start="2024-01-05", end="2024-01-08")) == sum(
+        1 for log in logs if datetime(2024, 1, 5) <= log["timestamp"] < datetime(2024, 1, 8)
+    )
+
+
+def test_queued_log_is_counted_after_backfill():
+    repo = InMemoryRepository()
+    store = RollupStore(repo)
+    logs = _logs(5)
+    repo.save_bulk("a@x.com", logs[:4])
+
+    store.record("a@x.com", {**logs[4], "id": "not-yet-committed"})
+    assert sum(r["logs"] for r in store.get("a@x.com")) == 5
+
+
+def test_all_users_report(repo):
+    # Two users with history from before rollups existed, one new user saving through the store
+    for i, user in enumerate(["a@x.com", "b@x.com"]):
+        repo.save_bulk(user, _logs(30, seed=i))
+    store = RollupStore(repo)
+    for log in _logs(10, seed=2):
+        store.record("c@x.com", log)
+
+    report = disagreement_report(store.get(), "week")
+    assert report.logs == 70
+    assert report.trend["users"].max() == 3
+    assert {r["user"] for r in repo.get_rollups()} == {"a@x.com", "b@x.com", "c@x.com"}
+    assert sorted(repo.list_users()) == ["a@x.com", "b@x.com"]  # c's logs were only recorded
+
+
+def test_queued_saves_persist_rollups_after_commit(monkeypatch, tmp_path):
+    import database.repository as repository
+    import database.rollups as rollups
+    import database.summaries as summaries
+    from database.firestore import save_health_log
+    from database.summaries import SummaryStore
+    from database.write_queue import WriteBehindQueue
+
+    repo = InMemoryRepository()
+    store = RollupStore(repo)
+    queue = WriteBehindQueue(repo, str(tmp_path / "queue.db"), retry_backoff=0)
+    queue.on_commit(store.committed)
+    monkeypatch.setattr(repository, "_repository", repo)
+    monkeypatch.setattr(repository, "_write_queue", queue)
+    monkeypatch.setattr(summaries, "_store", SummaryStore(repo))
+    monkeypatch.setattr(rollups, "_store", store)
+
+    logs = _logs(12, seed=3)
+    repo.save_bulk("a@x.com", logs[:6])
+    store.get("a@x.com")
+
+    # Backend down: the saves are accepted and only the cached rollups change
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("backend unreachable")
+
+    for name in ("save_bulk", "get_page", "get_rollups", "save_rollups"):
+        monkeypatch.setattr(repo, name, unreachable)
+    for log in logs[6:10]:
+        save_health_log("a@x.com", log)
+    for log in logs[10:]:
+        save_health_log("b@x.com", log)
+    assert queue.depth() == 6
+    assert sum(r["logs"] for r in store.get("a@x.com")) == 10
+    assert sum(r["logs"] for r in repo._rollups["a@x.com"].values()) == 6
+
+    # Back up: the worker commits the logs, then writes each touched day once
+    for name in ("save_bulk", "get_page", "get_rollups", "save_rollups"):
+        monkeypatch.delattr(repo, name)
+    assert queue.flush()
+    for user, user_logs in [("a@x.com", logs[:10]), ("b@x.com", logs[10:])]:
+        stored = {r["day"]: r for r in repo.get_rollups(user)}
+        assert stored == {day: {**r, "user": user} for day, r in rollup_logs(user_logs).items()}
+    assert queue.stats["hook_failures"] == 0
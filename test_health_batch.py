@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pandas as pd
+
+from health_batch import HealthBatch
+from risk_engine import HealthInput, HealthRiskEngine
+from simulation.health_simulator import generate_health_logs, simulate_cohort
+
+
+def _logs():
+    logs = generate_health_logs(days=20, seed=3)
+    logs[0] = {**logs[0], "symptoms": ["fatigue", "fever"]}  # not in vocabulary order
+    logs[1] = {**logs[1], "symptoms": ["fever", "fever", "headache"]}  # repeat + unknown
+    logs[2] = {**logs[2], "id": "abc"}  # key only some logs have
+    return logs
+
+
+def test_log_round_trip_is_lossless():
+    logs = _logs()
+    batch = HealthBatch.from_logs(logs)
+
+    assert batch.to_logs() == logs
+    assert set(batch.symptom_overrides) == {0, 1}
+    assert batch.symptom_mask.dtype.itemsize == 1
+
+
+def test_inputs_and_frames_round_trip():
+    inputs = [
+        HealthInput(50, 82.5, 8, 5.5, "increased", ["chest_pain", "dizziness"]),
+        HealthInput(30, 60.0, 3, 8.0, "normal", []),
+    ]
+    batch = HealthBatch.from_inputs(inputs)
+    assert batch.to_inputs() == inputs
+
+    cohort = simulate_cohort(20, days=5, seed=1, end=datetime(2024, 1, 1))
+    frame = HealthBatch.from_frame(cohort).to_frame(symptoms="mask")
+    pd.testing.assert_frame_equal(
+        frame[cohort.columns].astype(object), cohort.astype(object), check_dtype=False
+    )
+
+    logs = _logs()
+    again = HealthBatch.from_frame(HealthBatch.from_logs(logs).to_frame())
+    # Missing keys come back as NaN from a frame
+    present = [{k: v for k, v in log.items() if not (isinstance(v, float) and v != v)} for log in again.to_logs()]
+    assert present == logs
+
+
+def test_assess_matches_assess_risk():
+    engine = HealthRiskEngine()
+    logs = _logs()
+    batch = HealthBatch.from_logs(logs)
+    result = batch.assess(engine)
+
+    for i in range(len(batch)):
+        expected = engine.assess_risk(batch.input(i))
+        assert result["risk_score"][i] == expected["risk_score"]
+        assert result["risk_level"][i] == expected["risk_level"]
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from simulation.health_simulator import (
+    generate_health_logs,
+    iter_cohort_chunks,
+    simulate_cohort,
+)
+
+
+def _without_timestamps(logs):
+    return [{k: v for k, v in log.items() if k != "timestamp"} for log in logs]
+
+
+def test_generate_health_logs_is_reproducible_with_seed():
+    a = generate_health_logs(days=30, seed=7)
+    b = generate_health_logs(days=30, seed=7)
+    assert len(a) == 30
+    assert _without_timestamps(a) == _without_timestamps(b)
+
+
+def test_cohort_follows_simulator_rules():
+    df = simulate_cohort(500, days=60, pattern=np.where(np.arange(500) % 2, "improving", "worsening"), seed=1)
+
+    assert len(df) == 500 * 60
+    assert df["stress"].between(1, 10).all()
+    assert df["sleep"].between(4, 9).all()
+    assert df["risk_score"].between(5, 100).all()
+
+    expected_level = pd.cut(df["risk_score"], [-1, 34, 64, 100], labels=["LOW", "MEDIUM", "HIGH"])
+    assert (df["risk_level"].astype(str) == expected_level.astype(str)).all()
+
+    # Worsening users end riskier than improving ones
+    last = df.groupby("user")["risk_score"].last()
+    assert last[last.index % 2 == 0].mean() > last[last.index % 2 == 1].mean()
+
+
+def test_chunks_cover_every_user_once():
+    chunks = list(iter_cohort_chunks(25, days=3, seed=0, chunk_users=10))
+    assert [c["user"].nunique() for c in chunks] == [10, 10, 5]
+    assert pd.concat(chunks)["user"].tolist() == np.repeat(np.arange(25), 3).tolist()
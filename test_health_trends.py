@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from analysis.health_trends import change_points, ewma, rolling_means, rolling_slopes, trend_slopes
+from simulation.health_simulator import simulate_cohort
+
+
+def _cohort():
+    patterns = np.where(np.arange(40) % 2, "improving", "worsening")
+    df = simulate_cohort(40, days=200, pattern=patterns, seed=3)
+    return df.sample(frac=1, random_state=0)  # analytics must not rely on input order
+
+
+def test_rolling_means_match_pandas_groupby_rolling():
+    df = _cohort()
+    ours = rolling_means(df, windows=(7, 30))
+    for w in (7, 30):
+        ref = df.sort_values(["user", "timestamp"]).groupby("user")["sleep"].rolling(w, min_periods=1).mean()
+        ref = ref.reset_index(level=0, drop=True)
+        np.testing.assert_allclose(ours[f"sleep_mean_{w}"], ref.loc[ours.index], atol=1e-9)
+
+
+def test_slopes_match_polyfit():
+    df = _cohort()
+    slopes = trend_slopes(df)
+    rolling = rolling_slopes(df, window=30)
+
+    user = df[df["user"] == 5].sort_values("timestamp")
+    days = (user["timestamp"] - user["timestamp"].iloc[0]).dt.total_seconds() / 86400
+    assert np.isclose(slopes.loc[5, "stress_slope"], np.polyfit(days, user["stress"], 1)[0])
+
+    last = user.iloc[-30:]
+    expected = np.polyfit(days.iloc[-30:], last["risk_score"], 1)[0]
+    assert np.isclose(rolling.loc[last.index[-1], "risk_score_slope_30"], expected)
+
+
+def test_change_point_finds_shift():
+    rng = np.random.default_rng(0)
+    frames = []
+    for user, split in [("a", 70), ("b", 30)]:
+        y = np.r_[np.full(split, 20.0), np.full(100 - split, 45.0)] + rng.normal(0, 3, 100)
+        frames.append(pd.DataFrame({
+            "user": user,
+            "timestamp": pd.date_range("2024-01-01", periods=100),
+            "risk_score": y,
+        }))
+    flat = pd.DataFrame({"user": "c", "timestamp": pd.date_range("2024-01-01", periods=100),
+                         "risk_score": rng.normal(30, 3, 100)})
+
+    cp = change_points(pd.concat(frames + [flat]))
+    assert cp.loc["a", "change_at"] == pd.Timestamp("2024-01-01") + pd.Timedelta(days=70)
+    assert cp.loc["b", "change_at"] == pd.Timestamp("2024-01-01") + pd.Timedelta(days=30)
+    assert cp.loc[["a", "b"], "significant"].all()
+    assert cp.loc["a", "shift"] > 20
+
+
+def _two_users(nan_user=None):
+    # Per-user frames concatenated as-is, so index labels repeat across users
+    rng = np.random.default_rng(1)
+    frames = []
+    for user, split in [("a", 20), ("b", 25)]:
+        y = np.r_[np.full(split, 20.0), np.full(40 - split, 45.0)] + rng.normal(0, 2, 40)
+        frames.append(pd.DataFrame({
+            "user": user,
+            "timestamp": pd.date_range("2024-01-01", periods=40),
+            "risk_score": y,
+            "stress": rng.uniform(1, 10, 40),
+            "sleep": rng.uniform(4, 9, 40),
+        }))
+    if nan_user is not None:
+        frames[nan_user].loc[10, "risk_score"] = np.nan
+    return pd.concat(frames)
+
+
+def test_ewma_keeps_rows_with_repeated_index_labels():
+    df = _two_users()
+    result = ewma(df)
+    assert len(result) == len(df) == 80
+
+    expected = df[df["user"] == "b"]["risk_score"].ewm(span=14).mean().to_numpy()
+    np.testing.assert_allclose(result["risk_score_ewma"].to_numpy()[40:], expected)
+
+
+def test_nan_in_one_user_stays_in_that_user():
+    clean, dirty = _two_users(), _two_users(nan_user=0)
+
+    slopes = rolling_slopes(dirty, window=10)["risk_score_slope_10"].to_numpy()
+    np.testing.assert_allclose(
+        slopes[40:], rolling_slopes(clean, window=10)["risk_score_slope_10"].to_numpy()[40:]
+    )
+    assert np.isfinite(np.delete(slopes, [0, 40])).all()  # a single point has no slope
+
+    # User a's window skips the NaN: same slope as fitting its valid points
+    a = dirty.iloc[:40]
+    window = a.iloc[5:15].dropna()
+    days = (window["timestamp"] - a["timestamp"].iloc[0]).dt.days
+    assert np.isclose(slopes[14], np.polyfit(days, window["risk_score"], 1)[0])
+
+    assert np.isfinite(trend_slopes(dirty)["risk_score_slope"]).all()
+
+    cp = change_points(dirty)
+    assert cp.loc["a", "change_at"] == pd.Timestamp("2024-01-21")
+    assert cp.loc["b", "change_at"] == pd.Timestamp("2024-01-26")
+    assert cp["significant"].all()
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from database.log_cache import LogCache
+
+START = datetime(2024, 1, 1)
+
+
+class Loader:
+    def __init__(self, logs):
+        self.logs = logs
+        self.calls = 0
+
+    def __call__(self, user_email, limit):
+        self.calls += 1
+        return self.logs[:limit]
+
+
+def _logs(n):
+    return [{"id": str(d), "timestamp": START + timedelta(days=d)} for d in reversed(range(n))]
+
+
+def test_hits_until_ttl_or_larger_window():
+    cache = LogCache(ttl=60)
+    loader = Loader(_logs(50))
+
+    assert len(cache.get_logs("a", 30, loader)) == 30
+    assert len(cache.get_logs("a", 10, loader)) == 10
+    assert loader.calls == 1
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+    cache.get_logs("a", 40, loader)
+    assert loader.calls == 2
+
+    cache.ttl = -1
+    cache.get_logs("a", 10, loader)
+    assert loader.calls == 3
+
+
+def test_append_keeps_window_and_rebuilds_frame():
+    cache = LogCache()
+    loader = Loader(_logs(5))
+    builds = []
+
+    def build(logs):
+        builds.append(len(logs))
+        return [log["id"] for log in logs]
+
+    assert cache.get_frame("a", 3, loader, build) == ["4", "3", "2"]
+    assert cache.get_frame("a", 3, loader, build) == ["4", "3", "2"]
+    assert builds == [3]
+
+    cache.append("a", {"id": "new", "timestamp": START + timedelta(days=10)})
+    assert cache.get_frame("a", 3, loader, build) == ["new", "4", "3"]
+    assert loader.calls == 1 and builds == [3, 3]
+
+    # Older-than-head saves invalidate instead of appending
+    cache.append("a", {"id": "old", "timestamp": START})
+    cache.get_logs("a", 3, loader)
+    assert loader.calls == 2
+
+
+def test_lru_eviction():
+    cache = LogCache(max_users=2)
+    loader = Loader(_logs(3))
+    for user in ["a", "b", "a", "c"]:
+        cache.get_logs(user, 3, loader)
+
+    cache.get_logs("a", 3, loader)
+    assert cache.stats["evictions"] == 1
+    assert loader.calls == 3  # "b" was evicted, "a" stayed warm
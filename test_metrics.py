@@ -0,0 +1,70 @@
+import json
+
+from monitoring.metrics import Metrics, summarize_trace
+
+
+def test_disabled_is_a_no_op():
+    metrics = Metrics(enabled=False)
+    with metrics.timer("db.read"):
+        pass
+    metrics.incr("db.logs_read", 5)
+    assert metrics.snapshot() == {"timers": {}, "counters": {}}
+    assert metrics.export("unused.prom", force=True) is False
+
+
+def test_prometheus_and_jsonl_export(tmp_path):
+    metrics = Metrics(enabled=True)
+    for seconds in (0.002, 0.02, 2.0):
+        metrics.observe("db.read", seconds)
+    metrics.observe("db.save", 0.004, mode="direct")
+    metrics.incr("db.logs_read", 30)
+
+    text = metrics.to_prometheus()
+    assert "# TYPE wellpath_db_read_seconds histogram" in text
+    assert 'wellpath_db_read_seconds_bucket{le="0.005"} 1' in text
+    assert 'wellpath_db_read_seconds_bucket{le="+Inf"} 3' in text
+    assert "wellpath_db_read_seconds_count 3" in text
+    assert 'wellpath_db_save_seconds_count{mode="direct"} 1' in text
+    assert "wellpath_db_logs_read_total 30" in text
+
+    path = tmp_path / "metrics.jsonl"
+    metrics.path = str(path)
+    metrics.observe("model.load", 0.1)
+    assert metrics.export(force=True)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert {"model.load", "db.logs_read"} <= {r["metric"] for r in records}
+
+
+def test_trace_collects_spans_while_disabled():
+    metrics = Metrics(enabled=False)
+    token = metrics.begin_trace()
+    with metrics.timer("db.read"):
+        pass
+    with metrics.timer("db.read"):
+        pass
+    metrics.observe("app.section", 0.5, section="dashboard")
+    spans = metrics.end_trace(token)
+
+    assert [name for name, _, _ in spans] == ["db.read", "db.read", "app.section"]
+    assert summarize_trace(spans)[0] == {"span": "app.section[dashboard]", "calls": 1, "ms": 500.0}
+    assert metrics.snapshot()["timers"] == {}
+    assert metrics.timer("db.read").__class__.__name__ == "_NullTimer"
+
+
+def test_jsonl_events_export_without_explicit_calls(tmp_path, monkeypatch):
+    import monitoring.metrics as metrics_module
+
+    monkeypatch.setattr(metrics_module, "MAX_PENDING_EVENTS", 100)
+    path = tmp_path / "metrics.jsonl"
+    metrics = Metrics(enabled=True, path=str(path))
+    for _ in range(1_000):
+        metrics.observe("score.batch", 0.001)
+
+    assert len(metrics._events) < 100
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert sum(r["metric"] == "score.batch" for r in lines) == 1_000 - len(metrics._events)
+
+    # Old events also go out once EXPORT_INTERVAL has passed
+    monkeypatch.setattr(metrics_module, "EXPORT_INTERVAL", 0.0)
+    metrics.observe("score.batch", 0.001)
+    assert metrics._events == []
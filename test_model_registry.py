@@ -0,0 +1,33 @@
+from ml.model_registry import PersonalModelRegistry
+from ml.dataset_builder import build_dataset
+from simulation.health_simulator import generate_health_logs
+
+
+def _fit(df):
+    from sklearn.linear_model import LogisticRegression
+
+    X = df[["age", "weight", "stress", "sleep", "urine"]]
+    return LogisticRegression().fit(X, df["target"]), X
+
+
+def test_versions_lru_and_fallback(tmp_path):
+    registry = PersonalModelRegistry(root=str(tmp_path), cache_size=1)
+    features = {"age": 30, "weight": 70, "stress": 8, "sleep": 5, "urine": 1}
+
+    assert registry.predict("a@x.com", features)[2] == "external"
+
+    df = build_dataset(generate_health_logs(days=40) + generate_health_logs(days=40, pattern="improving"))
+    model, X = _fit(df)
+    assert registry.save("a@x.com", model, X.columns)["version"] == 1
+    assert registry.save("a@x.com", model, X.columns)["version"] == 2
+    assert registry.predict("a@x.com", features)[2] == "personal v2"
+
+    # Other user pushes a@x.com out of the single-slot cache
+    registry.predict("b@x.com", features)
+    assert registry.stats["evictions"] >= 1
+
+    fresh = PersonalModelRegistry(root=str(tmp_path))
+    assert [v["version"] for v in fresh.versions("a@x.com")] == [1, 2]
+    assert fresh.predict("a@x.com", features)[2] == "personal v2"
+    fresh.predict("a@x.com", features)
+    assert fresh.stats == {"hits": 1, "misses": 1, "evictions": 0, "fallbacks": 0}
@@ -0,0 +1,55 @@
+import numpy as np
+
+from ml.model_registry import PersonalModelRegistry
+from ml.online_model import OnlineRiskModel, OnlineTrainer
+from simulation.health_simulator import generate_health_logs
+
+
+def test_online_trainer_refits_then_updates(tmp_path):
+    history = generate_health_logs(days=20, pattern="improving") + generate_health_logs(days=20)
+    registry = PersonalModelRegistry(root=str(tmp_path))
+    trainer = OnlineTrainer(
+        lambda user: history, registry=registry, refit_every=5, checkpoint_every=2
+    )
+
+    assert trainer.observe("a@x.com", history[-1]) == "refit"
+    assert [trainer.observe("a@x.com", log) for log in history[:5]] == ["updated"] * 5
+    assert trainer.observe("a@x.com", history[0]) == "refit"
+
+    versions = registry.versions("a@x.com")
+    assert [v["version"] for v in versions] == [1, 2]
+    assert versions[0]["updates"] == 4
+
+
+def test_online_model_exports_raw_space_coefficients():
+    rng = np.random.default_rng(0)
+    X = rng.normal([30, 70, 5, 7, 0.5], [5, 10, 2, 1, 0.5], size=(200, 5))
+    y = (X[:, 2] > 5).astype(int)
+    model = OnlineRiskModel().fit(X, y)
+
+    z = X @ model.coef_.ravel() + model.intercept_[0]
+    np.testing.assert_allclose(1 / (1 + np.exp(-z)), model.predict_proba(X)[:, 1])
+
+
+def test_pending_updates_survive_eviction_and_flush(tmp_path):
+    history = generate_health_logs(days=20, pattern="improving") + generate_health_logs(days=20)
+    registry = PersonalModelRegistry(root=str(tmp_path), cache_size=1)
+    trainer = OnlineTrainer(lambda user: history, registry=registry, checkpoint_every=10)
+
+    users = ["a@x.com", "b@x.com", "c@x.com"]
+    for user in users:
+        assert trainer.observe(user, history[0]) == "refit"
+    # Interleaved updates would evict each other's unsaved models from a 1-entry cache
+    for log in history[:4]:
+        for user in users:
+            assert trainer.observe(user, log) == "updated"
+    for user in users:
+        assert registry.load(user)[1].n_seen == len(history) + 4
+
+    trainer.flush()
+    disk = PersonalModelRegistry(root=str(tmp_path))
+    for user in users:
+        entry, model = disk.load(user)
+        assert entry["updates"] == 4
+        np.testing.assert_allclose(model.coef_, registry.load(user)[1].coef_)
+    assert registry.load("a@x.com") is not None and len(registry._cache) == 1
@@ -0,0 +1,47 @@
+import os
+import shutil
+
+import numpy as np
+
+from ml.predictor import MODEL_PATH, ModelRegistry
+
+
+def test_registry_loads_once_and_reloads_on_change(tmp_path):
+    path = tmp_path / "model.pkl"
+    shutil.copy(MODEL_PATH, path)
+    registry = ModelRegistry(str(path))
+
+    X = np.array([[50, 200, 130, 150, 0]] * 4, dtype=float)
+    first = registry.predict_proba(X)
+    registry.predict_proba(X)
+    assert registry.stats["loads"] == 1
+    assert registry.stats["cache_hits"] == 1
+    assert registry.stats["rows_scored"] == 8
+
+    # Same bytes, new mtime -> no reload
+    os.utime(path, ns=(0, 0))
+    registry.predict_proba(X)
+    assert registry.stats["loads"] == 1
+
+    # New content -> reload
+    with open(path, "ab") as f:
+        f.write(b"\n")
+    np.testing.assert_allclose(registry.predict_proba(X), first)
+    assert registry.stats["loads"] == 2
+
+
+def test_exported_scorer_matches_pickle():
+    import pickle
+
+    from ml.external_dataset_adapter import load_heart_dataset
+    from ml.linear_scorer import LinearScorer, artifact_path, fingerprint_dataset
+
+    with open(MODEL_PATH, "rb") as f:
+        model = pickle.load(f)
+    scorer = LinearScorer.load(artifact_path(MODEL_PATH))
+
+    X, y = load_heart_dataset("data/heart.csv")
+    np.testing.assert_allclose(
+        scorer.predict_proba(X.to_numpy()), model.predict_proba(X)[:, 1], atol=1e-12
+    )
+    assert scorer.fingerprint == fingerprint_dataset(X, y)
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from recommendation.batch import generate_recommendations_batch
+from recommendation.recommender import expand_codes, generate_recommendations
+from simulation.health_simulator import simulate_cohort
+
+
+def test_batch_matches_per_user_function():
+    rng = np.random.default_rng(0)
+    patterns = np.where(rng.random(300) < 0.5, "improving", "worsening")
+    logs = simulate_cohort(300, days=12, pattern=patterns, seed=4)
+
+    # Ragged histories, including users with a single log
+    keep = rng.integers(1, 13, 300)
+    logs = logs[logs.groupby("user").cumcount() < keep[logs["user"]]]
+
+    rule = pd.Series(rng.choice(["LOW", "MEDIUM", "HIGH"], 300), index=np.arange(300))
+    ml = pd.Series(rng.choice(["LOW", "HIGH"], 300), index=np.arange(300))
+
+    batch = generate_recommendations_batch(logs.sample(frac=1, random_state=1), rule, ml)
+
+    for user, user_logs in logs.groupby("user"):
+        expected = generate_recommendations(user_logs.sort_values("timestamp"), rule[user], ml[user])
+        assert expand_codes(batch.loc[user, "codes"]) == expected, user
+
+
+def test_defaults_to_latest_logged_levels():
+    logs = pd.DataFrame({
+        "user": ["a", "a", "a"],
+        "timestamp": pd.date_range("2024-01-01", periods=3),
+        "stress": [8, 8, 8],
+        "sleep": [5, 5, 5],
+        "risk_score": [40, 50, 70],
+        "risk_level": ["MEDIUM", "MEDIUM", "HIGH"],
+        "ml_risk_label": ["LOW", "LOW", "HIGH"],
+    })
+    batch = generate_recommendations_batch(logs)
+    assert expand_codes(batch.loc["a", "codes"]) == generate_recommendations(logs, "HIGH", "HIGH")
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.memory import InMemoryRepository
+from database.sqlite_store import SQLiteRepository
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repo(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryRepository()
+    return SQLiteRepository(str(tmp_path / "logs.db"))
+
+
+def _log(day, **extra):
+    return {"timestamp": START + timedelta(days=day), "risk_score": day, "symptoms": ["fever"], **extra}
+
+
+def test_save_and_read_newest_first(repo):
+    repo.save_bulk("a@x.com", [_log(d) for d in range(10)])
+    repo.save("a@x.com", _log(10))
+    repo.save("b@x.com", _log(3))
+
+    logs = repo.get_logs("a@x.com", limit=3)
+    assert [r["risk_score"] for r in logs] == [10, 9, 8]
+    assert logs[0]["timestamp"] == START + timedelta(days=10)
+    assert logs[0]["symptoms"] == ["fever"]
+    assert all("id" in r for r in logs)
+
+
+def test_pages_cover_range_once(repo):
+    repo.save_bulk("a@x.com", [_log(d) for d in range(25)])
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = repo.get_page(
+            "a@x.com", 4, cursor=cursor,
+            start=START + timedelta(days=5), end=START + timedelta(days=20),
+            descending=False
+        )
+        seen.extend(r["risk_score"] for r in page)
+        if cursor is None:
+            break
+    assert seen == list(range(5, 20))
+
+
+def test_explicit_ids_are_idempotent(repo):
+    repo.save("a@x.com", _log(1, id="log-1"))
+    repo.save_bulk("a@x.com", [_log(1, id="log-1"), _log(2, id="log-2")])
+
+    logs = repo.get_logs("a@x.com")
+    assert sorted(r["id"] for r in logs) == ["log-1", "log-2"]
+
+
+def test_firestore_module_imports_without_credentials():
+    import database.firestore as firestore_db
+
+    assert firestore_db.FirestoreRepository()._db is None
+
+
+def test_streaming_projects_fields(repo):
+    from database.streaming import iter_log_batches, iter_log_frames
+
+    repo.save_bulk("a@x.com", [_log(d, stress=d % 10, note="x" * 100) for d in range(23)])
+
+    batches = list(iter_log_batches(repo, "a@x.com", fields=["stress"], page_size=10))
+    assert [len(b) for b in batches] == [10, 10, 3]
+    assert set(batches[0][0]) == {"stress", "timestamp", "id"}
+
+    frames = list(iter_log_frames(
+        repo, "a@x.com", fields=["risk_score", "symptoms"],
+        start=START + timedelta(days=20), page_size=2
+    ))
+    df = frames[0]
+    assert list(df.columns) == ["id", "timestamp", "risk_score", "symptoms"]
+    assert sum(len(f) for f in frames) == 3
+    assert df["symptoms"].iloc[0] == ["fever"]
+
+    # Asking for id or timestamp explicitly doesn't duplicate them
+    frames = list(iter_log_frames(repo, "a@x.com", fields=["timestamp", "stress", "id"]))
+    assert list(frames[0].columns) == ["id", "timestamp", "stress"]
+    assert len(frames[0]) == 23
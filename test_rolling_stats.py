@@ -0,0 +1,164 @@
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.health_trends import compute_health_change
+from analysis.rolling_stats import WINDOW, UserSummary
+from database.memory import InMemoryRepository
+from database.summaries import SummaryStore
+
+START = datetime(2024, 1, 1)
+
+
+def _logs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "timestamp": START + timedelta(days=i),
+            "risk_score": int(rng.integers(5, 100)),
+            "stress": round(float(rng.uniform(1, 10)), 1),
+            "sleep": round(float(rng.uniform(4, 9)), 1),
+        }
+        for i in range(n)
+    ]
+
+
+def _batch_insights(df):
+    result = {"change_score": compute_health_change(df)}
+    if len(df) >= 3:
+        recent = df.tail(3)
+        result["risk_increasing"] = recent["risk_score"].iloc[-1] > recent["risk_score"].iloc[0]
+        result["high_stress"] = recent["stress"].mean() >= 7
+        result["low_sleep"] = recent["sleep"].mean() < 6
+    if len(df) >= 5:
+        corr = df[["risk_score", "stress", "sleep"]].corr()
+        result["stress_corr"] = corr.loc["risk_score", "stress"]
+        result["sleep_corr"] = corr.loc["risk_score", "sleep"]
+    return result
+
+
+def test_incremental_summary_matches_batch_versions():
+    logs = _logs(120)
+    summary = UserSummary()
+
+    for i, log in enumerate(logs, start=1):
+        summary.update(log)
+        df = pd.DataFrame(logs[max(0, i - WINDOW):i])
+        expected = _batch_insights(df)
+        actual = summary.insights()
+
+        assert actual.keys() == expected.keys()
+        for key, value in expected.items():
+            if isinstance(value, float) and not math.isnan(value):
+                assert math.isclose(actual[key], value, abs_tol=1e-9), (i, key)
+            else:
+                assert actual[key] == value or (value != value and actual[key] != actual[key])
+
+        assert math.isclose(summary.window_mean("stress"), df["stress"].mean())
+
+
+def test_summary_round_trips_and_rebuilds_out_of_order():
+    repo = InMemoryRepository()
+    store = SummaryStore(repo)
+    logs = _logs(40, seed=1)
+
+    repo.save_bulk("a@x.com", logs[10:])
+    for log in logs[10:15]:
+        store.record("a@x.com", log)  # rebuilt on first use, then updated
+
+    restored = UserSummary.from_dict(repo.get_summary("a@x.com"))
+    assert restored.insights() == store.get("a@x.com").insights()
+
+    # An older log forces a rebuild from the stored history
+    repo.save("a@x.com", logs[0])
+    summary = store.record("a@x.com", logs[0])
+    assert summary.count == 31
+    assert summary.tail(1, "risk_score") == [logs[-1]["risk_score"]]
+
+
+def test_save_health_log_counts_each_log_once(monkeypatch):
+    import database.repository as repository
+    import database.rollups as rollups
+    import database.summaries as summaries
+    from database.firestore import save_health_log
+    from database.rollups import RollupStore
+
+    repo = InMemoryRepository()
+    monkeypatch.setattr(repository, "_repository", repo)
+    monkeypatch.setattr(summaries, "_store", SummaryStore(repo))
+    monkeypatch.setattr(rollups, "_store", RollupStore(repo))
+
+    logs = _logs(5, seed=2)
+    repo.save_bulk("a@x.com", logs[:4])
+
+    # No summary yet: the save rebuilds from a history that already holds the log
+    save_health_log("a@x.com", logs[4])
+    summary = summaries.get_summary_store().get("a@x.com")
+    assert summary.count == 5
+    assert summary.tail(5, "risk_score") == [float(log["risk_score"]) for log in logs]
+    assert UserSummary.from_dict(repo.get_summary("a@x.com")).count == 5
+
+
+class FlakyRepository(InMemoryRepository):
+    """Raises ConnectionError from the methods named in `down`."""
+
+    def __init__(self):
+        super().__init__()
+        self.down = set()
+
+    def __getattribute__(self, name):
+        if name in object.__getattribute__(self, "down"):
+            raise ConnectionError(f"{name}: backend unreachable")
+        return object.__getattribute__(self, name)
+
+
+def test_queued_save_survives_backend_outage(monkeypatch, tmp_path):
+    import database.repository as repository
+    import database.rollups as rollups
+    import database.summaries as summaries
+    from database.firestore import save_health_log
+    from database.rollups import RollupStore
+    from database.write_queue import WriteBehindQueue
+
+    repo = FlakyRepository()
+    store = SummaryStore(repo)
+    queue = WriteBehindQueue(repo, str(tmp_path / "queue.db"), retry_backoff=0)
+    queue.on_commit(store.committed)
+    monkeypatch.setattr(repository, "_repository", repo)
+    monkeypatch.setattr(repository, "_write_queue", queue)
+    monkeypatch.setattr(summaries, "_store", store)
+    monkeypatch.setattr(rollups, "_store", RollupStore(repo))
+
+    logs = _logs(6, seed=4)
+    repo.save_bulk("a@x.com", logs[:3])
+    assert store.get("a@x.com").count == 3
+
+    # The backend is down: saves are accepted and the cached summary moves on in memory
+    repo.down = {"save_bulk", "get_summary", "save_summary"}
+    for log in logs[3:5]:
+        save_health_log("a@x.com", log)
+    save_health_log("b@x.com", logs[5])
+    assert queue.depth() == 3
+    assert store.get("a@x.com").count == 5
+    with pytest.raises(RuntimeError):
+        queue.flush_once()
+    repo.down = set()
+    assert UserSummary.from_dict(repo.get_summary("a@x.com")).count == 3
+
+    # Back up: the worker delivers the logs, then persists each summary once
+    assert queue.flush()
+    assert UserSummary.from_dict(repo.get_summary("a@x.com")).count == 5
+    assert UserSummary.from_dict(repo.get_summary("b@x.com")).count == 1
+    assert store.get("a@x.com").tail(5, "risk_score") == [float(log["risk_score"]) for log in logs[:5]]
+
+    # A failed persist is not retried by re-sending; the user is rebuilt from history instead
+    repo.down = {"save_summary"}
+    save_health_log("b@x.com", logs[0] | {"timestamp": logs[5]["timestamp"] + timedelta(days=1)})
+    assert queue.flush()
+    assert queue.stats["hook_failures"] == 1
+    repo.down = set()
+    assert store.get("b@x.com").count == 2
+    assert UserSummary.from_dict(repo.get_summary("b@x.com")).count == 2
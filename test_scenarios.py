@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import numpy as np
+
+from simulation.health_simulator import generate_health_logs
+from simulation.scenarios import (
+    DEFAULT_START,
+    Scenario,
+    run_scenarios,
+    start_from_logs,
+    worsening_probability,
+)
+
+SCENARIOS = [
+    Scenario("baseline"),
+    Scenario("no change"),
+    Scenario("+2h sleep, -3 stress", sleep_hours=2, stress=-3),
+]
+
+
+def test_start_from_latest_log_with_defaults():
+    logs = [
+        {"timestamp": datetime(2024, 1, 2), "age": 50, "stress": 8, "sleep": 5.5, "risk_score": 40},
+        {"timestamp": datetime(2024, 1, 1), "age": 49, "stress": 3, "sleep": 8.0, "risk_score": 20},
+    ]
+    start = start_from_logs(logs)
+    assert (start["age"], start["stress"], start["sleep"]) == (50, 8.0, 5.5)
+    assert start["cholesterol"] == DEFAULT_START["cholesterol"]
+    assert worsening_probability(logs) == 0.9  # one rise, clipped
+    assert worsening_probability([]) == 0.5
+
+    simulated = generate_health_logs(10, seed=0)
+    assert start_from_logs(simulated)["bp"] == simulated[-1]["blood_pressure"]
+
+
+def test_seeded_results_do_not_depend_on_workers():
+    start = start_from_logs(generate_health_logs(30, pattern="improving", seed=2))
+    inline = run_scenarios(start, SCENARIOS, trajectories=3_000, days=10, n_jobs=1)
+    pooled = run_scenarios(start, SCENARIOS, trajectories=3_000, days=10, n_jobs=2)
+
+    assert inline.table() == pooled.table()
+    for result in inline.results:
+        for hist in result.histograms.values():
+            assert hist.shape == (10, 101)
+            assert (hist.sum(axis=1) == 3_000).all()
+        assert abs(sum(result.level_probabilities().values()) - 1) < 1e-3
+
+
+def test_scenarios_share_trajectories():
+    start = {"age": 40, "stress": 6.0, "sleep": 6.5}
+    report = run_scenarios(start, SCENARIOS, trajectories=2_000, days=20, p_worsen=0.6, n_jobs=1)
+
+    assert np.array_equal(report["baseline"].histograms["engine"], report["no change"].histograms["engine"])
+    better = report["+2h sleep, -3 stress"]
+    for scorer in ("engine", "simulator"):
+        assert better.mean_score(scorer) < report["baseline"].mean_score(scorer)
+
+    quantiles = report["baseline"].quantiles()
+    assert list(quantiles.columns) == ["p10", "p50", "p90"]
+    assert (quantiles["p10"] <= quantiles["p50"]).all() and (quantiles["p50"] <= quantiles["p90"]).all()
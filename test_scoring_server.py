@@ -0,0 +1,158 @@
+import asyncio
+import json
+
+from ml.predictor import predict_risk
+from risk_engine import HealthInput, HealthRiskEngine
+from service.scoring_server import ScoringServer
+
+
+async def _request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n"
+        f"Connection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    data = json.loads(await reader.read())
+    writer.close()
+    return status, data
+
+
+def _record(i):
+    return {
+        "age": 20 + i,
+        "stress": i % 10 + 1,
+        "sleep": 4 + i % 5,
+        "urine": "increased" if i % 3 == 0 else "normal",
+        "symptoms": ["fever", "chest_pain"] if i % 4 == 0 else [],
+    }
+
+
+def _expected(record):
+    engine = HealthRiskEngine()
+    rule = engine.assess_risk(HealthInput(
+        record["age"], 70.0, record["stress"], record["sleep"], record["urine"], record["symptoms"]
+    ))
+    prob, label = predict_risk(record["age"], 200, record["stress"], record["sleep"], 0)
+    return {
+        "risk_level": rule["risk_level"],
+        "risk_score": rule["risk_score"],
+        "ml_risk_label": label,
+        "ml_risk_probability": prob,
+    }
+
+
+def test_concurrent_requests_are_micro_batched():
+    async def scenario():
+        server = await ScoringServer(port=0, max_batch=16, max_wait_ms=50).start()
+        try:
+            records = [_record(i) for i in range(40)]
+            responses = await asyncio.gather(
+                *(_request(server.port, "POST", "/score", r) for r in records)
+            )
+            _, health = await _request(server.port, "GET", "/health")
+            return records, responses, health
+        finally:
+            await server.close()
+
+    records, responses, health = asyncio.run(scenario())
+
+    for record, (status, result) in zip(records, responses):
+        assert status == 200
+        assert {k: result[k] for k in _expected(record)} == _expected(record)
+    assert health["requests"] == 40
+    assert health["batches"] < 40
+    assert health["largest_batch"] <= 16
+
+
+def test_batch_endpoint_and_errors():
+    async def scenario():
+        server = await ScoringServer(port=0).start()
+        try:
+            batch = await _request(server.port, "POST", "/score/batch", {"records": [_record(1), _record(8)]})
+            missing = await _request(server.port, "POST", "/score", {"age": 30})
+            unknown = await _request(server.port, "GET", "/nope")
+            return batch, missing, unknown
+        finally:
+            await server.close()
+
+    (status, body), missing, unknown = asyncio.run(scenario())
+    assert status == 200
+    assert [r["risk_score"] for r in body["results"]] == \
+        [_expected(_record(1))["risk_score"], _expected(_record(8))["risk_score"]]
+    assert missing[0] == 400 and "Missing fields" in missing[1]["error"]
+    assert unknown[0] == 404
+
+
+def test_bad_content_length_gets_400():
+    async def send(port, length):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"POST /score HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 2)
+        writer.close()
+        return response
+
+    async def scenario():
+        server = await ScoringServer(port=0).start()
+        try:
+            return [await send(server.port, length) for length in ("abc", "-5")]
+        finally:
+            await server.close()
+
+    for response in asyncio.run(scenario()):
+        assert response.startswith(b"HTTP/1.1 400 ")
+        assert b"Invalid Content-Length" in response
+
+
+def test_non_finite_and_malformed_inputs_get_400():
+    async def scenario():
+        server = await ScoringServer(port=0).start()
+        try:
+            bad = [
+                {**_record(1), "stress": "nan"},
+                {**_record(1), "sleep": float("inf")},  # sent as JSON Infinity
+                {**_record(1), "cholesterol": float("nan")},
+                {**_record(1), "symptoms": "fever"},
+            ]
+            single = [await _request(server.port, "POST", "/score", r) for r in bad]
+            batch = await _request(server.port, "POST", "/score/batch", {"records": [_record(2), bad[0]]})
+            return single, batch
+        finally:
+            await server.close()
+
+    single, batch = asyncio.run(scenario())
+    for status, data in single[:3]:
+        assert status == 400 and "finite" in data["error"]
+    assert single[3][0] == 400 and "symptoms must be a list" in single[3][1]["error"]
+    assert batch[0] == 400
+
+
+def test_failing_record_does_not_fail_its_batch():
+    class PickyServer(ScoringServer):
+        def _score(self, records):
+            if any(r["age"] == 99 for r in records):
+                raise ValueError("Input X contains NaN")
+            return super()._score(records)
+
+    async def scenario():
+        server = await PickyServer(port=0, max_batch=16, max_wait_ms=50).start()
+        try:
+            records = [_record(i) for i in range(8)] + [{**_record(0), "age": 99}]
+            responses = await asyncio.gather(
+                *(_request(server.port, "POST", "/score", r) for r in records)
+            )
+            return records, responses, server.batcher.stats
+        finally:
+            await server.close()
+
+    records, responses, stats = asyncio.run(scenario())
+    for record, (status, result) in zip(records[:-1], responses[:-1]):
+        assert status == 200
+        assert {k: result[k] for k in _expected(record)} == _expected(record)
+    assert responses[-1][0] == 500 and "contains NaN" in responses[-1][1]["error"]
+    assert stats["failed_batches"] >= 1
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+from database.memory import InMemoryRepository
+from database.write_queue import WriteBehindQueue
+
+START = datetime(2024, 1, 1)
+
+
+class FlakyRepository(InMemoryRepository):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.commits = 0
+
+    def save_bulk(self, user_email, logs):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("backend unavailable")
+        self.commits += 1
+        return super().save_bulk(user_email, logs)
+
+
+class RejectingRepository(InMemoryRepository):
+    """Rejects any batch containing the poison document, like a backend refusing one write."""
+
+    def __init__(self, poison_id):
+        super().__init__()
+        self.poison_id = poison_id
+
+    def save_bulk(self, user_email, logs):
+        logs = list(logs)
+        if any(log["id"] == self.poison_id for log in logs):
+            raise ValueError("document rejected")
+        return super().save_bulk(user_email, logs)
+
+
+def _log(day):
+    return {"timestamp": START + timedelta(days=day), "risk_score": day}
+
+
+def test_queue_coalesces_and_survives_restart(tmp_path):
+    path = str(tmp_path / "queue.db")
+    repo = FlakyRepository(failures=1)
+
+    queue = WriteBehindQueue(repo, path, batch_size=50)
+    ids = [queue.enqueue("a@x.com", _log(d)) for d in range(120)]
+    assert queue.depth() == 120
+
+    # Backend down: nothing is lost
+    try:
+        queue.flush_once()
+    except RuntimeError:
+        pass
+    assert queue.depth() == 120
+
+    # "Restart": a new queue on the same file delivers everything
+    restarted = WriteBehindQueue(repo, path, batch_size=50).start()
+    assert restarted.flush(timeout=5)
+    restarted.stop()
+
+    stored = repo.get_logs("a@x.com", limit=500)
+    assert sorted(r["id"] for r in stored) == sorted(ids)
+    assert stored[0]["timestamp"] == START + timedelta(days=119)
+    assert repo.commits == 3
+
+
+def test_redelivery_is_idempotent(tmp_path):
+    repo = InMemoryRepository()
+    queue = WriteBehindQueue(repo, str(tmp_path / "queue.db"))
+    queue.enqueue("a@x.com", _log(1))
+
+    # Commit landed but the process died before the row was deleted
+    rows = queue._next_batch()
+    queue.flush_once()
+    queue._conn.execute(
+        "INSERT INTO pending_logs (user, doc_id, timestamp, payload, enqueued_at) VALUES (?, ?, ?, ?, 0)",
+        rows[0][1:5]
+    )
+    queue.flush_once()
+
+    assert len(repo.get_logs("a@x.com")) == 1
+    assert queue.metrics()["depth"] == 0
+
+
+def test_poison_row_is_isolated_and_dead_lettered(tmp_path):
+    repo = RejectingRepository("poison")
+    queue = WriteBehindQueue(repo, str(tmp_path / "queue.db"), batch_size=10, max_attempts=5, retry_backoff=0)
+    queue.enqueue("a@x.com", {**_log(0), "id": "poison"})
+    ids = [queue.enqueue("a@x.com", _log(d)) for d in range(1, 25)]
+
+    for _ in range(10):
+        try:
+            queue.flush_once()
+        except RuntimeError:
+            pass
+
+    # Everything behind (and batched with) the poison row was delivered
+    assert sorted(r["id"] for r in repo.get_logs("a@x.com", limit=100)) == sorted(ids)
+    metrics = queue.metrics()
+    assert (metrics["depth"], metrics["dead"], metrics["dead_lettered"]) == (0, 1, 1)
+
+    # Once the backend accepts it, a requeued row goes through
+    repo.poison_id = None
+    assert queue.requeue_dead() == 1
+    assert queue.flush_once() == 1
+    assert len(repo.get_logs("a@x.com", limit=100)) == 25
+
+
+def test_failed_rows_back_off_without_blocking_later_rows(tmp_path):
+    repo = RejectingRepository("poison")
+    queue = WriteBehindQueue(repo, str(tmp_path / "queue.db"), batch_size=5, retry_backoff=60)
+    queue.enqueue("a@x.com", {**_log(0), "id": "poison"})
+    for d in range(1, 10):
+        queue.enqueue("a@x.com", _log(d))
+
+    try:
+        queue.flush_once()  # first batch (with the poison row) fails and backs off
+    except RuntimeError:
+        pass
+    assert queue.flush_once() == 5  # the next rows are not stuck behind it
+    assert queue.depth() == 5